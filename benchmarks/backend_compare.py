@@ -0,0 +1,96 @@
+"""Query latency of the in-process NumPy backend vs Qdrant at several sizes."""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from src.config import build_memory_client, load_config
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+from src.utils.timing import LatencyTracker
+
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+NUM_QUERIES = 200
+NUM_ROOMS = 10
+
+
+def _random_embeddings(n: int, rng: np.random.Generator) -> np.ndarray:
+    emb = rng.standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def profile_backend(config: dict, backend: str, size: int) -> dict[str, dict]:
+    """Fill a fresh collection with `size` points and time unfiltered and room-filtered queries."""
+    backend_config = {**config, "memory": {**config["memory"], "backend": backend}}
+    client = build_memory_client(backend_config, collection_suffix="_backends")
+    client.delete_collection()
+    client = build_memory_client(backend_config, collection_suffix="_backends")
+
+    rng = np.random.default_rng(0)
+    embeddings = _random_embeddings(size, rng)
+    VisualMemory(client=client).store_many(
+        embeddings,
+        MemoryPayload.bulk(
+            rng.uniform(0, 1e6, size),
+            room_id=[f"room_{i % NUM_ROOMS}" for i in range(size)],
+        ),
+    )
+    retriever = SceneRetriever(client=client, top_k=5, score_threshold=0.0)
+    queries = _random_embeddings(NUM_QUERIES, rng)
+
+    results = {}
+    for label, room_id in [("all", None), ("room", "room_3")]:
+        tracker = LatencyTracker()
+        for q in queries:
+            t0 = time.perf_counter()
+            retriever.query(q, room_id=room_id)
+            tracker.record((time.perf_counter() - t0) * 1000)
+        results[label] = tracker.summary()
+
+    client.delete_collection()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--config", default="config/benchmark.yaml")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", default=["numpy", "qdrant"], choices=["numpy", "qdrant"])
+    parser.add_argument("--dtype", default=None, choices=["float32", "float16"], help="NumPy vector dtype")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.dtype is not None:
+        config["memory"]["numpy"] = {**config["memory"].get("numpy", {}), "dtype": args.dtype}
+
+    rows = []
+    for backend in args.backends:
+        for size in args.sizes:
+            try:
+                results = profile_backend(config, backend, size)
+            except Exception as e:  # Qdrant may not be running
+                logger.warning("Skipping %s at %d vectors: %s", backend, size, e)
+                break
+            rows.append((backend, size, results))
+
+    print("\n" + "=" * 64)
+    print(f"QUERY LATENCY BY BACKEND ({NUM_QUERIES} queries, top-5)")
+    print("=" * 64)
+    print(f"{'Backend':<8} {'Vectors':>9} {'Mean (ms)':>10} {'Max (ms)':>10} {'Room mean':>10} {'Room max':>10}")
+    print("-" * 64)
+    for backend, size, r in rows:
+        print(
+            f"{backend:<8} {size:>9} {r['all']['mean_ms']:>10.2f} {r['all']['max_ms']:>10.2f} "
+            f"{r['room']['mean_ms']:>10.2f} {r['room']['max_ms']:>10.2f}"
+        )
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
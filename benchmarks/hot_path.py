@@ -0,0 +1,105 @@
+"""Per-call Python overhead of the retrieval and storage hot paths.
+
+The memory backend is replaced by a stub that returns canned points, so
+the numbers are pure client-side cost: building the filter and the
+results of a room-filtered query, and building the point for one `store`
+call. Each path is timed with validated pydantic models (the previous
+implementation) and with the unvalidated records used now.
+"""
+
+import argparse
+import timeit
+from typing import Callable
+
+import numpy as np
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import FieldCondition, Filter, MatchValue, PointStruct, ScoredPoint
+
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.schemas import MemoryPayload, NavigationAction, NavigationDecision, RetrievalResult
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+
+
+def _per_call_us(fn: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def _stub_retriever(top_k: int) -> SceneRetriever:
+    client = NumpyMemoryClient(collection_name="hot_path")
+    payload = MemoryPayload(timestamp=1.7e9, room_id="lab", camera_id="front").model_dump()
+    response = QueryResponse(
+        points=[
+            ScoredPoint(id=f"{i:08d}-0000-0000-0000-000000000000", version=0, score=0.9, payload=payload)
+            for i in range(top_k)
+        ]
+    )
+    client.client.query_points = lambda **_: response
+    return SceneRetriever(client=client, top_k=top_k, score_threshold=0.0)
+
+
+def profile_query(top_k: int, number: int) -> tuple[float, float]:
+    """Per-query overhead with pydantic results (before) and records (after)."""
+    retriever = _stub_retriever(top_k)
+    embedding = np.ones(512, dtype=np.float32) / np.sqrt(512)
+
+    def before() -> list[RetrievalResult]:
+        points = retriever.client.client.query_points(
+            collection_name=retriever.client.collection_name,
+            query=retriever.client.to_vector(embedding),
+            query_filter=Filter(must=[FieldCondition(key="room_id", match=MatchValue(value="lab"))]),
+            limit=top_k,
+            score_threshold=retriever.score_threshold,
+        ).points
+        return [
+            RetrievalResult(point_id=str(p.id), score=p.score, payload=MemoryPayload(**p.payload))
+            for p in points
+        ]
+
+    assert [r.to_result() for r in retriever.query(embedding, room_id="lab")] == before()
+    return (
+        _per_call_us(before, number),
+        _per_call_us(lambda: retriever.query(embedding, room_id="lab"), number),
+    )
+
+
+def profile_store(number: int) -> tuple[float, float]:
+    """Per-point cost of building a buffered point, validated (before) and not (after)."""
+    client = NumpyMemoryClient(collection_name="hot_path")
+    memory = VisualMemory(client=client, batch_size=number * 10)
+    embedding = np.ones(512, dtype=np.float32) / np.sqrt(512)
+    payload = MemoryPayload(timestamp=1.7e9, room_id="lab")
+
+    def before() -> PointStruct:
+        return PointStruct(id="0" * 36, vector=client.to_vector(embedding), payload=payload.model_dump())
+
+    def after() -> str:
+        point_id = memory.store(embedding, payload, point_id="0" * 36)
+        memory._buffer.clear()
+        return point_id
+
+    return _per_call_us(before, number), _per_call_us(after, number)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5, 10, 50])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing repeat")
+    args = parser.parse_args()
+
+    print(f"\n{'Path':<34}{'Before (us)':>12}{'After (us)':>12}{'Speedup':>9}")
+    print("-" * 67)
+    rows = [(f"query, top_k={k}", *profile_query(k, args.number)) for k in args.top_k]
+    rows.append(("store, per point", *profile_store(args.number)))
+    for label, before, after in rows:
+        print(f"{label:<34}{before:>12.1f}{after:>12.1f}{before / after:>8.1f}x")
+
+    decision = NavigationDecision(
+        action=NavigationAction.LOCALIZE, confidence=0.9, top_score=0.9, num_matches=10, room_id="lab"
+    )
+    json_us = _per_call_us(decision.model_dump_json, args.number)
+    print(f"\nNavigationDecision.model_dump_json (unchanged boundary): {json_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
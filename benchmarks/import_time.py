@@ -0,0 +1,122 @@
+"""Import-time profile of each entry point, based on `python -X importtime`.
+
+Every entry point is loaded in a fresh interpreter with `runpy`, under a
+run name other than `__main__`, so module-level imports run but `main()`
+does not. The modules its `main()` imports lazily through the builders in
+`src.config` are imported afterwards, so the total covers startup up to
+the first network or model call. Entry points that never encode images
+must not load torch, open_clip or cv2, and must start within the budget.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_QDRANT = ["src.memory.qdrant_client"]
+_ENCODER = _QDRANT + ["src.perception.encoder", "open_clip"]
+
+# (path, modules imported lazily by main(), needs the encoder stack)
+ENTRY_POINTS = [
+    ("scripts/reset_collection.py", _QDRANT, False),
+    ("scripts/compress_memories.py", _QDRANT, False),
+    ("scripts/segment_store.py", _QDRANT + ["src.memory.segment_store"], False),
+    ("benchmarks/performance_test.py", _QDRANT, False),
+    ("benchmarks/backend_compare.py", _QDRANT + ["src.memory.numpy_store"], False),
+    ("benchmarks/search_sweep.py", _QDRANT, False),
+    ("benchmarks/hot_path.py", _QDRANT + ["src.memory.numpy_store"], False),
+    ("scripts/query_cli.py", _ENCODER, True),
+    ("scripts/ingest_video.py", _ENCODER + ["cv2"], True),
+    ("src/main.py", _ENCODER + ["cv2"], True),
+    ("benchmarks/latency_profile.py", _ENCODER, True),
+]
+
+HEAVY_MODULES = ("torch", "open_clip", "cv2")
+
+# Budget for entry points that do not need the encoder at import time. The
+# Qdrant client alone accounts for most of it.
+DEFAULT_BUDGET_MS = 2500.0
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def profile_entry_point(
+    path: str, lazy_modules: list[str]
+) -> tuple[float, list[tuple[str, float]], set[str]]:
+    """Import an entry point in a fresh interpreter.
+
+    Args:
+        path: Entry point script, relative to the repository root.
+        lazy_modules: Modules its `main()` imports on first use.
+
+    Returns:
+        Tuple of (total import ms, top-level imports sorted by cumulative ms,
+        set of all imported module names).
+    """
+    code = "; ".join(
+        [f"import runpy; runpy.run_path({path!r}, run_name='__importtime__')"]
+        + [f"import {module}" for module in lazy_modules]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {path} failed:\n{proc.stderr[-2000:]}")
+
+    top_level = []
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative_us, indent, name = match.groups()
+        modules.add(name)
+        if not indent:
+            top_level.append((name, int(cumulative_us) / 1000))
+    total_ms = sum(ms for _, ms in top_level)
+    return total_ms, sorted(top_level, key=lambda t: -t[1]), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Import budget for entry points that do not need the encoder",
+    )
+    parser.add_argument("--top", type=int, default=3, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    print(f"\n{'Entry point':<34}{'Import (ms)':>12}  {'Heavy modules':<20}Slowest")
+    print("-" * 100)
+    failures = []
+    for path, lazy_modules, needs_encoder in ENTRY_POINTS:
+        total_ms, top_level, modules = profile_entry_point(path, lazy_modules)
+        heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in top_level[: args.top])
+        print(f"{path:<34}{total_ms:>12.0f}  {','.join(heavy) or '-':<20}{slowest}")
+
+        if needs_encoder:
+            continue
+        if heavy:
+            failures.append(f"{path} imports {', '.join(heavy)}")
+        if total_ms > args.budget_ms:
+            failures.append(f"{path} takes {total_ms:.0f} ms > {args.budget_ms:.0f} ms")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"All non-encoder entry points start in under {args.budget_ms:.0f} ms.")
+
+
+if __name__ == "__main__":
+    main()
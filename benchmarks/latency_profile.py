@@ -1,16 +1,19 @@
 """Latency profiling for core operations: CLIP encode, insert, query."""
 
+import argparse
 import logging
 import time
+from typing import Optional
 
 import numpy as np
 from PIL import Image
 
-from src.main import load_config
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.config import build_encoder, build_memory_client, load_config
 from src.memory.schemas import MemoryPayload
 from src.memory.visual_memory import VisualMemory
-from src.perception.encoder import CLIPEncoder
+from src.perception.accuracy import MIN_TOPK_AGREEMENT, cosine_agreement, topk_agreement
+from src.perception.backends import BACKENDS, MIN_COSINE_AGREEMENT
+from src.perception.encoder import PRECISIONS
 from src.retrieval.retriever import SceneRetriever
 from src.utils.timing import LatencyTracker
 
@@ -18,24 +21,155 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(me
 logger = logging.getLogger(__name__)
 
 NUM_ITERATIONS = 50
+NUM_SAMPLE_FRAMES = 32
+THROUGHPUT_REPEATS = 3
+
+
+def _sample_frames(video_path: Optional[str]) -> list[np.ndarray]:
+    """Load evenly spaced RGB frames from a video, or synthesize textured ones."""
+    if video_path is None:
+        rng = np.random.default_rng(0)
+        yy, xx = np.mgrid[0:480, 0:640]
+        frames = []
+        for i in range(NUM_SAMPLE_FRAMES):
+            wave = 80 * np.sin(xx / (9.0 + i)) * np.cos(yy / (13.0 + i))
+            noise = rng.normal(0, 15, (480, 640, 3))
+            frames.append((127 + wave[..., None] + noise).clip(0, 255).astype(np.uint8))
+        return frames
+
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for idx in np.linspace(0, max(total - 1, 0), NUM_SAMPLE_FRAMES).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def profile_encoders(
+    config: dict,
+    variants: list[tuple[str, dict]],
+    frames: list[np.ndarray],
+    top_k: int = 5,
+) -> None:
+    """Compare encoder variants against eager float32 torch on a fixed frame set.
+
+    Reports single-image latency, batch throughput, cosine drift and top-k
+    retrieval agreement, and whether each variant meets the accuracy bar.
+
+    Args:
+        config: Configuration dictionary.
+        variants: (label, perception overrides) pairs; the first is the reference.
+        frames: Fixed RGB frame set.
+        top_k: Neighbours per query for the retrieval agreement check.
+    """
+    reference = None
+    rows = []
+    for label, overrides in variants:
+        variant_config = {**config, "perception": {**config["perception"], **overrides}}
+        try:
+            encoder = build_encoder(variant_config)
+        except ImportError as e:
+            logger.warning("Skipping %s: %s", label, e)
+            continue
+
+        embeddings = encoder.encode_batch(frames)
+        if reference is None:
+            reference = embeddings
+        cosine = cosine_agreement(reference, embeddings)
+        topk = topk_agreement(reference, embeddings, k=top_k)
+
+        tracker = LatencyTracker()
+        for i in range(NUM_ITERATIONS):
+            t0 = time.perf_counter()
+            encoder.encode(frames[i % len(frames)])
+            tracker.record((time.perf_counter() - t0) * 1000)
 
+        t0 = time.perf_counter()
+        for _ in range(THROUGHPUT_REPEATS):
+            encoder.encode_batch(frames)
+        fps = THROUGHPUT_REPEATS * len(frames) / (time.perf_counter() - t0)
+
+        passed = cosine.mean() >= MIN_COSINE_AGREEMENT and topk.mean() >= MIN_TOPK_AGREEMENT
+        rows.append((label, tracker.summary(), fps, cosine, topk, passed))
+
+    width = 88
+    print("\n" + "=" * width)
+    print(f"ENCODER COMPARISON vs {variants[0][0]} ({len(frames)} frames, top-{top_k})")
+    print("=" * width)
+    print(
+        f"{'Variant':<20} {'Mean (ms)':>10} {'Batch fps':>10} {'Speedup':>8} "
+        f"{'Cos mean':>9} {'Cos min':>9} {'Top-k':>7} {'OK':>4}"
+    )
+    print("-" * width)
+    base_fps = rows[0][2] if rows else 0.0
+    for label, s, fps, cosine, topk, passed in rows:
+        print(
+            f"{label:<20} {s['mean_ms']:>10.2f} {fps:>10.1f} {fps / base_fps:>7.2f}x "
+            f"{cosine.mean():>9.5f} {cosine.min():>9.5f} {topk.mean():>7.3f} "
+            f"{'yes' if passed else 'NO':>4}"
+        )
+    print("=" * width)
+    print(
+        f"OK requires mean cosine >= {MIN_COSINE_AGREEMENT} and "
+        f"mean top-k agreement >= {MIN_TOPK_AGREEMENT}."
+    )
 
-def main() -> None:
-    config = load_config("config/benchmark.yaml")
 
-    encoder = CLIPEncoder(
-        model_name=config["perception"]["model_name"],
-        pretrained=config["perception"]["pretrained"],
-        device=config["perception"].get("device"),
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile encode, insert and query latency")
+    parser.add_argument("--config", default="config/benchmark.yaml")
+    parser.add_argument(
+        "--backends",
+        nargs="*",
+        default=None,
+        choices=BACKENDS,
+        help="Also compare these encoder backends against eager torch",
     )
-
-    mem_cfg = config["memory"]
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"],
-        vector_size=mem_cfg["vector_size"],
+    parser.add_argument(
+        "--precisions",
+        nargs="*",
+        default=None,
+        choices=PRECISIONS,
+        help="Also compare these eager torch precision modes against fp32",
+    )
+    parser.add_argument(
+        "--channels-last", action="store_true", help="Use channels_last for the precision variants"
     )
+    parser.add_argument("--top-k", type=int, default=5, help="Neighbours for retrieval agreement")
+    parser.add_argument("--video", default=None, help="Sample frames for the encoder comparison")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    variants = [("torch/fp32", {"backend": "torch", "precision": "fp32", "snapshot": False})]
+    for backend in args.backends or []:
+        if backend != "torch":
+            variants.append((backend, {"backend": backend, "precision": "fp32"}))
+    for precision in args.precisions or []:
+        if precision != "fp32" or args.channels_last:
+            label = f"torch/{precision}" + ("/nhwc" if args.channels_last else "")
+            variants.append(
+                (
+                    label,
+                    {
+                        "backend": "torch",
+                        "precision": precision,
+                        "channels_last": args.channels_last,
+                        "snapshot": False,
+                    },
+                )
+            )
+    if len(variants) > 1:
+        profile_encoders(config, variants, _sample_frames(args.video), top_k=args.top_k)
+
+    encoder = build_encoder(config)
+    qdrant = build_memory_client(config)
     memory = VisualMemory(client=qdrant, batch_size=1)
     retriever = SceneRetriever(client=qdrant, top_k=5, score_threshold=0.0)
 
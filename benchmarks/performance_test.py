@@ -5,8 +5,7 @@ import time
 
 import numpy as np
 
-from src.main import load_config
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.config import build_memory_client, load_config
 from src.memory.schemas import MemoryPayload
 from src.memory.visual_memory import VisualMemory
 from src.retrieval.retriever import SceneRetriever
@@ -18,57 +17,86 @@ logger = logging.getLogger(__name__)
 TOTAL_VECTORS = 10_000
 BATCH_SIZE = 100
 QUERY_INTERVAL = 1000
+THROUGHPUT_VECTORS = 2000
+
+
+def _random_embeddings(n: int, rng: np.random.Generator) -> np.ndarray:
+    emb = rng.standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def measure_insert_throughput(memory: VisualMemory, n: int = THROUGHPUT_VECTORS) -> tuple[float, float]:
+    """Points per second for per-point `store` vs columnar `store_many`."""
+    rng = np.random.default_rng(1)
+    embeddings = _random_embeddings(n, rng)
+    rooms = [f"room_{i % 10}" for i in range(n)]
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        memory.store(
+            embedding=embeddings[i],
+            payload=MemoryPayload(timestamp=time.time(), room_id=rooms[i]),
+        )
+    memory.flush()
+    per_point = n / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    memory.store_many(
+        embeddings,
+        MemoryPayload.bulk([time.time()] * n, room_id=rooms),
+        chunk_size=BATCH_SIZE,
+    )
+    columnar = n / (time.perf_counter() - t0)
+    return per_point, columnar
 
 
 def main() -> None:
     config = load_config("config/benchmark.yaml")
-    mem_cfg = config["memory"]
+    qdrant = build_memory_client(config, collection_suffix="_perf")
+    memory = VisualMemory(client=qdrant, batch_size=BATCH_SIZE)
+    retriever = SceneRetriever(client=qdrant, top_k=5, score_threshold=0.0)
 
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"] + "_perf",
-        vector_size=mem_cfg["vector_size"],
-    )
+    print(f"\nMeasuring insert throughput with {THROUGHPUT_VECTORS} vectors per path...")
+    per_point_pps, columnar_pps = measure_insert_throughput(memory)
+    qdrant.delete_collection()
+    qdrant = build_memory_client(config, collection_suffix="_perf")
     memory = VisualMemory(client=qdrant, batch_size=BATCH_SIZE)
     retriever = SceneRetriever(client=qdrant, top_k=5, score_threshold=0.0)
 
     insert_tracker = LatencyTracker()
     query_tracker = LatencyTracker()
+    rng = np.random.default_rng(0)
 
     print(f"\nInserting {TOTAL_VECTORS} vectors...")
 
-    for i in range(TOTAL_VECTORS):
-        emb = np.random.randn(512).astype(np.float32)
-        emb = emb / np.linalg.norm(emb)
-
-        payload = MemoryPayload(
-            timestamp=time.time(),
-            room_id=f"room_{i % 10}",
+    for start in range(0, TOTAL_VECTORS, QUERY_INTERVAL):
+        n = min(QUERY_INTERVAL, TOTAL_VECTORS - start)
+        embeddings = _random_embeddings(n, rng)
+        payloads = MemoryPayload.bulk(
+            [time.time()] * n,
+            room_id=[f"room_{i % 10}" for i in range(start, start + n)],
         )
 
         t0 = time.perf_counter()
-        memory.store(embedding=emb, payload=payload)
-        insert_tracker.record((time.perf_counter() - t0) * 1000)
-
-        if (i + 1) % QUERY_INTERVAL == 0:
-            memory.flush()
-            query_emb = np.random.randn(512).astype(np.float32)
-            query_emb = query_emb / np.linalg.norm(query_emb)
+        memory.store_many(embeddings, payloads, chunk_size=BATCH_SIZE)
+        insert_tracker.record((time.perf_counter() - t0) * 1000 / n)
 
-            t0 = time.perf_counter()
-            results = retriever.query(query_emb)
-            query_tracker.record((time.perf_counter() - t0) * 1000)
-
-            print(f"  [{i+1}/{TOTAL_VECTORS}] query_time={query_tracker.mean_ms:.2f}ms count={qdrant.count()}")
+        query_emb = _random_embeddings(1, rng)[0]
+        t0 = time.perf_counter()
+        retriever.query(query_emb)
+        query_tracker.record((time.perf_counter() - t0) * 1000)
 
-    memory.flush()
+        print(f"  [{start + n}/{TOTAL_VECTORS}] query_time={query_tracker.mean_ms:.2f}ms count={qdrant.count()}")
 
     print("\n" + "=" * 50)
     print("PERFORMANCE TEST RESULTS")
     print("=" * 50)
     print(f"Total vectors inserted: {TOTAL_VECTORS}")
-    print(f"Insert (buffered): mean={insert_tracker.mean_ms:.4f}ms")
+    print(f"Insert (columnar): mean={insert_tracker.mean_ms:.4f}ms per point")
+    print(
+        f"Insert throughput: store={per_point_pps:.0f} pts/s "
+        f"store_many={columnar_pps:.0f} pts/s ({columnar_pps / per_point_pps:.1f}x)"
+    )
     print(f"Query latency: mean={query_tracker.mean_ms:.2f}ms min={query_tracker.min_ms:.2f}ms max={query_tracker.max_ms:.2f}ms")
     print("=" * 50)
 
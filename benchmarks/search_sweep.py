@@ -0,0 +1,182 @@
+"""Sweep Qdrant index, quantization and search settings for latency vs recall.
+
+For each build configuration (HNSW `m`, quantization, vector datatype) a
+fresh collection is filled with clustered synthetic embeddings, and each
+search configuration (`hnsw_ef`, exact search, quantization oversampling
+and rescoring) is timed through `SceneRetriever`. Recall@k is measured
+against an exact brute-force baseline computed in NumPy.
+"""
+
+import argparse
+import itertools
+import logging
+import time
+from typing import Any, Optional
+
+import numpy as np
+from qdrant_client.models import CollectionStatus
+
+from src.config import build_memory_client, load_config
+from src.memory.qdrant_client import search_params_from_config
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+from src.utils.timing import LatencyTracker
+
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+NUM_CLUSTERS = 200
+CLUSTER_SPREAD = 1.0  # noise norm relative to the unit cluster centre
+QUERY_NOISE = 0.5  # a revisit differs from the stored view by this much
+INDEX_TIMEOUT_S = 300.0
+QUANTIZATION = {
+    "none": None,
+    "scalar": {"scalar": {"type": "int8", "always_ram": True}},
+    "binary": {"binary": {"always_ram": True}},
+    "product": {"product": {"compression": "x16", "always_ram": True}},
+}
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def clustered_embeddings(
+    n: int, num_queries: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return stored embeddings grouped around places, and revisit queries near them."""
+    centers = _normalize(rng.standard_normal((NUM_CLUSTERS, 512)))
+    labels = rng.integers(0, NUM_CLUSTERS, n)
+    noise = rng.standard_normal((n, 512)) / np.sqrt(512)
+    stored = _normalize(centers[labels] + CLUSTER_SPREAD * noise)
+    picks = rng.integers(0, n, num_queries)
+    noise = rng.standard_normal((num_queries, 512)) / np.sqrt(512)
+    queries = _normalize(stored[picks] + QUERY_NOISE * noise)
+    return stored, queries
+
+
+def exact_top_k(stored: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the exact top-k neighbours of each query."""
+    scores = queries @ stored.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def _wait_for_index(client: Any) -> Any:
+    deadline = time.monotonic() + INDEX_TIMEOUT_S
+    while True:
+        info = client.client.get_collection(client.collection_name)
+        if info.status == CollectionStatus.GREEN or time.monotonic() > deadline:
+            return info
+        time.sleep(0.5)
+
+
+def search_configs(
+    ef_values: list[int], quantized: bool, oversampling: list[float]
+) -> list[tuple[str, Optional[dict]]]:
+    """Search settings to time for one collection, labelled for the report."""
+    configs: list[tuple[str, Optional[dict]]] = [("exact", {"exact": True}), ("default", None)]
+    for ef in ef_values:
+        configs.append((f"ef={ef}", {"hnsw_ef": ef}))
+        if quantized:
+            configs.append((f"ef={ef} no-rescore", {"hnsw_ef": ef, "rescore": False}))
+            for factor in oversampling:
+                configs.append(
+                    (f"ef={ef} rescore x{factor:g}", {"hnsw_ef": ef, "rescore": True, "oversampling": factor})
+                )
+    return configs
+
+
+def sweep_build(
+    config: dict,
+    memory_overrides: dict,
+    stored: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    ef_values: list[int],
+    oversampling: list[float],
+) -> list[tuple[str, dict[str, float], float]]:
+    """Fill one collection and time every search configuration against it."""
+    sweep_config = {
+        **config,
+        "memory": {**config["memory"], "backend": "qdrant", "projection": {"enabled": False}, **memory_overrides},
+    }
+    client = build_memory_client(sweep_config, collection_suffix="_sweep")
+    client.delete_collection()
+    client = build_memory_client(sweep_config, collection_suffix="_sweep")
+
+    ids = VisualMemory(client=client).store_many(
+        stored,
+        MemoryPayload.bulk(np.arange(len(stored), dtype=np.float64), room_id="sweep"),
+    )
+    row_of = {point_id: row for row, point_id in enumerate(ids)}
+    info = _wait_for_index(client)
+    logger.warning(
+        "Indexed %s of %s vectors (status %s)",
+        info.indexed_vectors_count,
+        info.points_count,
+        info.status,
+    )
+
+    quantized = memory_overrides.get("quantization") is not None
+    rows = []
+    for label, search_cfg in search_configs(ef_values, quantized, oversampling):
+        retriever = SceneRetriever(
+            client=client,
+            top_k=k,
+            score_threshold=0.0,
+            search_params=search_params_from_config(search_cfg),
+        )
+        retriever.query(queries[0])  # warm-up
+        retriever.backend_latency = LatencyTracker()
+        hits = 0
+        for q, expected in zip(queries, truth):
+            found = {row_of[r.point_id] for r in retriever.query(q)}
+            hits += len(found & set(expected.tolist()))
+        rows.append((label, retriever.backend_latency.summary(), hits / (k * len(queries))))
+
+    client.delete_collection()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/benchmark.yaml")
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[16])
+    parser.add_argument("--ef-construct", type=int, default=100)
+    parser.add_argument("--quantization", nargs="+", default=["none", "scalar"], choices=list(QUANTIZATION))
+    parser.add_argument("--datatype", nargs="+", default=["float32"], choices=["float32", "float16"])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[1.0, 2.0])
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    rng = np.random.default_rng(0)
+    stored, queries = clustered_embeddings(args.size, args.queries, rng)
+    truth = exact_top_k(stored, queries, args.k)
+
+    print(f"\n{args.size} vectors, {args.queries} queries, recall@{args.k} vs exact NumPy search\n")
+    print(f"{'Build':<34}{'Search':<26}{'p50 (ms)':>10}{'p99 (ms)':>10}{'Recall':>9}")
+    print("-" * 89)
+    for m, quantization, datatype in itertools.product(args.m, args.quantization, args.datatype):
+        build = f"m={m} {quantization} {datatype}"
+        overrides = {
+            "hnsw": {"m": m, "ef_construct": args.ef_construct},
+            "quantization": QUANTIZATION[quantization],
+            "datatype": datatype,
+        }
+        try:
+            rows = sweep_build(config, overrides, stored, queries, truth, args.k, args.ef, args.oversampling)
+        except Exception as e:  # Qdrant may not be running
+            logger.warning("Skipping %s: %s", build, e)
+            continue
+        for label, latency, recall in rows:
+            print(f"{build:<34}{label:<26}{latency['p50_ms']:>10.2f}{latency['p99_ms']:>10.2f}{recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ try:
                     parameters=[
                         {"config_path": "config/default.yaml"},
                         {"room_id": "default"},
+                        {"camera_topics": ["/camera/image_raw"]},
+                        {"batch_window_ms": 20.0},
                     ],
                     output="screen",
                 ),
@@ -6,6 +6,7 @@ have no ROS dependency.
 
 import logging
 import time
+from typing import Sequence
 
 import numpy as np
 
@@ -22,18 +23,51 @@ except ImportError:
     ROS_AVAILABLE = False
     logger.info("ROS2 not available — node cannot be launched")
 
+
+def camera_id_from_topic(topic: str) -> str:
+    """Derive a camera id from its image topic, e.g. /front/image_raw -> front."""
+    parts = [p for p in topic.strip("/").split("/") if p]
+    if len(parts) > 1 and parts[-1].startswith("image"):
+        parts = parts[:-1]
+    return "_".join(parts) or topic
+
+
+def camera_ids_from_topics(topics: Sequence[str]) -> list[str]:
+    """Derive one camera id per image topic.
+
+    Raises:
+        ValueError: If two topics give the same id, e.g. /front/image_raw
+            and /front/image_rect. The `FrameGrouper` keys pending frames
+            by camera id, so such cameras would overwrite each other.
+    """
+    camera_ids = [camera_id_from_topic(t) for t in topics]
+    topics_by_id: dict[str, list[str]] = {}
+    for topic, camera_id in zip(topics, camera_ids):
+        topics_by_id.setdefault(camera_id, []).append(topic)
+    clashes = {cid: ts for cid, ts in topics_by_id.items() if len(ts) > 1}
+    if clashes:
+        raise ValueError(
+            f"Camera topics must map to distinct camera ids, got {clashes}; "
+            "rename the topics or list each one once"
+        )
+    return camera_ids
+
+
 if ROS_AVAILABLE:
     from cv_bridge import CvBridge
-    from PIL import Image
 
-    from src.memory.qdrant_client import QdrantMemoryClient
+    from src.config import (
+        build_encoder,
+        build_navigation,
+        build_memory_client,
+        build_novelty_gate,
+        build_retriever,
+        build_selector,
+        build_visual_memory,
+        load_config,
+    )
     from src.memory.schemas import MemoryPayload
-    from src.memory.visual_memory import VisualMemory
-    from src.navigation.controller import NavigationController
-    from src.perception.encoder import CLIPEncoder
-    from src.perception.keyframe_selector import KeyframeSelector
-    from src.retrieval.retriever import SceneRetriever
-    from src.main import load_config
+    from src.perception.frame_grouper import FrameGroup, FrameGrouper
 
     class VisualMemoryNode(Node):
         """ROS2 node that subscribes to camera images and publishes navigation decisions."""
@@ -43,71 +77,118 @@ if ROS_AVAILABLE:
 
             self.declare_parameter("config_path", "config/default.yaml")
             self.declare_parameter("room_id", "default")
+            self.declare_parameter("camera_topics", ["/camera/image_raw"])
+            self.declare_parameter("batch_window_ms", 20.0)
 
             config_path = self.get_parameter("config_path").value
             self.room_id = self.get_parameter("room_id").value
+            camera_topics = list(self.get_parameter("camera_topics").value)
+            window_ms = float(self.get_parameter("batch_window_ms").value)
             config = load_config(config_path)
 
-            self.encoder = CLIPEncoder(
-                model_name=config["perception"]["model_name"],
-                pretrained=config["perception"]["pretrained"],
-                device=config["perception"].get("device"),
-            )
-            self.selector = KeyframeSelector(
-                threshold=config["keyframe"]["threshold"]
-            )
-
-            mem_cfg = config["memory"]
-            qdrant = QdrantMemoryClient(
-                host=mem_cfg["qdrant_host"],
-                port=mem_cfg["qdrant_port"],
-                collection_name=mem_cfg["collection_name"],
-                vector_size=mem_cfg["vector_size"],
-            )
-            self.memory = VisualMemory(client=qdrant)
-            self.retriever = SceneRetriever(
-                client=qdrant,
-                top_k=config["retrieval"]["top_k"],
-                score_threshold=config["retrieval"]["score_threshold"],
-            )
-            self.nav = NavigationController(
-                confident_threshold=config["retrieval"]["confident_match"],
-                partial_threshold=config["retrieval"]["partial_match"],
-            )
+            # FrameGrouper batches across cameras in place of BatchingEncoder;
+            # groups are encoded on the executor thread, blocking the other
+            # camera callbacks until the forward pass returns.
+            self.encoder = build_encoder(config)
+            if config["perception"].get("batching", {}).get("enabled", False):
+                self.get_logger().warning(
+                    "perception.batching is ignored by the ROS node; "
+                    "frames are batched per camera group instead"
+                )
+
+            # Each camera keeps its own keyframe and pixel-gate state.
+            camera_ids = camera_ids_from_topics(camera_topics)
+            self.selectors = {cid: build_selector(config) for cid in camera_ids}
+            self.grouper = FrameGrouper(camera_ids, window_ms=window_ms)
+
+            qdrant = build_memory_client(config)
+            self.memory = build_visual_memory(config, qdrant)
+            self.retriever = build_retriever(config, qdrant)
+            self.memory.add_write_listener(self.retriever.observe_writes)
+            self.novelty = build_novelty_gate(config, self.memory)
+            self.nav = build_navigation(config)
 
             self.bridge = CvBridge()
 
-            self.image_sub = self.create_subscription(
-                ROSImage, "/camera/image_raw", self._image_callback, 10
-            )
+            self.image_subs = [
+                self.create_subscription(
+                    ROSImage,
+                    topic,
+                    lambda msg, cid=cid: self._image_callback(cid, msg),
+                    10,
+                )
+                for topic, cid in zip(camera_topics, camera_ids)
+            ]
+            # Releases partial groups when a camera drops out or lags.
+            self.group_timer = self.create_timer(window_ms / 2000.0, self._poll_group)
             self.decision_pub = self.create_publisher(
                 String, "/visual_memory/decision", 10
             )
 
-            self.get_logger().info("VisualMemoryNode initialized")
+            self.get_logger().info(
+                f"VisualMemoryNode initialized with cameras {camera_ids}"
+            )
+
+        def _image_callback(self, camera_id: str, msg: ROSImage) -> None:
+            frame = self.bridge.imgmsg_to_cv2(msg, desired_encoding="rgb8")
+            group = self.grouper.add(camera_id, frame)
+            if group is not None:
+                self._process_group(group)
+
+        def _poll_group(self) -> None:
+            group = self.grouper.poll()
+            if group is not None:
+                self._process_group(group)
+
+        def _process_group(self, group: FrameGroup) -> None:
+            """Encode every changed frame of a group in one forward pass."""
+            group = [
+                (cid, frame)
+                for cid, frame in group
+                if self.selectors[cid].should_encode(frame)
+            ]
+            if not group:
+                return
 
-        def _image_callback(self, msg: ROSImage) -> None:
-            cv_image = self.bridge.imgmsg_to_cv2(msg, desired_encoding="rgb8")
-            pil_image = Image.fromarray(cv_image)
+            embeddings = self.encoder.encode_batch([frame for _, frame in group])
+            for (cid, _), embedding in zip(group, embeddings):
+                self._handle_embedding(cid, embedding)
 
-            embedding = self.encoder.encode(pil_image)
-            is_kf, emb = self.selector.is_keyframe(embedding)
+        def _handle_embedding(self, camera_id: str, embedding: np.ndarray) -> None:
+            is_kf, emb = self.selectors[camera_id].is_keyframe(embedding)
 
             if not is_kf:
                 return
 
-            payload = MemoryPayload(timestamp=time.time(), room_id=self.room_id)
-            self.memory.store(embedding=emb, payload=payload)
-
             results = self.retriever.query(emb, room_id=self.room_id)
             decision = self.nav.decide(results)
 
+            payload = MemoryPayload(
+                timestamp=time.time(), room_id=self.room_id, camera_id=camera_id
+            )
+            if self.novelty is not None:
+                self.novelty.offer(emb, payload, results)
+            else:
+                self.memory.store(embedding=emb, payload=payload)
+
             msg_out = String()
             msg_out.data = decision.model_dump_json()
             self.decision_pub.publish(msg_out)
 
         def destroy_node(self) -> None:
-            self.memory.flush()
+            group = self.grouper.flush()
+            if group is not None:
+                self._process_group(group)
+            self.get_logger().info(
+                f"Encoded {self.grouper.groups} camera groups "
+                f"(mean size {self.grouper.mean_group_size:.2f})"
+            )
+            if self.novelty is not None:
+                self.novelty.flush()
+                self.get_logger().info(f"Novelty gate: {self.novelty.summary()}")
+            self.memory.close()
+            self.memory.client.close()
+            self.get_logger().info(f"Retrieval: {self.retriever.summary()}")
             super().destroy_node()
 
     def main() -> None:
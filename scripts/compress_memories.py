@@ -2,10 +2,10 @@
 
 import argparse
 import logging
+import time
 
-from src.main import load_config
-from src.memory.compressor import MemoryCompressor
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.config import build_memory_client, load_config
+from src.memory.compressor import COMPRESSION_MODES, MemoryCompressor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,31 +13,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PROGRESS_INTERVAL_S = 10.0
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Compress old visual memories")
     parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument(
+        "--drop-older-than-hours",
+        type=float,
+        default=None,
+        help="First drop whole time partitions older than this (needs memory.partitioning)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=COMPRESSION_MODES,
+        default=None,
+        help="Override compression.mode: thin every Nth, or delete all aged points",
+    )
     args = parser.parse_args()
 
     config = load_config(args.config)
-    mem_cfg = config["memory"]
+    qdrant = build_memory_client(config)
 
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"],
-        vector_size=mem_cfg["vector_size"],
-    )
+    if args.drop_older_than_hours is not None:
+        if not hasattr(qdrant, "drop_partitions"):
+            parser.error("--drop-older-than-hours needs memory.partitioning.enabled")
+        dropped = qdrant.drop_partitions(before=time.time() - args.drop_older_than_hours * 3600)
+        logger.info("Dropped %d partitions", len(dropped))
 
     comp_cfg = config["compression"]
     compressor = MemoryCompressor(
         client=qdrant,
         keep_every_nth=comp_cfg["keep_every_nth"],
         age_threshold_hours=comp_cfg["age_threshold_hours"],
+        mode=args.mode or comp_cfg.get("mode", "thin"),
+        page_size=comp_cfg.get("page_size", 1000),
+        delete_batch_size=comp_cfg.get("delete_batch_size", 1000),
     )
 
-    deleted = compressor.compress()
+    last_report = time.monotonic()
+
+    def report(scanned: int, deleted: int) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= PROGRESS_INTERVAL_S:
+            logger.info("Scanned %d aged points, deleted %d", scanned, deleted)
+            last_report = time.monotonic()
+
+    deleted = compressor.compress(progress=report)
     logger.info("Compression complete: %d points removed", deleted)
+    qdrant.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""Fit an embedding projection on existing memories and report recall@k."""
+
+import argparse
+import logging
+
+import numpy as np
+from qdrant_client.models import PointStruct
+
+from src.config import build_memory_client, load_config
+from src.memory.projection import PROJECTION_METHODS, EmbeddingProjection, recall_at_k
+from src.memory.qdrant_client import QdrantMemoryClient
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def read_points(qdrant: QdrantMemoryClient, limit: int) -> list:
+    """Scroll up to `limit` points with their vectors."""
+    points: list = []
+    offset = None
+    while len(points) < limit:
+        batch, offset = qdrant.client.scroll(
+            collection_name=qdrant.collection_name,
+            limit=min(256, limit - len(points)),
+            offset=offset,
+            with_vectors=True,
+            with_payload=False,
+        )
+        points.extend(batch)
+        if offset is None:
+            break
+    return points
+
+
+def build_projection(
+    method: str, embeddings: np.ndarray, dim: int, seed: int = 0
+) -> EmbeddingProjection:
+    if method == "pca":
+        return EmbeddingProjection.fit_pca(embeddings, dim)
+    return EmbeddingProjection.random_orthogonal(embeddings.shape[1], dim, seed=seed)
+
+
+def report(
+    embeddings: np.ndarray,
+    dims: list[int],
+    methods: list[str],
+    k: int,
+    num_queries: int,
+    holdout: float,
+) -> None:
+    """Print recall@k of each projection against full-dimension search.
+
+    Projections are fitted on a random split and evaluated on the held-out
+    rows, so PCA is scored on memories it has not seen.
+    """
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(embeddings))
+    n_test = max(k + 1, int(len(embeddings) * holdout))
+    test, train = embeddings[order[:n_test]], embeddings[order[n_test:]]
+
+    full_bytes = embeddings.shape[1] * 4
+    print(f"\n{len(train)} fit / {len(test)} held-out points, recall@{k} vs {embeddings.shape[1]}-d exact search")
+    print(f"{'Method':<8} {'Dim':>5} {'Recall':>8} {'Bytes/vec':>10} {'Saving':>8}")
+    print("-" * 43)
+    for method in methods:
+        for dim in dims:
+            try:
+                projection = build_projection(method, train, dim)
+            except ValueError as e:
+                logger.warning("Skipping %s-%d: %s", method, dim, e)
+                continue
+            recall = recall_at_k(test, projection.apply(test), k=k, num_queries=num_queries)
+            print(
+                f"{method:<8} {dim:>5} {recall:>8.4f} {dim * 4:>10} "
+                f"{1 - dim * 4 / full_bytes:>7.0%}"
+            )
+
+
+def migrate(
+    source: QdrantMemoryClient, config: dict, projection: EmbeddingProjection
+) -> None:
+    """Copy every point of `source` into the collection for `projection`."""
+    target = build_memory_client(config, projection=projection)
+    copied = 0
+    offset = None
+    while True:
+        batch, offset = source.client.scroll(
+            collection_name=source.collection_name,
+            limit=256,
+            offset=offset,
+            with_vectors=True,
+            with_payload=True,
+        )
+        if batch:
+            target.client.upsert(
+                collection_name=target.collection_name,
+                points=[
+                    PointStruct(
+                        id=p.id,
+                        vector=target.to_vector(np.asarray(p.vector, dtype=np.float32)),
+                        payload=p.payload,
+                    )
+                    for p in batch
+                ],
+            )
+            copied += len(batch)
+        if offset is None:
+            break
+    logger.info(
+        "Copied %d points from '%s' to '%s'",
+        copied,
+        source.collection_name,
+        target.collection_name,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit an embedding projection and report recall@k")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument("--dims", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument(
+        "--methods", nargs="+", default=list(PROJECTION_METHODS), choices=PROJECTION_METHODS
+    )
+    parser.add_argument("--k", type=int, default=10, help="Neighbours for recall@k")
+    parser.add_argument("--queries", type=int, default=500, help="Held-out queries to sample")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--limit", type=int, default=50_000, help="Max points to read")
+    parser.add_argument(
+        "--save", type=int, default=None, metavar="DIM", help="Fit on all points and save this dim"
+    )
+    parser.add_argument("--method", default="pca", choices=PROJECTION_METHODS, help="Method for --save")
+    parser.add_argument(
+        "--migrate", action="store_true", help="Copy all points into the projected collection after --save"
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    proj_path = config["memory"].get("projection", {}).get(
+        "path", "~/.cache/robot_visual_memory/projection.npz"
+    )
+    # Always read full-dimension vectors from the unprojected collection.
+    config["memory"]["projection"] = {"enabled": False}
+    source = build_memory_client(config)
+    points = read_points(source, args.limit)
+    if len(points) < args.k + 2:
+        parser.error(f"collection '{source.collection_name}' has too few points ({len(points)})")
+
+    embeddings = np.asarray([p.vector for p in points], dtype=np.float32)
+    report(embeddings, args.dims, args.methods, args.k, args.queries, args.holdout)
+
+    if args.save is None:
+        return
+    projection = build_projection(args.method, embeddings, args.save)
+    projection.save(proj_path)
+    if args.migrate:
+        migrate(source, config, projection)
+    print(
+        f"\nSaved {projection.method}-{projection.output_dim} projection (version "
+        f"{projection.version}). Set memory.projection.enabled to store into "
+        f"'{source.collection_name}{projection.collection_suffix}'."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ import logging
 
 from PIL import Image
 
-from src.main import load_config
-from src.memory.qdrant_client import QdrantMemoryClient
-from src.navigation.controller import NavigationController
-from src.perception.encoder import CLIPEncoder
-from src.retrieval.retriever import SceneRetriever
+from src.config import (
+    build_embedding_cache,
+    build_encoder,
+    build_navigation,
+    build_memory_client,
+    build_retriever,
+    load_config,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,34 +31,22 @@ def main() -> None:
 
     config = load_config(args.config)
 
-    encoder = CLIPEncoder(
-        model_name=config["perception"]["model_name"],
-        pretrained=config["perception"]["pretrained"],
-        device=config["perception"].get("device"),
-    )
-
-    mem_cfg = config["memory"]
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"],
-        vector_size=mem_cfg["vector_size"],
-    )
-    retriever = SceneRetriever(
-        client=qdrant,
-        top_k=args.top_k,
-        score_threshold=config["retrieval"]["score_threshold"],
-    )
-    nav = NavigationController(
-        confident_threshold=config["retrieval"]["confident_match"],
-        partial_threshold=config["retrieval"]["partial_match"],
-    )
+    embedding_cache = build_embedding_cache(config)
+    encoder = build_encoder(config, cache=embedding_cache)
+
+    qdrant = build_memory_client(config)
+    retriever = build_retriever(config, qdrant, top_k=args.top_k)
+    nav = build_navigation(config)
 
     image = Image.open(args.image).convert("RGB")
     embedding = encoder.encode(image)
 
+    if embedding_cache is not None:
+        logger.info("Embedding cache: %s", embedding_cache.summary())
+
     results = retriever.query(embedding, room_id=args.room, top_k=args.top_k)
     decision = nav.decide(results)
+    qdrant.close()
 
     print(f"\nNavigation Decision: {decision.action.value}")
     print(f"Confidence: {decision.confidence:.3f}")
@@ -3,8 +3,7 @@
 import argparse
 import logging
 
-from src.main import load_config
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.config import build_memory_client, load_config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,12 +28,7 @@ def main() -> None:
             print("Aborted.")
             return
 
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"],
-        vector_size=mem_cfg["vector_size"],
-    )
+    qdrant = build_memory_client(config)
     qdrant.delete_collection()
     logger.info("Collection reset complete")
 
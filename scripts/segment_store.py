@@ -0,0 +1,48 @@
+"""Inspect, compact, export or import the local segment store."""
+
+import argparse
+import logging
+
+from src.config import build_memory_client, load_config
+from src.memory.segment_store import copy_points
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def _with_backend(config: dict, backend: str) -> dict:
+    return {**config, "memory": {**config["memory"], "backend": backend}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped segment store")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument(
+        "command",
+        choices=["info", "compact", "export", "import"],
+        help="export copies segments into Qdrant; import copies Qdrant into segments",
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    segments = build_memory_client(_with_backend(config, "segments"))
+
+    if args.command == "compact":
+        reclaimed = segments.compact()
+        logger.info("Reclaimed %d deleted rows", reclaimed)
+    elif args.command == "export":
+        copy_points(segments, build_memory_client(_with_backend(config, "qdrant")))
+    elif args.command == "import":
+        copy_points(build_memory_client(_with_backend(config, "qdrant")), segments)
+
+    store = segments.client
+    print(f"\n{store.path}: {segments.count()} points in {len(store.segments)} segments")
+    for segment in store.segments:
+        print(f"  {segment.path.name}: {segment.count} rows, {segment.deleted_count} deleted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Configuration loading and component construction.
+
+This module is imported by every entry point, so it must stay cheap: it
+only depends on yaml at import time. Heavy dependencies (torch, open_clip,
+cv2, qdrant_client) are imported inside the builder that needs them, so a
+script that only talks to Qdrant never loads the CLIP stack.
+"""
+
+import os
+from typing import TYPE_CHECKING, Optional, Union
+
+import yaml
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient
+
+    from src.memory.novelty_gate import NoveltyGate
+    from src.memory.projection import EmbeddingProjection
+    from src.memory.qdrant_client import AsyncQdrantMemoryClient, MemoryClient
+    from src.memory.visual_memory import AsyncVisualMemory, VisualMemory
+    from src.navigation.controller import NavigationController
+    from src.perception.embedding_cache import EmbeddingCache
+    from src.perception.encoder import CLIPEncoder
+    from src.perception.frame_sampler import AdaptiveFrameSampler
+    from src.perception.keyframe_selector import KeyframeSelector
+    from src.retrieval.retriever import AsyncSceneRetriever, SceneRetriever
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "robot_visual_memory")
+
+
+def load_config(path: str = "config/default.yaml") -> dict:
+    """Load YAML configuration file."""
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def build_memory_client(
+    config: dict,
+    collection_suffix: str = "",
+    projection: Optional["EmbeddingProjection"] = None,
+) -> "MemoryClient":
+    """Create the memory client selected by `memory.backend`.
+
+    `qdrant` (the default) talks to a Qdrant server; `numpy` keeps the
+    collection in process memory and searches it by brute force;
+    `segments` persists it in memory-mapped files under
+    `memory.segments.path`.
+
+    With `memory.partitioning.enabled`, the Qdrant collection is split
+    into per-room and/or per-time-bucket collections.
+
+    Args:
+        config: Configuration dictionary.
+        collection_suffix: Appended to the configured collection name.
+        projection: Overrides the projection loaded from `memory.projection`.
+    """
+    from src.memory.projection import EmbeddingProjection
+
+    mem_cfg = config["memory"]
+    proj_cfg = mem_cfg.get("projection", {})
+    if projection is None and proj_cfg.get("enabled", False):
+        projection = EmbeddingProjection.load(proj_cfg["path"])
+    collection_name = mem_cfg["collection_name"] + collection_suffix
+
+    backend = mem_cfg.get("backend", "qdrant")
+    if backend == "numpy":
+        from src.memory.numpy_store import NumpyMemoryClient
+
+        np_cfg = mem_cfg.get("numpy", {})
+        return NumpyMemoryClient(
+            collection_name=collection_name,
+            vector_size=mem_cfg["vector_size"],
+            projection=projection,
+            dtype=np_cfg.get("dtype", "float32"),
+            initial_capacity=np_cfg.get("initial_capacity", 1024),
+        )
+    if backend == "segments":
+        from src.memory.segment_store import SegmentMemoryClient
+
+        seg_cfg = mem_cfg.get("segments", {})
+        return SegmentMemoryClient(
+            path=seg_cfg.get("path", os.path.join(DEFAULT_CACHE_DIR, "segments")),
+            collection_name=collection_name,
+            vector_size=mem_cfg["vector_size"],
+            projection=projection,
+            segment_capacity=seg_cfg.get("segment_capacity", 65536),
+        )
+    if backend != "qdrant":
+        raise ValueError(f"Unknown memory backend '{backend}'")
+
+    from src.memory.qdrant_client import QdrantMemoryClient
+
+    qdrant_args = dict(
+        host=mem_cfg["qdrant_host"],
+        port=mem_cfg["qdrant_port"],
+        collection_name=collection_name,
+        vector_size=mem_cfg["vector_size"],
+        quantization_config=mem_cfg.get("quantization"),
+        projection=projection,
+        hnsw_config=mem_cfg.get("hnsw"),
+        datatype=mem_cfg.get("datatype", "float32"),
+    )
+    part_cfg = mem_cfg.get("partitioning", {})
+    if part_cfg.get("enabled", False):
+        from src.memory.partitioning import PartitionedMemoryClient
+
+        return PartitionedMemoryClient(
+            **qdrant_args,
+            by_room=part_cfg.get("by_room", True),
+            time_bucket_hours=part_cfg.get("time_bucket_hours"),
+            fanout_workers=part_cfg.get("fanout_workers", 8),
+        )
+    return QdrantMemoryClient(**qdrant_args)
+
+
+async def build_async_memory_client(
+    config: dict,
+    client: Optional["AsyncQdrantClient"] = None,
+    collection_suffix: str = "",
+    projection: Optional["EmbeddingProjection"] = None,
+) -> "AsyncQdrantMemoryClient":
+    """Create an async Qdrant memory client and ensure its collection exists.
+
+    Only the `qdrant` backend without partitioning has an async variant.
+
+    Args:
+        config: Configuration dictionary.
+        client: Shared `AsyncQdrantClient`; one is created from
+            `memory.qdrant_host` / `qdrant_port` if not given.
+        collection_suffix: Appended to the configured collection name.
+        projection: Overrides the projection loaded from `memory.projection`.
+    """
+    from src.memory.projection import EmbeddingProjection
+    from src.memory.qdrant_client import AsyncQdrantMemoryClient
+
+    mem_cfg = config["memory"]
+    if mem_cfg.get("backend", "qdrant") != "qdrant":
+        raise ValueError(f"memory.backend '{mem_cfg['backend']}' has no async client")
+    if mem_cfg.get("partitioning", {}).get("enabled", False):
+        raise ValueError("memory.partitioning is not supported by the async client")
+    proj_cfg = mem_cfg.get("projection", {})
+    if projection is None and proj_cfg.get("enabled", False):
+        projection = EmbeddingProjection.load(proj_cfg["path"])
+
+    memory_client = AsyncQdrantMemoryClient(
+        host=mem_cfg["qdrant_host"],
+        port=mem_cfg["qdrant_port"],
+        collection_name=mem_cfg["collection_name"] + collection_suffix,
+        vector_size=mem_cfg["vector_size"],
+        quantization_config=mem_cfg.get("quantization"),
+        projection=projection,
+        hnsw_config=mem_cfg.get("hnsw"),
+        datatype=mem_cfg.get("datatype", "float32"),
+        client=client,
+    )
+    await memory_client.ensure_collection()
+    return memory_client
+
+
+def build_visual_memory(
+    config: dict, client: "MemoryClient"
+) -> "VisualMemory":
+    """Create the memory writer from the `memory.flush` section."""
+    from src.memory.visual_memory import VisualMemory
+
+    flush_cfg = config["memory"].get("flush", {})
+    return VisualMemory(
+        client=client,
+        batch_size=flush_cfg.get("batch_size", 64),
+        background=flush_cfg.get("background", False),
+        flush_interval_s=flush_cfg.get("interval_s", 1.0),
+        max_buffer=flush_cfg.get("max_buffer", 1024),
+        backpressure=flush_cfg.get("backpressure", "block"),
+    )
+
+
+def build_async_visual_memory(
+    config: dict, client: "AsyncQdrantMemoryClient"
+) -> "AsyncVisualMemory":
+    """Create the async memory writer; only `memory.flush.batch_size` applies."""
+    from src.memory.visual_memory import AsyncVisualMemory
+
+    flush_cfg = config["memory"].get("flush", {})
+    return AsyncVisualMemory(client=client, batch_size=flush_cfg.get("batch_size", 64))
+
+
+def build_novelty_gate(
+    config: dict, memory: Union["VisualMemory", "AsyncVisualMemory"]
+) -> Optional["NoveltyGate"]:
+    """Create the novelty gate if `memory.novelty.enabled` is set."""
+    novelty_cfg = config["memory"].get("novelty", {})
+    if not novelty_cfg.get("enabled", False):
+        return None
+
+    from src.memory.novelty_gate import NoveltyGate
+
+    return NoveltyGate(
+        memory,
+        threshold=novelty_cfg.get("threshold", 0.95),
+        refresh_batch_size=novelty_cfg.get("refresh_batch_size", 64),
+    )
+
+
+def build_embedding_cache(config: dict) -> Optional["EmbeddingCache"]:
+    """Create the embedding cache if `perception.cache.enabled` is set."""
+    perception = config["perception"]
+    cache_cfg = perception.get("cache", {})
+    if not cache_cfg.get("enabled", False):
+        return None
+
+    from src.perception.embedding_cache import EmbeddingCache
+
+    return EmbeddingCache(
+        namespace=f"{perception['model_name']}/{perception['pretrained']}",
+        max_entries=cache_cfg.get("max_entries", 10_000),
+        disk_dir=cache_cfg.get("disk_dir"),
+    )
+
+
+def build_encoder(
+    config: dict,
+    backend: Optional[str] = None,
+    cache: Optional["EmbeddingCache"] = None,
+) -> "CLIPEncoder":
+    """Create the CLIP encoder from the `perception` section.
+
+    Args:
+        config: Configuration dictionary.
+        backend: Overrides `perception.backend` when given.
+        cache: Optional embedding cache to attach.
+    """
+    from src.perception.encoder import CLIPEncoder
+
+    perception = config["perception"]
+    return CLIPEncoder(
+        model_name=perception["model_name"],
+        pretrained=perception["pretrained"],
+        device=perception.get("device"),
+        backend=backend or perception.get("backend", "torch"),
+        cache_dir=perception.get("cache_dir", DEFAULT_CACHE_DIR),
+        cache=cache,
+        snapshot=perception.get("snapshot", False),
+        precision=perception.get("precision", "fp32"),
+        channels_last=perception.get("channels_last", False),
+    )
+
+
+def build_selector(config: dict) -> "KeyframeSelector":
+    """Create the keyframe selector, with the pixel gate if enabled."""
+    from src.perception.keyframe_selector import KeyframeSelector
+
+    kf_cfg = config["keyframe"]
+    gate_cfg = kf_cfg.get("gate", {})
+    return KeyframeSelector(
+        threshold=kf_cfg["threshold"],
+        gate_threshold=gate_cfg["threshold"] if gate_cfg.get("enabled") else None,
+        gate_size=gate_cfg.get("size", 16),
+        history_size=kf_cfg.get("history_size", 1),
+    )
+
+
+def build_sampler(config: dict) -> Optional["AdaptiveFrameSampler"]:
+    """Create the adaptive frame sampler if `sampling.enabled` is set."""
+    samp_cfg = config.get("sampling", {})
+    if not samp_cfg.get("enabled", False):
+        return None
+
+    from src.perception.frame_sampler import AdaptiveFrameSampler
+
+    return AdaptiveFrameSampler(
+        min_stride=samp_cfg.get("min_stride", 1),
+        max_stride=samp_cfg.get("max_stride", 8),
+        threshold=config["keyframe"]["threshold"],
+    )
+
+
+def build_retriever(
+    config: dict, client: "MemoryClient", top_k: Optional[int] = None
+) -> "SceneRetriever":
+    """Create the scene retriever from the `retrieval` section."""
+    from src.memory.qdrant_client import search_params_from_config
+    from src.retrieval.retriever import SceneRetriever
+    from src.retrieval.room_cache import RoomCache
+
+    ret_cfg = config["retrieval"]
+    cache_cfg = ret_cfg.get("room_cache", {})
+    cache = None
+    if cache_cfg.get("enabled", False):
+        cache = RoomCache(client, max_bytes=int(cache_cfg.get("max_mb", 256) * 2**20))
+    return SceneRetriever(
+        client=client,
+        top_k=top_k if top_k is not None else ret_cfg["top_k"],
+        score_threshold=ret_cfg["score_threshold"],
+        cache=cache,
+        search_params=search_params_from_config(ret_cfg.get("search")),
+    )
+
+
+def build_async_retriever(
+    config: dict, client: "AsyncQdrantMemoryClient", top_k: Optional[int] = None
+) -> "AsyncSceneRetriever":
+    """Create the async scene retriever; `retrieval.room_cache` does not apply."""
+    from src.memory.qdrant_client import search_params_from_config
+    from src.retrieval.retriever import AsyncSceneRetriever
+
+    ret_cfg = config["retrieval"]
+    return AsyncSceneRetriever(
+        client=client,
+        top_k=top_k if top_k is not None else ret_cfg["top_k"],
+        score_threshold=ret_cfg["score_threshold"],
+        search_params=search_params_from_config(ret_cfg.get("search")),
+    )
+
+
+def build_navigation(config: dict) -> "NavigationController":
+    """Create the navigation controller from the `retrieval` thresholds."""
+    from src.navigation.controller import NavigationController
+
+    return NavigationController(
+        confident_threshold=config["retrieval"]["confident_match"],
+        partial_threshold=config["retrieval"]["partial_match"],
+    )
+
@@ -0,0 +1,414 @@
+"""Parallel ingestion of video files into visual memory.
+
+A process pool ingests whole videos independently: each worker loads the
+encoder once, selects keyframes and writes them through its own
+VisualMemory. Long videos can be split into frame-range segments. The
+workers only encode those; keyframe selection depends on every earlier
+frame of the video, so the parent process runs the selector over each
+video's segments in frame order and stores the keyframes. The stored
+keyframes are then the same as in one sequential pass.
+"""
+
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.config import (
+    build_embedding_cache,
+    build_encoder,
+    build_memory_client,
+    build_sampler,
+    build_selector,
+    build_visual_memory,
+)
+from src.memory.schemas import MemoryPayload
+from src.perception.frame_sampler import read_frames
+from src.perception.keyframe_selector import KeyframeSelector, frame_thumbnail
+
+if TYPE_CHECKING:
+    from src.perception.encoder import CLIPEncoder
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".webm", ".m4v")
+
+
+class VideoSegment(BaseModel):
+    """A frame range of one video to ingest."""
+
+    video_path: str
+    start_frame: int
+    end_frame: Optional[int] = None  # None reads to the end of the video
+
+    @property
+    def whole(self) -> bool:
+        """Whether the segment is an entire video."""
+        return self.start_frame == 0 and self.end_frame is None
+
+
+class SegmentResult(BaseModel):
+    """Counts and timing for one ingested segment."""
+
+    video_path: str
+    start_frame: int
+    frames: int
+    keyframes: int
+    elapsed_s: float
+
+
+class EncodedSegment(NamedTuple):
+    """Embeddings of every frame of a segment, for sequential keyframe selection."""
+
+    video_path: str
+    start_frame: int
+    embeddings: np.ndarray  # (frames, D)
+    thumbnails: Optional[np.ndarray]  # (frames, size, size) when the pixel gate is on
+    elapsed_s: float
+
+
+def expand_video_inputs(inputs: Iterable[str]) -> list[str]:
+    """Resolve files, directories and glob patterns to video paths.
+
+    Args:
+        inputs: Paths to video files or directories, or glob patterns.
+
+    Returns:
+        Sorted, de-duplicated list of video file paths.
+    """
+    paths: set[str] = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(
+                    os.path.join(root, f)
+                    for f in files
+                    if f.lower().endswith(VIDEO_EXTENSIONS)
+                )
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            matches = [m for m in glob.glob(item, recursive=True) if os.path.isfile(m)]
+            if not matches:
+                logger.warning("No videos match '%s'", item)
+            paths.update(matches)
+    return sorted(paths)
+
+
+def count_frames(video_path: str) -> int:
+    """Return the frame count reported by the container."""
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def plan_segments(video_paths: list[str], segment_frames: int = 0) -> list[VideoSegment]:
+    """Split videos into frame-range segments.
+
+    A video whose frame count is unknown stays whole. The last segment of
+    a split video reads to the end, in case the reported count is short.
+
+    Args:
+        video_paths: Videos to ingest.
+        segment_frames: Maximum frames per segment; 0 keeps videos whole.
+
+    Returns:
+        Segments in video and frame order.
+    """
+    segments = []
+    for path in video_paths:
+        total = count_frames(path) if segment_frames > 0 else 0
+        if segment_frames > 0 and total <= 0:
+            logger.warning("Cannot determine frame count of %s; ingesting whole", path)
+        starts = list(range(0, total, segment_frames)) if total > segment_frames else [0]
+        for start, end in zip(starts, starts[1:] + [None]):
+            segments.append(VideoSegment(video_path=path, start_frame=start, end_frame=end))
+    return segments
+
+
+class SegmentIngestor:
+    """Ingests video segments with one encoder and one memory buffer.
+
+    The encoder is loaded on first use, so a parent process that only
+    selects and stores keyframes of encoded segments never loads it.
+    """
+
+    def __init__(self, config: dict, room_id: str) -> None:
+        self.config = config
+        self.room_id = room_id
+        self._encoder = None
+        self.memory = build_visual_memory(config, build_memory_client(config))
+
+    @property
+    def encoder(self) -> "CLIPEncoder":
+        if self._encoder is None:
+            self._encoder = build_encoder(self.config, cache=build_embedding_cache(self.config))
+        return self._encoder
+
+    def _store_pending(self, embeddings: list[np.ndarray], timestamps: list[float]) -> None:
+        """Write buffered keyframes with one columnar upsert and clear the lists."""
+        if not embeddings:
+            return
+        self.memory.store_many(
+            np.stack(embeddings),
+            MemoryPayload.bulk(timestamps, room_id=self.room_id),
+        )
+        embeddings.clear()
+        timestamps.clear()
+
+    def run(self, segment: VideoSegment) -> Union[SegmentResult, EncodedSegment]:
+        """Ingest a whole video, or only encode a segment of a split one."""
+        return self.ingest(segment) if segment.whole else self.encode(segment)
+
+    def ingest(self, segment: VideoSegment) -> SegmentResult:
+        """Ingest a whole video: gate, sample, encode, select and store.
+
+        Args:
+            segment: The video, as a segment from frame 0 to the end.
+
+        Returns:
+            SegmentResult with frame and keyframe counts.
+        """
+        import cv2
+
+        if not segment.whole:
+            raise ValueError("ingest() takes whole videos; encode() split segments")
+        t0 = time.perf_counter()
+        selector = build_selector(self.config)
+        sampler = build_sampler(self.config)
+
+        cap = cv2.VideoCapture(segment.video_path)
+        frames = sampler.frames(cap) if sampler is not None else read_frames(cap)
+
+        frame_count = 0
+        keyframe_count = 0
+        pending: list[np.ndarray] = []
+        pending_ts: list[float] = []
+        for _, frame in frames:
+            frame_count += 1
+            if not selector.should_encode(frame):
+                if sampler is not None:
+                    sampler.update(False, 0.0)
+                continue
+
+            is_kf, emb = selector.is_keyframe(self.encoder.encode(frame, bgr=True))
+            if sampler is not None:
+                sampler.update(is_kf, selector.last_distance)
+            if not is_kf:
+                continue
+
+            keyframe_count += 1
+            pending.append(emb)
+            pending_ts.append(time.time())
+            if len(pending) >= self.memory.batch_size:
+                self._store_pending(pending, pending_ts)
+
+        cap.release()
+        self._store_pending(pending, pending_ts)
+        if sampler is not None:
+            logger.info("Frame sampling: %s", sampler.summary())
+        if self.encoder.cache is not None:
+            logger.info("Embedding cache: %s", self.encoder.cache.summary())
+
+        elapsed = time.perf_counter() - t0
+        logger.info(
+            "Ingested %s: %d frames, %d keyframes in %.1fs",
+            segment.video_path,
+            frame_count,
+            keyframe_count,
+            elapsed,
+        )
+        return SegmentResult(
+            video_path=segment.video_path,
+            start_frame=0,
+            frames=frame_count,
+            keyframes=keyframe_count,
+            elapsed_s=elapsed,
+        )
+
+    def encode(self, segment: VideoSegment) -> EncodedSegment:
+        """Encode every frame of a segment of a split video.
+
+        Gating and sampling depend on earlier frames, so every frame is
+        encoded; with the pixel gate on, its thumbnails are returned too
+        and `select` applies the gate in order.
+
+        Args:
+            segment: Frame range to encode.
+
+        Returns:
+            EncodedSegment with one embedding per frame.
+        """
+        import cv2
+
+        t0 = time.perf_counter()
+        gate = build_selector(self.config)
+        cap = cv2.VideoCapture(segment.video_path)
+        if segment.start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, segment.start_frame)
+
+        embeddings: list[np.ndarray] = []
+        thumbnails: list[np.ndarray] = []
+        for frame_number, frame in read_frames(cap):
+            index = segment.start_frame + frame_number - 1
+            if segment.end_frame is not None and index >= segment.end_frame:
+                break
+            if gate.gate_threshold is not None:
+                thumbnails.append(frame_thumbnail(frame, gate.gate_size))
+            embeddings.append(self.encoder.encode(frame, bgr=True))
+        cap.release()
+
+        elapsed = time.perf_counter() - t0
+        logger.info(
+            "Encoded %s [%d, %s): %d frames in %.1fs",
+            segment.video_path,
+            segment.start_frame,
+            segment.end_frame,
+            len(embeddings),
+            elapsed,
+        )
+        return EncodedSegment(
+            video_path=segment.video_path,
+            start_frame=segment.start_frame,
+            embeddings=np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1),
+            thumbnails=np.asarray(thumbnails) if gate.gate_threshold is not None else None,
+            elapsed_s=elapsed,
+        )
+
+    def select(self, encoded: EncodedSegment, selector: KeyframeSelector) -> SegmentResult:
+        """Select and store the keyframes of an encoded segment.
+
+        Args:
+            encoded: Output of `encode`.
+            selector: The video's selector, already fed every earlier
+                segment of the video in frame order.
+
+        Returns:
+            SegmentResult with frame and keyframe counts.
+        """
+        t0 = time.perf_counter()
+        keyframe_count = 0
+        pending: list[np.ndarray] = []
+        pending_ts: list[float] = []
+        for i, embedding in enumerate(encoded.embeddings):
+            if encoded.thumbnails is not None and not selector.passes_gate(encoded.thumbnails[i]):
+                continue
+            is_kf, emb = selector.is_keyframe(embedding)
+            if not is_kf:
+                continue
+            keyframe_count += 1
+            pending.append(emb)
+            pending_ts.append(time.time())
+            if len(pending) >= self.memory.batch_size:
+                self._store_pending(pending, pending_ts)
+        self._store_pending(pending, pending_ts)
+
+        return SegmentResult(
+            video_path=encoded.video_path,
+            start_frame=encoded.start_frame,
+            frames=len(encoded.embeddings),
+            keyframes=keyframe_count,
+            elapsed_s=encoded.elapsed_s + time.perf_counter() - t0,
+        )
+
+
+_worker: Optional[SegmentIngestor] = None
+
+
+def _init_worker(config: dict, room_id: str, num_threads: int) -> None:
+    global _worker
+    import torch
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+    )
+    # Split cores between workers instead of oversubscribing them.
+    torch.set_num_threads(num_threads)
+    _worker = SegmentIngestor(config, room_id)
+
+
+def _run_in_worker(segment: VideoSegment) -> Union[SegmentResult, EncodedSegment]:
+    return _worker.run(segment)
+
+
+def ingest_videos(
+    video_paths: list[str],
+    config: dict,
+    room_id: str,
+    workers: int = 1,
+    segment_frames: int = 0,
+) -> dict[str, float]:
+    """Ingest videos, in parallel across processes when `workers` > 1.
+
+    Segments of split videos are encoded by the workers, and their
+    keyframes selected and stored here, one video's segments in order.
+    Adaptive frame sampling only applies to videos ingested whole.
+
+    Args:
+        video_paths: Videos to ingest.
+        config: Configuration dictionary.
+        room_id: Room identifier stored with every keyframe.
+        workers: Number of worker processes.
+        segment_frames: Maximum frames per segment; 0 keeps videos whole.
+
+    Returns:
+        Summary with totals and aggregate frames/keyframes per second.
+    """
+    segments = plan_segments(video_paths, segment_frames)
+    if build_sampler(config) is not None and not all(s.whole for s in segments):
+        logger.warning("Frame sampling is skipped for videos split into segments")
+    logger.info(
+        "Ingesting %d videos as %d segments with %d workers",
+        len(video_paths),
+        len(segments),
+        workers,
+    )
+
+    t0 = time.perf_counter()
+    ingestor = SegmentIngestor(config, room_id)
+    selectors: dict[str, KeyframeSelector] = {}
+
+    def collect(item: Union[SegmentResult, EncodedSegment]) -> SegmentResult:
+        if isinstance(item, SegmentResult):
+            return item
+        if item.start_frame == 0:
+            selectors.clear()  # the previous split video is done
+            selectors[item.video_path] = build_selector(config)
+        return ingestor.select(item, selectors[item.video_path])
+
+    if workers <= 1:
+        results = [collect(ingestor.run(segment)) for segment in segments]
+    else:
+        num_threads = max(1, (os.cpu_count() or workers) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config, room_id, num_threads),
+        ) as pool:
+            # map yields in segment order, so each split video is selected in order.
+            results = [collect(item) for item in pool.map(_run_in_worker, segments)]
+    elapsed = time.perf_counter() - t0
+
+    frames = sum(r.frames for r in results)
+    keyframes = sum(r.keyframes for r in results)
+    return {
+        "videos": len(video_paths),
+        "segments": len(segments),
+        "frames": frames,
+        "keyframes": keyframes,
+        "elapsed_s": round(elapsed, 2),
+        "frames_per_s": round(frames / elapsed, 2) if elapsed else 0.0,
+        "keyframes_per_s": round(keyframes / elapsed, 2) if elapsed else 0.0,
+    }
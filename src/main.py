@@ -1,24 +1,40 @@
 """Main entry point: CLI runner for the visual memory pipeline."""
 
 import argparse
+import asyncio
 import logging
 import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Sequence
 
-import cv2
 import numpy as np
-import yaml
-from PIL import Image
 
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.config import (
+    build_async_memory_client,
+    build_async_retriever,
+    build_async_visual_memory,
+    build_embedding_cache,
+    build_encoder,
+    build_navigation,
+    build_memory_client,
+    build_novelty_gate,
+    build_retriever,
+    build_sampler,
+    build_selector,
+    build_visual_memory,
+    load_config,
+)
 from src.memory.schemas import MemoryPayload
-from src.memory.visual_memory import VisualMemory
-from src.navigation.controller import NavigationController
-from src.perception.encoder import CLIPEncoder
+from src.perception.frame_sampler import AdaptiveFrameSampler, read_frames
 from src.perception.keyframe_selector import KeyframeSelector
 from src.retrieval.change_detector import ChangeDetector
-from src.retrieval.retriever import SceneRetriever
+from src.utils.stages import StagedPipeline
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +47,25 @@ def _signal_handler(sig: int, frame: object) -> None:
     _shutdown = True
 
 
-def load_config(path: str = "config/default.yaml") -> dict:
-    """Load YAML configuration file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+def _gate_frames(
+    frames: Iterator[tuple[int, np.ndarray]],
+    selector: KeyframeSelector,
+    sampler: Optional[AdaptiveFrameSampler] = None,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Drop frames rejected by the selector's pixel gate.
+
+    Gated frames count as unchanged for the sampler, widening its stride.
+    """
+    for frame_number, frame in frames:
+        if selector.should_encode(frame):
+            yield frame_number, frame
+        elif sampler is not None:
+            sampler.update(False, 0.0)
+
+
+def _per_frame(fn: Callable[[Any], Any]) -> Callable[[tuple[int, Any]], tuple[int, Any]]:
+    """Lift a function over the value of a (frame_number, value) pair."""
+    return lambda item: (item[0], fn(item[1]))
 
 
 def run_pipeline(video_path: str, room_id: str, config: dict) -> None:
@@ -48,32 +79,23 @@ def run_pipeline(video_path: str, room_id: str, config: dict) -> None:
     signal.signal(signal.SIGINT, _signal_handler)
     signal.signal(signal.SIGTERM, _signal_handler)
 
-    # Initialize components
-    encoder = CLIPEncoder(
-        model_name=config["perception"]["model_name"],
-        pretrained=config["perception"]["pretrained"],
-        device=config["perception"].get("device"),
-    )
-    selector = KeyframeSelector(threshold=config["keyframe"]["threshold"])
+    if config.get("pipeline", {}).get("mode") == "async":
+        asyncio.run(run_pipeline_async(video_path, room_id, config))
+        return
 
-    mem_cfg = config["memory"]
-    qdrant = QdrantMemoryClient(
-        host=mem_cfg["qdrant_host"],
-        port=mem_cfg["qdrant_port"],
-        collection_name=mem_cfg["collection_name"],
-        vector_size=mem_cfg["vector_size"],
-        quantization_config=mem_cfg.get("quantization"),
-    )
-    memory = VisualMemory(client=qdrant)
-    retriever = SceneRetriever(
-        client=qdrant,
-        top_k=config["retrieval"]["top_k"],
-        score_threshold=config["retrieval"]["score_threshold"],
-    )
-    nav = NavigationController(
-        confident_threshold=config["retrieval"]["confident_match"],
-        partial_threshold=config["retrieval"]["partial_match"],
-    )
+    import cv2
+
+    # Initialize components
+    embedding_cache = build_embedding_cache(config)
+    encoder = build_encoder(config, cache=embedding_cache)
+    selector = build_selector(config)
+
+    qdrant = build_memory_client(config)
+    memory = build_visual_memory(config, qdrant)
+    retriever = build_retriever(config, qdrant)
+    memory.add_write_listener(retriever.observe_writes)
+    novelty = build_novelty_gate(config, memory)
+    nav = build_navigation(config)
     change_detector = ChangeDetector(
         ema_alpha=config["change_detection"]["ema_alpha"],
         change_threshold=config["change_detection"]["change_threshold"],
@@ -85,55 +107,277 @@ def run_pipeline(video_path: str, room_id: str, config: dict) -> None:
         logger.error("Cannot open video: %s", video_path)
         sys.exit(1)
 
+    pipe_cfg = config.get("pipeline", {})
+    mode = pipe_cfg.get("mode", "serial")
+    log_interval = pipe_cfg.get("log_interval", 100)
+
+    sampler = build_sampler(config)
+    source = sampler.frames(cap) if sampler is not None else read_frames(cap)
+
+    # Frames rejected by the pixel gate never reach the encoder. In staged
+    # mode the gate runs on the decode thread.
+    frames = _gate_frames(source, selector, sampler)
+
+    # OpenCV frames go straight to the tensor preprocessing path, no PIL.
+    preprocess = partial(encoder.preprocess_array, bgr=True)
+
+    batch_cfg = config["perception"].get("batching", {})
+    batcher = None
+    staged = None
+    if mode == "staged":
+        if batch_cfg.get("enabled", False):
+            from src.perception.batching_encoder import BatchingEncoder
+
+            # Encode futures queue up behind the consumer, so up to
+            # queue_size frames can share one forward pass.
+            batcher = BatchingEncoder(
+                encoder,
+                max_batch_size=batch_cfg.get("max_batch_size", 16),
+                max_wait_ms=batch_cfg.get("max_wait_ms", 10.0),
+            )
+            encode_stage = ("encode", _per_frame(batcher.submit))
+        else:
+            encode_stage = ("encode", _per_frame(encoder.encode))
+        staged = StagedPipeline(
+            source=frames,
+            stages=[("preprocess", _per_frame(preprocess)), encode_stage],
+            source_name="decode",
+            queue_size=pipe_cfg.get("queue_size", 8),
+            should_stop=lambda: _shutdown,
+        )
+        embeddings = iter(staged)
+        if batcher is not None:
+            embeddings = ((n, future.result()) for n, future in embeddings)
+    elif mode == "serial":
+        if batch_cfg.get("enabled", False):
+            logger.warning("perception.batching requires pipeline.mode=staged")
+        embeddings = ((n, encoder.encode(f, bgr=True)) for n, f in frames)
+    else:
+        raise ValueError(f"Unknown pipeline mode: {mode}")
+
     frame_count = 0
+    encoded_count = 0
     keyframe_count = 0
 
-    logger.info("Processing video: %s (room=%s)", video_path, room_id)
+    logger.info(
+        "Processing video: %s (room=%s, mode=%s)", video_path, room_id, mode
+    )
 
-    while not _shutdown:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    try:
+        for frame_count, embedding in embeddings:
+            if _shutdown:
+                break
+
+            encoded_count += 1
+            if staged is not None and encoded_count % log_interval == 0:
+                logger.info("Queue depth: %s", staged.queue_depths())
+
+            is_kf, emb = selector.is_keyframe(embedding)
+            if sampler is not None:
+                sampler.update(is_kf, selector.last_distance)
+            if not is_kf:
+                continue
+
+            keyframe_count += 1
+            ts = time.time()
+
+            # Retrieve before storing, so the keyframe cannot match itself
+            results = retriever.query(emb, room_id=room_id)
+            decision = nav.decide(results)
+
+            # Store
+            payload = MemoryPayload(timestamp=ts, room_id=room_id)
+            if novelty is not None:
+                novelty.offer(emb, payload, results)
+            else:
+                memory.store(embedding=emb, payload=payload)
+
+            # Change detection
+            scores = [r.score for r in results]
+            change = change_detector.update(scores)
+
+            logger.info(
+                "Frame %d | KF %d | %s (score=%.3f) | changed=%s",
+                frame_count,
+                keyframe_count,
+                decision.action.value,
+                decision.top_score,
+                change.changed,
+            )
+    finally:
+        if staged is not None:
+            staged.close()
+        if batcher is not None:
+            batcher.close()
+
+    # Flush remaining buffer and stop the writer thread
+    if novelty is not None:
+        novelty.flush()
+    memory.close()
+    qdrant.close()
+    if selector.gate_threshold is not None:
+        # Trailing frames may have been gated and never reached the loop.
+        frame_count = max(frame_count, selector.frames_checked)
+    cap.release()
 
-        frame_count += 1
-        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        embedding = encoder.encode(image)
+    logger.info(
+        "Done. Processed %d frames, %d keyframes.", frame_count, keyframe_count
+    )
+    if sampler is not None:
+        logger.info("Frame sampling: %s", sampler.summary())
+    if embedding_cache is not None:
+        logger.info("Embedding cache: %s", embedding_cache.summary())
+    logger.info("Retrieval: %s", retriever.summary())
+    if novelty is not None:
+        logger.info("Novelty gate: %s", novelty.summary())
+    if selector.gate_threshold is not None:
+        logger.info(
+            "Pixel gate skipped encoding for %d of %d frames (%.1f%%)",
+            selector.frames_gated,
+            selector.frames_checked,
+            100 * selector.gated_fraction,
+        )
 
-        is_kf, emb = selector.is_keyframe(embedding)
-        if not is_kf:
-            continue
 
-        keyframe_count += 1
-        ts = time.time()
+async def run_pipeline_async(
+    video_path: str,
+    room_id: str,
+    config: dict,
+    qdrant: Optional["AsyncQdrantClient"] = None,
+) -> None:
+    """Run the pipeline on a video file with asyncio memory I/O.
 
-        # Store
-        payload = MemoryPayload(timestamp=ts, room_id=room_id)
-        memory.store(embedding=emb, payload=payload)
+    Decoding and encoding run on a single-thread executor, one frame
+    ahead of the loop: while a keyframe is queried and stored, the next
+    frame is already being encoded, and a full store batch is upserted in
+    the background. The adaptive sampler therefore sees keyframe feedback
+    one frame late, as in staged mode.
 
-        # Retrieve and decide
-        results = retriever.query(emb, room_id=room_id)
-        decision = nav.decide(results)
+    Args:
+        video_path: Path to video file.
+        room_id: Room identifier for metadata.
+        config: Configuration dictionary.
+        qdrant: Shared async Qdrant client, so several pipelines on one
+            event loop use one connection pool. Created if not given.
+    """
+    import cv2
 
-        # Change detection
-        scores = [r.score for r in results]
-        change = change_detector.update(scores)
+    embedding_cache = build_embedding_cache(config)
+    encoder = build_encoder(config, cache=embedding_cache)
+    selector = build_selector(config)
 
-        logger.info(
-            "Frame %d | KF %d | %s (score=%.3f) | changed=%s",
-            frame_count,
-            keyframe_count,
-            decision.action.value,
-            decision.top_score,
-            change.changed,
-        )
+    client = await build_async_memory_client(config, client=qdrant)
+    memory = build_async_visual_memory(config, client)
+    retriever = build_async_retriever(config, client)
+    novelty = build_novelty_gate(config, memory)
+    nav = build_navigation(config)
+    change_detector = ChangeDetector(
+        ema_alpha=config["change_detection"]["ema_alpha"],
+        change_threshold=config["change_detection"]["change_threshold"],
+    )
 
-    # Flush remaining buffer
-    memory.flush()
-    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.error("Cannot open video: %s", video_path)
+        await client.close()
+        return
+
+    sampler = build_sampler(config)
+    source = sampler.frames(cap) if sampler is not None else read_frames(cap)
+    frames = _gate_frames(source, selector, sampler)
+
+    def encode_next() -> Optional[tuple[int, np.ndarray]]:
+        item = next(frames, None)
+        if item is None:
+            return None
+        return item[0], encoder.encode(item[1], bgr=True)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"encode-{room_id}")
+    frame_count = 0
+    keyframe_count = 0
+
+    logger.info("Processing video: %s (room=%s, mode=async)", video_path, room_id)
+
+    pending = loop.run_in_executor(executor, encode_next)
+    try:
+        while not _shutdown:
+            item = await pending
+            if item is None:
+                break
+            # Encode the next frame while this one is queried and stored.
+            pending = loop.run_in_executor(executor, encode_next)
+            frame_count, embedding = item
+
+            is_kf, emb = selector.is_keyframe(embedding)
+            if sampler is not None:
+                sampler.update(is_kf, selector.last_distance)
+            if not is_kf:
+                continue
+
+            keyframe_count += 1
+            ts = time.time()
+
+            # Retrieve before storing, so the keyframe cannot match itself
+            results = await retriever.query(emb, room_id=room_id)
+            decision = nav.decide(results)
+
+            payload = MemoryPayload(timestamp=ts, room_id=room_id)
+            if novelty is not None:
+                await novelty.offer_async(emb, payload, results)
+            else:
+                await memory.store(embedding=emb, payload=payload)
+
+            change = change_detector.update([r.score for r in results])
+
+            logger.info(
+                "[%s] Frame %d | KF %d | %s (score=%.3f) | changed=%s",
+                room_id,
+                frame_count,
+                keyframe_count,
+                decision.action.value,
+                decision.top_score,
+                change.changed,
+            )
+    finally:
+        # The prefetched encode still owns the capture; let it finish.
+        await asyncio.gather(pending, return_exceptions=True)
+        executor.shutdown()
+        cap.release()
+
+    if novelty is not None:
+        await novelty.flush_async()
+    await memory.close()
+    await client.close()
+    if selector.gate_threshold is not None:
+        frame_count = max(frame_count, selector.frames_checked)
 
     logger.info(
-        "Done. Processed %d frames, %d keyframes.", frame_count, keyframe_count
+        "[%s] Done. Processed %d frames, %d keyframes.", room_id, frame_count, keyframe_count
     )
+    logger.info("[%s] Retrieval: %s", room_id, retriever.summary())
+    if novelty is not None:
+        logger.info("[%s] Novelty gate: %s", room_id, novelty.summary())
+
+
+async def run_streams_async(streams: Sequence[tuple[str, str]], config: dict) -> None:
+    """Run one async pipeline per (video_path, room_id) on one event loop.
+
+    All pipelines share one `AsyncQdrantClient`. Each loads its own encoder
+    and encodes on its own executor thread.
+    """
+    from qdrant_client import AsyncQdrantClient
+
+    mem_cfg = config["memory"]
+    qdrant = AsyncQdrantClient(host=mem_cfg["qdrant_host"], port=mem_cfg["qdrant_port"])
+    try:
+        # Create the shared collection once, before the pipelines race to.
+        await build_async_memory_client(config, client=qdrant)
+        await asyncio.gather(
+            *(run_pipeline_async(video, room, config, qdrant=qdrant) for video, room in streams)
+        )
+    finally:
+        await qdrant.close()
 
 
 def main() -> None:
@@ -141,8 +385,12 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="Robot Visual Memory — process video through visual memory pipeline"
     )
-    parser.add_argument("--video", required=True, help="Path to input video file")
-    parser.add_argument("--room", default="default", help="Room identifier")
+    parser.add_argument(
+        "--video", required=True, nargs="+", help="Path to input video file(s)"
+    )
+    parser.add_argument(
+        "--room", nargs="+", default=["default"], help="Room identifier, or one per video"
+    )
     parser.add_argument(
         "--config", default="config/default.yaml", help="Path to config YAML"
     )
@@ -156,7 +404,17 @@ def main() -> None:
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
 
-    run_pipeline(args.video, args.room, config)
+    if len(args.room) not in (1, len(args.video)):
+        parser.error("--room takes one value or one per --video")
+    rooms = args.room * len(args.video) if len(args.room) == 1 else args.room
+    if len(args.video) == 1:
+        run_pipeline(args.video[0], rooms[0], config)
+        return
+    if config.get("pipeline", {}).get("mode") != "async":
+        parser.error("several --video inputs require pipeline.mode: async")
+    signal.signal(signal.SIGINT, _signal_handler)
+    signal.signal(signal.SIGTERM, _signal_handler)
+    asyncio.run(run_streams_async(list(zip(args.video, rooms)), config))
 
 
 if __name__ == "__main__":
@@ -2,41 +2,121 @@
 
 import logging
 import time
+from typing import Any, Callable, Optional
 
-from qdrant_client.models import FieldCondition, Filter, Range
+from qdrant_client.models import FieldCondition, Filter, FilterSelector, OrderBy, Range
 
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.memory.qdrant_client import MemoryClient
 
 logger = logging.getLogger(__name__)
 
+COMPRESSION_MODES = ("thin", "retention")
+
+# Called after each scrolled page with (points scanned, points deleted) so far.
+ProgressCallback = Callable[[int, int], None]
+
+
+class _ThinningCursor:
+    """Walks aged points in timestamp order and picks all but every Nth to delete.
+
+    Pages are scrolled with `order_by` on `timestamp`, which has no next
+    offset: each page starts at the last timestamp seen and skips the
+    points already seen at that timestamp, asking for that many more so a
+    full page always brings new points. Only that set is remembered, so
+    memory does not grow with the number of points scanned.
+    """
+
+    def __init__(self, keep_every_nth: int, page_size: int) -> None:
+        self.keep_every_nth = keep_every_nth
+        self.page_size = page_size
+        self.scanned = 0
+        self.done = False
+        self._start_from: Optional[float] = None
+        self._seen_at_start: set[Any] = set()
+
+    def scroll_args(self) -> dict[str, Any]:
+        """Arguments of the next `scroll`: timestamps only, no vectors."""
+        return {
+            "limit": self.page_size + len(self._seen_at_start),
+            "with_payload": ["timestamp"],
+            "with_vectors": False,
+            "order_by": OrderBy(key="timestamp", start_from=self._start_from),
+        }
+
+    def advance(self, records: list[Any]) -> list[Any]:
+        """Consume a scrolled page and return the ids of its points to delete."""
+        self.done = len(records) < self.page_size + len(self._seen_at_start)
+        fresh = [r for r in records if r.id not in self._seen_at_start]
+        if not fresh:
+            self.done = True
+            return []
+
+        to_delete = [
+            record.id
+            for rank, record in enumerate(fresh, start=self.scanned)
+            if rank % self.keep_every_nth
+        ]
+        self.scanned += len(fresh)
+
+        last = fresh[-1].payload["timestamp"]
+        at_last = {r.id for r in fresh if r.payload["timestamp"] == last}
+        if last == self._start_from:
+            at_last |= self._seen_at_start
+        self._start_from, self._seen_at_start = last, at_last
+        return to_delete
+
 
 class MemoryCompressor:
-    """Compresses visual memory by deleting every Nth frame for old memories."""
+    """Compresses visual memory older than `age_threshold_hours`.
+
+    In `thin` mode, aged points are streamed in timestamp order and every
+    `keep_every_nth`-th one is kept, so the result does not depend on how
+    the backend pages. Scrolls fetch `page_size` timestamps without
+    vectors, and deletes go out in batches of at most `delete_batch_size`
+    ids while scrolling, so memory stays bounded however many points age
+    out. Local backends (numpy, segments) instead sort the aged timestamps
+    once with `ordered_ids`, since every `order_by` page would re-sort
+    all remaining rows, and delete the picked ids in one call. In
+    `retention` mode every aged point is deleted with a single
+    filter on the server, without listing ids; a time-partitioned
+    collection first drops whole buckets that lie before the cutoff.
+    """
 
     def __init__(
         self,
-        client: QdrantMemoryClient,
+        client: MemoryClient,
         keep_every_nth: int = 3,
         age_threshold_hours: float = 24.0,
+        mode: str = "thin",
+        page_size: int = 1000,
+        delete_batch_size: int = 1000,
     ) -> None:
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(
+                f"Unknown compression mode '{mode}', expected one of {COMPRESSION_MODES}"
+            )
+        if keep_every_nth < 1:
+            raise ValueError(f"keep_every_nth must be at least 1, got {keep_every_nth}")
         self.client = client
         self.keep_every_nth = keep_every_nth
         self.age_threshold_hours = age_threshold_hours
+        self.mode = mode
+        self.page_size = page_size
+        self.delete_batch_size = delete_batch_size
 
-    def compress(self) -> int:
-        """Run compression on memories older than the age threshold.
-
-        Returns:
-            Number of points deleted.
-        """
+    def _cutoff(self) -> float:
         cutoff = time.time() - (self.age_threshold_hours * 3600)
         logger.info(
-            "Compressing memories older than %.1f hours (cutoff=%.0f)",
+            "Compressing memories older than %.1f hours (cutoff=%.0f, mode=%s)",
             self.age_threshold_hours,
             cutoff,
+            self.mode,
         )
+        return cutoff
 
-        scroll_filter = Filter(
+    @staticmethod
+    def _aged_filter(cutoff: float) -> Filter:
+        return Filter(
             must=[
                 FieldCondition(
                     key="timestamp",
@@ -45,30 +125,127 @@ class MemoryCompressor:
             ]
         )
 
-        ids_to_delete: list[str] = []
-        offset = None
+    def _batches(self, pending: list[Any], final: bool) -> tuple[list[list[Any]], list[Any]]:
+        """Split off full delete batches, and the remainder too when `final`."""
+        size = self.delete_batch_size
+        n = len(pending) if final else len(pending) - len(pending) % size
+        return [pending[i : i + size] for i in range(0, n, size)], pending[n:]
+
+    def compress(self, progress: Optional[ProgressCallback] = None) -> int:
+        """Run compression on memories older than the age threshold.
 
-        while True:
-            results, next_offset = self.client.client.scroll(
+        Args:
+            progress: Called after each scrolled page with the number of
+                points scanned and deleted so far (`thin` mode only).
+
+        Returns:
+            Number of points deleted.
+        """
+        cutoff = self._cutoff()
+        aged = self._aged_filter(cutoff)
+        if self.mode == "retention":
+            return self._expire(cutoff, aged)
+        ordered_ids = getattr(self.client.client, "ordered_ids", None)
+        if ordered_ids is not None:
+            return self._thin_sorted(ordered_ids(aged, "timestamp"), progress)
+
+        cursor = _ThinningCursor(self.keep_every_nth, self.page_size)
+        pending: list[Any] = []
+        deleted = 0
+        while not cursor.done:
+            records, _ = self.client.client.scroll(
                 collection_name=self.client.collection_name,
-                scroll_filter=scroll_filter,
-                limit=100,
-                offset=offset,
+                scroll_filter=aged,
+                **cursor.scroll_args(),
             )
+            pending.extend(cursor.advance(records))
+            batches, pending = self._batches(pending, final=cursor.done)
+            for batch in batches:
+                self.client.client.delete(
+                    collection_name=self.client.collection_name,
+                    points_selector=batch,
+                )
+                deleted += len(batch)
+            if progress is not None:
+                progress(cursor.scanned, deleted)
 
-            for i, point in enumerate(results):
-                if i % self.keep_every_nth != 0:
-                    ids_to_delete.append(point.id)
-
-            if next_offset is None:
-                break
-            offset = next_offset
+        logger.info("Compressed: scanned %d, deleted %d points", cursor.scanned, deleted)
+        return deleted
 
-        if ids_to_delete:
+    def _thin_sorted(self, ids: list[Any], progress: Optional[ProgressCallback]) -> int:
+        """Thin ids already in timestamp order; returns how many were deleted."""
+        to_delete = [point_id for rank, point_id in enumerate(ids) if rank % self.keep_every_nth]
+        if to_delete:
             self.client.client.delete(
                 collection_name=self.client.collection_name,
-                points_selector=ids_to_delete,
+                points_selector=to_delete,
+            )
+        if progress is not None:
+            progress(len(ids), len(to_delete))
+        logger.info("Compressed: scanned %d, deleted %d points", len(ids), len(to_delete))
+        return len(to_delete)
+
+    def _expire(self, cutoff: float, aged: Filter) -> int:
+        """Delete every aged point by filter; returns how many there were."""
+        expired = self.client.client.count(
+            collection_name=self.client.collection_name, count_filter=aged, exact=True
+        ).count
+        if getattr(self.client, "time_partitioned", False):
+            dropped = self.client.drop_partitions(before=cutoff)
+            logger.info("Dropped %d expired partitions", len(dropped))
+        self.client.client.delete(
+            collection_name=self.client.collection_name,
+            points_selector=FilterSelector(filter=aged),
+        )
+        logger.info("Expired %d points", expired)
+        return expired
+
+
+class AsyncMemoryCompressor(MemoryCompressor):
+    """`MemoryCompressor` for an `AsyncQdrantMemoryClient`."""
+
+    async def compress(self, progress: Optional[ProgressCallback] = None) -> int:
+        """Run compression on memories older than the age threshold.
+
+        Args:
+            progress: Called after each scrolled page with the number of
+                points scanned and deleted so far (`thin` mode only).
+
+        Returns:
+            Number of points deleted.
+        """
+        cutoff = self._cutoff()
+        aged = self._aged_filter(cutoff)
+        if self.mode == "retention":
+            expired = await self.client.client.count(
+                collection_name=self.client.collection_name, count_filter=aged, exact=True
+            )
+            await self.client.client.delete(
+                collection_name=self.client.collection_name,
+                points_selector=FilterSelector(filter=aged),
+            )
+            logger.info("Expired %d points", expired.count)
+            return expired.count
+
+        cursor = _ThinningCursor(self.keep_every_nth, self.page_size)
+        pending: list[Any] = []
+        deleted = 0
+        while not cursor.done:
+            records, _ = await self.client.client.scroll(
+                collection_name=self.client.collection_name,
+                scroll_filter=aged,
+                **cursor.scroll_args(),
             )
-            logger.info("Compressed: deleted %d points", len(ids_to_delete))
+            pending.extend(cursor.advance(records))
+            batches, pending = self._batches(pending, final=cursor.done)
+            for batch in batches:
+                await self.client.client.delete(
+                    collection_name=self.client.collection_name,
+                    points_selector=batch,
+                )
+                deleted += len(batch)
+            if progress is not None:
+                progress(cursor.scanned, deleted)
 
-        return len(ids_to_delete)
+        logger.info("Compressed: scanned %d, deleted %d points", cursor.scanned, deleted)
+        return deleted
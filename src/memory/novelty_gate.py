@@ -0,0 +1,135 @@
+"""Novelty-gated storage: write only keyframes that memory does not already hold."""
+
+import logging
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+from src.memory.schemas import MemoryPayload, RetrievalMatch
+from src.memory.visual_memory import AsyncVisualMemory, VisualMemory
+
+logger = logging.getLogger(__name__)
+
+
+class NoveltyGate:
+    """Stores a keyframe only if its best same-room match is below `threshold`.
+
+    The caller queries memory first and passes the matches to `offer`. A
+    keyframe that is already well represented is not written; instead the
+    `last_seen` timestamp of its best match is refreshed. Refreshes are
+    collected and sent as one batched payload update every
+    `refresh_batch_size` distinct points, and on `flush`. Memory then grows
+    with the space explored rather than with the time spent driving.
+
+    With an `AsyncVisualMemory`, use `offer_async` and `flush_async`.
+    """
+
+    def __init__(
+        self,
+        memory: Union[VisualMemory, AsyncVisualMemory],
+        threshold: float = 0.95,
+        refresh_batch_size: int = 64,
+    ) -> None:
+        self.memory = memory
+        self.threshold = threshold
+        self.refresh_batch_size = refresh_batch_size
+        self._pending: dict[Any, float] = {}
+        self.stored = 0
+        self.skipped = 0
+
+    def offer(
+        self,
+        embedding: np.ndarray,
+        payload: MemoryPayload,
+        matches: Sequence[RetrievalMatch],
+    ) -> Optional[str]:
+        """Store a keyframe unless memory already holds a close match.
+
+        Args:
+            embedding: 512-dim normalized embedding.
+            payload: Metadata to store; its timestamp becomes `last_seen`
+                of the match when the keyframe is skipped.
+            matches: Results of querying memory with this embedding before
+                it was stored, best first.
+
+        Returns:
+            The new point ID, or None if the keyframe was skipped.
+        """
+        if self._admit(payload, matches):
+            return self.memory.store(embedding=embedding, payload=payload)
+        if len(self._pending) >= self.refresh_batch_size:
+            self.flush()
+        return None
+
+    async def offer_async(
+        self,
+        embedding: np.ndarray,
+        payload: MemoryPayload,
+        matches: Sequence[RetrievalMatch],
+    ) -> Optional[str]:
+        """`offer` for an `AsyncVisualMemory`."""
+        if self._admit(payload, matches):
+            return await self.memory.store(embedding=embedding, payload=payload)
+        if len(self._pending) >= self.refresh_batch_size:
+            await self.flush_async()
+        return None
+
+    def _admit(self, payload: MemoryPayload, matches: Sequence[RetrievalMatch]) -> bool:
+        """Count the keyframe; queue a refresh and return False if it is not novel."""
+        best = next((m for m in matches if m.payload.room_id == payload.room_id), None)
+        if best is None or best.score < self.threshold:
+            self.stored += 1
+            return True
+
+        self.skipped += 1
+        seen = self._pending.get(best.point_id, payload.timestamp)
+        self._pending[best.point_id] = max(seen, payload.timestamp)
+        return False
+
+    def _take_refreshes(self) -> dict[Any, dict]:
+        pending, self._pending = self._pending, {}
+        return {point_id: {"last_seen": ts} for point_id, ts in pending.items()}
+
+    def flush(self) -> int:
+        """Send pending `last_seen` refreshes.
+
+        Refreshing is best effort: a failed update, e.g. for a point that
+        was compressed away meanwhile, is logged and dropped.
+
+        Returns:
+            Number of points refreshed.
+        """
+        updates = self._take_refreshes()
+        if not updates:
+            return 0
+        try:
+            self.memory.update_payloads(updates)
+        except Exception:
+            logger.exception("Failed to refresh last_seen of %d points", len(updates))
+            return 0
+        return len(updates)
+
+    async def flush_async(self) -> int:
+        """`flush` for an `AsyncVisualMemory`."""
+        updates = self._take_refreshes()
+        if not updates:
+            return 0
+        try:
+            await self.memory.update_payloads(updates)
+        except Exception:
+            logger.exception("Failed to refresh last_seen of %d points", len(updates))
+            return 0
+        return len(updates)
+
+    @property
+    def skip_rate(self) -> float:
+        total = self.stored + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def summary(self) -> dict[str, float]:
+        """Return a summary dict of gate counters."""
+        return {
+            "stored": self.stored,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skip_rate, 4),
+        }
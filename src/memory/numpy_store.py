@@ -0,0 +1,587 @@
+"""In-process vector store that searches a contiguous NumPy matrix.
+
+For room-sized collections (a few thousand to ~100k vectors) a brute-force
+matrix-vector product is faster than a round trip to a Qdrant server. The
+store implements the subset of the QdrantClient API used by `VisualMemory`,
+`SceneRetriever` and `MemoryCompressor`, including payload filters, so it
+can replace `QdrantMemoryClient` without changes to its callers.
+"""
+
+import logging
+import threading
+from typing import Any, Iterable, Mapping, Optional, Sequence, Union, get_args
+
+import numpy as np
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import (
+    Batch,
+    CountResult,
+    Direction,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchAny,
+    MatchValue,
+    OrderBy,
+    PointIdsList,
+    PointStruct,
+    Record,
+    ScoredPoint,
+    UpdateResult,
+    UpdateStatus,
+)
+
+from src.memory.projection import EmbeddingProjection
+from src.memory.qdrant_client import MemoryClient
+from src.memory.schemas import MemoryPayload
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPES = ("float32", "float16")
+
+# Rows scored per block when vectors are stored as float16, which NumPy
+# cannot multiply with BLAS; each block is upcast to float32 first.
+_SCORE_BLOCK = 16384
+
+
+def _is_string_field(annotation: Any) -> bool:
+    return annotation is str or str in get_args(annotation)
+
+
+def unpack_points(
+    points: Union[Sequence[PointStruct], Batch], vector_size: int
+) -> tuple[list[Any], np.ndarray, list[dict]]:
+    """Split upserted points into ids, an L2-normalized (N, D) matrix and payloads."""
+    if isinstance(points, Batch):
+        ids = list(points.ids)
+        vectors = np.asarray(points.vectors, dtype=np.float32)
+        payloads = list(points.payloads or [{}] * len(ids))
+    else:
+        ids = [p.id for p in points]
+        vectors = np.asarray([p.vector for p in points], dtype=np.float32)
+        payloads = [p.payload or {} for p in points]
+    return ids, normalize_rows(vectors.reshape(len(ids), -1), vector_size), payloads
+
+
+def normalize_rows(vectors: np.ndarray, vector_size: int) -> np.ndarray:
+    """Check the width of an (N, D) matrix and L2-normalize its rows into float32."""
+    if len(vectors) and vectors.shape[1] != vector_size:
+        raise ValueError(f"Expected vectors of size {vector_size}, got {vectors.shape[1]}")
+    vectors = np.array(vectors, dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors
+
+
+def top_k(
+    scores: np.ndarray, rows: np.ndarray, limit: int, score_threshold: Optional[float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the best `limit` (score, row) pairs above the threshold, best first."""
+    if score_threshold is not None:
+        keep = scores >= score_threshold
+        scores, rows = scores[keep], rows[keep]
+    if len(scores) > limit:
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        scores, rows = scores[best], rows[best]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+
+def order_rows(keys: np.ndarray, order_by: Union[str, OrderBy]) -> np.ndarray:
+    """Positions of `keys` in `order_by` order, starting at its `start_from`.
+
+    As in Qdrant, rows without a value for the key are left out. Ties
+    keep their row order.
+    """
+    if isinstance(order_by, str):
+        order_by = OrderBy(key=order_by)
+    descending = order_by.direction == Direction.DESC
+    valid = ~np.isnan(keys)
+    if order_by.start_from is not None:
+        start = float(order_by.start_from)
+        valid &= keys <= start if descending else keys >= start
+    positions = np.flatnonzero(valid)
+    order = np.argsort(-keys[positions] if descending else keys[positions], kind="stable")
+    return positions[order]
+
+
+def selector_ids_or_filter(
+    points_selector: Union[Iterable[Any], PointIdsList, Filter, FilterSelector],
+) -> tuple[Optional[Iterable[Any]], Optional[Filter]]:
+    """Split a delete selector into point ids or a filter."""
+    if isinstance(points_selector, FilterSelector):
+        return None, points_selector.filter
+    if isinstance(points_selector, Filter):
+        return None, points_selector
+    if isinstance(points_selector, PointIdsList):
+        return points_selector.points, None
+    return points_selector, None
+
+
+class PayloadColumns:
+    """Columnar storage for `MemoryPayload` fields.
+
+    Numeric fields are float64 arrays with NaN for None. String fields are
+    int32 codes into a per-field vocabulary, with -1 for None, so equality
+    filters compare integers instead of strings.
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        self.fields = MemoryPayload.model_fields
+        self.string_fields = [
+            name for name, info in self.fields.items() if _is_string_field(info.annotation)
+        ]
+        self.vocab: dict[str, list[str]] = {name: [] for name in self.string_fields}
+        self._codes: dict[str, dict[str, int]] = {name: {} for name in self.string_fields}
+        self.columns: dict[str, np.ndarray] = {
+            name: np.full(capacity, -1, dtype=np.int32)
+            if name in self.string_fields
+            else np.full(capacity, np.nan, dtype=np.float64)
+            for name in self.fields
+        }
+
+    @classmethod
+    def wrap(
+        cls, columns: dict[str, np.ndarray], vocab_from: "PayloadColumns"
+    ) -> "PayloadColumns":
+        """View existing arrays, e.g. memmaps, through another instance's vocabulary."""
+        view = cls.__new__(cls)
+        view.fields = vocab_from.fields
+        view.string_fields = vocab_from.string_fields
+        view.vocab = vocab_from.vocab
+        view._codes = vocab_from._codes
+        view.columns = columns
+        return view
+
+    def load_vocab(self, vocab: dict[str, list[str]]) -> None:
+        """Restore string codes saved from `vocab`."""
+        for field, values in vocab.items():
+            if field in self.vocab:
+                self.vocab[field][:] = values
+                self._codes[field] = {v: i for i, v in enumerate(values)}
+
+    def code(self, field: str, value: Optional[str], add: bool = False) -> int:
+        """Return the code of a string value, or -1 if it is unknown."""
+        if value is None:
+            return -1
+        codes = self._codes[field]
+        if value not in codes and add:
+            codes[value] = len(self.vocab[field])
+            self.vocab[field].append(value)
+        return codes.get(value, -1)
+
+    def resize(self, capacity: int) -> None:
+        for name, column in self.columns.items():
+            grown = np.full(capacity, -1 if name in self.string_fields else np.nan, column.dtype)
+            n = min(len(column), capacity)
+            grown[:n] = column[:n]
+            self.columns[name] = grown
+
+    def write(self, rows: np.ndarray, payloads: Sequence[dict]) -> None:
+        """Write payload dicts into the given rows."""
+        for name, column in self.columns.items():
+            values = [p.get(name) for p in payloads]
+            if name in self.string_fields:
+                column[rows] = [self.code(name, v, add=True) for v in values]
+            else:
+                column[rows] = [np.nan if v is None else v for v in values]
+
+    def update(self, rows: np.ndarray, payloads: Sequence[dict]) -> None:
+        """Overwrite only the fields each payload dict contains."""
+        unknown = {name for p in payloads for name in p} - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown payload fields {sorted(unknown)}")
+        for name, column in self.columns.items():
+            picked = [(row, p[name]) for row, p in zip(rows, payloads) if name in p]
+            if not picked:
+                continue
+            targets = [row for row, _ in picked]
+            if name in self.string_fields:
+                column[targets] = [self.code(name, v, add=True) for _, v in picked]
+            else:
+                column[targets] = [np.nan if v is None else v for _, v in picked]
+
+    def read(self, row: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """Rebuild the payload dict of one row, as `model_dump` would produce.
+
+        Args:
+            row: Row to read.
+            fields: Only read these fields, like a `with_payload` list.
+        """
+        payload: dict[str, Any] = {}
+        for name, column in self.columns.items():
+            if fields is not None and name not in fields:
+                continue
+            value = column[row]
+            if name in self.string_fields:
+                payload[name] = self.vocab[name][value] if value >= 0 else None
+            else:
+                payload[name] = None if np.isnan(value) else float(value)
+        return payload
+
+    def numeric(self, field: str, n: int) -> np.ndarray:
+        """The first n values of a numeric field, e.g. to order rows by."""
+        if field not in self.columns or field in self.string_fields:
+            raise ValueError(f"'{field}' is not a numeric payload field")
+        return self.columns[field][:n]
+
+    def take(self, keep: np.ndarray, n: int) -> None:
+        """Keep only the rows selected by the boolean mask `keep` over the first n."""
+        for column in self.columns.values():
+            kept = column[:n][keep]
+            column[: len(kept)] = kept
+
+    def mask(self, query_filter: Optional[Filter], n: int) -> Optional[np.ndarray]:
+        """Evaluate a Qdrant filter over the first n rows.
+
+        Supports `must`, `must_not` and `should` with field conditions that
+        use `MatchValue`, `MatchAny` or `Range`, and nested filters.
+
+        Returns:
+            Boolean mask, or None if there is no filter.
+        """
+        if query_filter is None:
+            return None
+        mask = np.ones(n, dtype=bool)
+        for condition in query_filter.must or []:
+            mask &= self._condition(condition, n)
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition(condition, n)
+        if query_filter.should:
+            any_match = np.zeros(n, dtype=bool)
+            for condition in query_filter.should:
+                any_match |= self._condition(condition, n)
+            mask &= any_match
+        return mask
+
+    def _condition(self, condition: Union[FieldCondition, Filter], n: int) -> np.ndarray:
+        if isinstance(condition, Filter):
+            return self.mask(condition, n)
+        if not isinstance(condition, FieldCondition) or condition.key not in self.columns:
+            raise NotImplementedError(f"Unsupported filter condition: {condition!r}")
+
+        column = self.columns[condition.key][:n]
+        if condition.match is not None:
+            if isinstance(condition.match, MatchValue):
+                values = [condition.match.value]
+            elif isinstance(condition.match, MatchAny):
+                values = list(condition.match.any)
+            else:
+                raise NotImplementedError(f"Unsupported match: {condition.match!r}")
+            if condition.key in self.string_fields:
+                values = [self.code(condition.key, v) for v in values]
+                values = [v for v in values if v >= 0]
+            return np.isin(column, values)
+        if condition.range is not None:
+            r = condition.range
+            mask = np.ones(n, dtype=bool)
+            if r.gt is not None:
+                mask &= column > r.gt
+            if r.gte is not None:
+                mask &= column >= r.gte
+            if r.lt is not None:
+                mask &= column < r.lt
+            if r.lte is not None:
+                mask &= column <= r.lte
+            return mask
+        raise NotImplementedError(f"Unsupported filter condition: {condition!r}")
+
+
+class NumpyCollection:
+    """QdrantClient-compatible facade over one in-memory collection.
+
+    Vectors are L2-normalized on insert, as Qdrant does for cosine
+    collections, and kept in a growable contiguous matrix; rows stay in
+    insertion order. Point ids map to rows through a dict. All methods
+    are thread-safe.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        vector_size: int,
+        dtype: str = "float32",
+        initial_capacity: int = 1024,
+    ) -> None:
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype '{dtype}', expected one of {VECTOR_DTYPES}")
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.dtype = np.dtype(dtype)
+        self._initial_capacity = max(initial_capacity, 1)
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all points and shrink back to the initial capacity."""
+        with self._lock:
+            self._vectors = np.zeros(
+                (self._initial_capacity, self.vector_size), dtype=self.dtype
+            )
+            self._payloads = PayloadColumns(self._initial_capacity)
+            self._ids: list[Any] = []
+            self._rows: dict[Any, int] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for vectors and payload columns."""
+        return self._vectors.nbytes + sum(c.nbytes for c in self._payloads.columns.values())
+
+    def _check_collection(self, collection_name: str) -> None:
+        if collection_name != self.collection_name:
+            raise ValueError(f"Unknown collection '{collection_name}'")
+
+    def _reserve(self, n: int) -> None:
+        """Grow the vector matrix and payload columns to hold n rows."""
+        capacity = len(self._vectors)
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        grown = np.zeros((capacity, self.vector_size), dtype=self.dtype)
+        grown[: len(self._vectors)] = self._vectors
+        self._vectors = grown
+        self._payloads.resize(capacity)
+
+    def trim(self) -> None:
+        """Release spare capacity left over from growth."""
+        with self._lock:
+            capacity = max(self.size, 1)
+            self._vectors = self._vectors[:capacity].copy()
+            self._payloads.resize(capacity)
+
+    def upsert(
+        self, collection_name: str, points: Union[Sequence[PointStruct], Batch], **_: Any
+    ) -> UpdateResult:
+        """Insert or overwrite points given as PointStructs or a columnar Batch."""
+        self._check_collection(collection_name)
+        self.write(*unpack_points(points, self.vector_size))
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def write(self, ids: list[Any], vectors: np.ndarray, payloads: Sequence[dict]) -> None:
+        """Insert or overwrite rows from an L2-normalized (N, D) matrix."""
+        if not ids:
+            return
+        with self._lock:
+            rows = np.empty(len(ids), dtype=np.int64)
+            for i, point_id in enumerate(ids):
+                row = self._rows.get(point_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[point_id] = row
+                    self._ids.append(point_id)
+                rows[i] = row
+            self._reserve(self.size)
+            self._vectors[rows] = vectors
+            self._payloads.write(rows, payloads)
+
+    def write_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields per point id; unknown ids are ignored."""
+        with self._lock:
+            known = [(self._rows[i], fields) for i, fields in updates.items() if i in self._rows]
+            if known:
+                rows, payloads = zip(*known)
+                self._payloads.update(np.asarray(rows), payloads)
+
+    def set_payload(
+        self,
+        collection_name: str,
+        payload: dict,
+        points: Union[Iterable[Any], PointIdsList],
+        **_: Any,
+    ) -> UpdateResult:
+        """Set the same payload fields on several points."""
+        self._check_collection(collection_name)
+        ids = points.points if isinstance(points, PointIdsList) else points
+        self.write_payloads({point_id: payload for point_id in ids})
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        vectors = self._vectors[: self.size] if rows is None else self._vectors[rows]
+        if self.dtype == np.float32:
+            return vectors @ query
+        return np.concatenate(
+            [
+                vectors[i : i + _SCORE_BLOCK].astype(np.float32) @ query
+                for i in range(0, len(vectors), _SCORE_BLOCK)
+            ]
+            or [np.empty(0, dtype=np.float32)]
+        )
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: Sequence[float],
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        **_: Any,
+    ) -> QueryResponse:
+        """Exact cosine top-`limit` search over the points that match the filter."""
+        self._check_collection(collection_name)
+        q = np.asarray(query, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+        with self._lock:
+            mask = self._payloads.mask(query_filter, self.size)
+            rows = None if mask is None else np.flatnonzero(mask)
+            scores = self._scores(q, rows)
+            if rows is None:
+                rows = np.arange(len(scores))
+            scores, rows = top_k(scores, rows, limit, score_threshold)
+            points = [
+                ScoredPoint(
+                    id=self._ids[row],
+                    version=0,
+                    score=float(score),
+                    payload=self._payloads.read(row) if with_payload else None,
+                    vector=self._vectors[row].astype(np.float32).tolist() if with_vectors else None,
+                )
+                for score, row in zip(scores, map(int, rows))
+            ]
+        return QueryResponse(points=points)
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: bool = False,
+        order_by: Union[str, OrderBy, None] = None,
+        **_: Any,
+    ) -> tuple[list[Record], Optional[int]]:
+        """Page through points in insertion order, or by a numeric payload field.
+
+        The offset is a row position returned by the previous call, so
+        pages are stable as long as no points are deleted in between. With
+        `order_by`, as in Qdrant, there is no next offset: continue from
+        the last key with `OrderBy.start_from`.
+        """
+        self._check_collection(collection_name)
+        fields = None if isinstance(with_payload, bool) else list(with_payload)
+        with self._lock:
+            mask = self._payloads.mask(scroll_filter, self.size)
+            if order_by is not None:
+                rows = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+                key = order_by if isinstance(order_by, str) else order_by.key
+                keys = self._payloads.numeric(key, self.size)[rows]
+                page, next_offset = rows[order_rows(keys, order_by)[:limit]], None
+            else:
+                start = offset or 0
+                rows = np.arange(start, self.size)
+                if mask is not None:
+                    rows = rows[mask[start:]]
+                page, rest = rows[:limit], rows[limit:]
+                next_offset = int(rest[0]) if len(rest) else None
+            records = [
+                Record(
+                    id=self._ids[row],
+                    payload=self._payloads.read(row, fields) if with_payload else None,
+                    vector=self._vectors[row].astype(np.float32).tolist() if with_vectors else None,
+                )
+                for row in map(int, page)
+            ]
+        return records, next_offset
+
+    def ordered_ids(self, scroll_filter: Optional[Filter], key: str) -> list[Any]:
+        """Ids of the points matching a filter, sorted once by a numeric field.
+
+        Lets `MemoryCompressor` walk the whole order without re-sorting the
+        remaining rows for every `order_by` page.
+        """
+        with self._lock:
+            mask = self._payloads.mask(scroll_filter, self.size)
+            rows = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+            keys = self._payloads.numeric(key, self.size)[rows]
+            return [self._ids[row] for row in rows[order_rows(keys, key)]]
+
+    def count(
+        self, collection_name: str, count_filter: Optional[Filter] = None, **_: Any
+    ) -> CountResult:
+        """Count the points matching a filter."""
+        self._check_collection(collection_name)
+        with self._lock:
+            mask = self._payloads.mask(count_filter, self.size)
+            return CountResult(count=self.size if mask is None else int(mask.sum()))
+
+    def delete(
+        self,
+        collection_name: str,
+        points_selector: Union[Iterable[Any], PointIdsList, Filter, FilterSelector],
+        **_: Any,
+    ) -> UpdateResult:
+        """Delete points by id or filter and compact the remaining rows in place."""
+        self._check_collection(collection_name)
+        ids, selector_filter = selector_ids_or_filter(points_selector)
+        with self._lock:
+            n = self.size
+            if selector_filter is not None:
+                keep = ~self._payloads.mask(selector_filter, n)
+            else:
+                keep = np.ones(n, dtype=bool)
+                for point_id in ids:
+                    row = self._rows.get(point_id)
+                    if row is not None:
+                        keep[row] = False
+            if keep.all():
+                return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+            kept = self._vectors[:n][keep]
+            self._vectors[: len(kept)] = kept
+            self._payloads.take(keep, n)
+            self._ids = [point_id for point_id, k in zip(self._ids, keep) if k]
+            self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+
+class NumpyMemoryClient(MemoryClient):
+    """In-process memory backend with the same interface as `QdrantMemoryClient`.
+
+    Memories live only as long as the process; use it for per-room working
+    sets that are small enough for brute-force search.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "robot_visual_memory",
+        vector_size: int = 512,
+        projection: Optional[EmbeddingProjection] = None,
+        dtype: str = "float32",
+        initial_capacity: int = 1024,
+    ) -> None:
+        super().__init__(collection_name, vector_size, projection)
+        self.client = NumpyCollection(
+            self.collection_name,
+            self.vector_size,
+            dtype=dtype,
+            initial_capacity=initial_capacity,
+        )
+        logger.info(
+            "Using in-process %s vector store for '%s'", dtype, self.collection_name
+        )
+
+    def upsert_arrays(
+        self, ids: Sequence[Any], embeddings: np.ndarray, payloads: Sequence[dict]
+    ) -> None:
+        """Write an (N, D) embedding matrix without converting it to lists."""
+        vectors = normalize_rows(self.stored_vectors(embeddings), self.vector_size)
+        self.client.write(list(ids), vectors, payloads)
+
+    def set_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of many points in place."""
+        self.client.write_payloads(updates)
+
+    def count(self) -> int:
+        """Return the number of points in the collection."""
+        return self.client.size
+
+    def delete_collection(self) -> None:
+        """Drop all points."""
+        self.client.clear()
+        logger.info("Deleted collection '%s'", self.collection_name)
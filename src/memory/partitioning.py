@@ -0,0 +1,471 @@
+"""Route one logical collection to per-room and per-time-bucket Qdrant collections.
+
+Each partition is a regular collection named after the logical one, e.g.
+
+    robot_visual_memory__r-kitchen-d34b6590__t-2900
+
+for room `kitchen` and time bucket 2900 (bucket = timestamp // bucket
+width). The room token is a name-safe slug of the room id followed by a
+short hash of it, so room ids that slug alike stay apart. Writes go to the partition of each point's payload, and the
+partition is created on first write. Queries and scrolls only visit the
+partitions a filter on `room_id` and `timestamp` can match, and fan out
+to all of them otherwise, merging the results. A whole partition can be
+dropped in one request instead of deleting its points one by one.
+"""
+
+import heapq
+import logging
+from hashlib import blake2b
+import math
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Sequence, Union
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import CountResult, QueryResponse
+from qdrant_client.models import (
+    Batch,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    Direction,
+    HasIdCondition,
+    MatchAny,
+    MatchValue,
+    OrderBy,
+    PointIdsList,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    UpdateResult,
+    UpdateStatus,
+)
+
+from src.memory.projection import EmbeddingProjection
+from src.memory.qdrant_client import QdrantMemoryClient
+
+logger = logging.getLogger(__name__)
+
+_NAME = re.compile(r"^(?:__r-(?P<room>[A-Za-z0-9-]+))?(?:__t-(?P<bucket>-?\d+))?$")
+
+
+def room_token(room_id: Optional[str]) -> str:
+    """Collection-name-safe form of a room id, distinct for distinct ids.
+
+    The slug alone is not injective ("Room A" and "Room-A" both give
+    "Room-A"), so a 4-byte hash of the room id is appended.
+    """
+    room_id = room_id or "unknown"
+    slug = re.sub(r"[^A-Za-z0-9-]+", "-", room_id)
+    return f"{slug}-{blake2b(room_id.encode(), digest_size=4).hexdigest()}"
+
+
+class Partition(NamedTuple):
+    """One physical collection; `room` and `bucket` are None when not partitioned by them."""
+
+    name: str
+    room: Optional[str]
+    bucket: Optional[int]
+
+
+class PartitionRouter:
+    """QdrantClient-compatible facade that spreads one collection over partitions.
+
+    Points must keep their partition: overwriting a point with a different
+    room or a timestamp in another bucket adds a second copy.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        create_collection: Callable[[str], None],
+        by_room: bool = True,
+        bucket_s: Optional[float] = None,
+        fanout_workers: int = 8,
+    ) -> None:
+        if not by_room and bucket_s is None:
+            raise ValueError("Partition by room, by time bucket, or both")
+        self.client = client
+        self.collection_name = collection_name
+        self.by_room = by_room
+        self.bucket_s = bucket_s
+        self._create_collection = create_collection
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=fanout_workers, thread_name_prefix="partition")
+        self._partitions: dict[str, Partition] = {}
+        for collection in client.get_collections().collections:
+            partition = self._parse(collection.name)
+            if partition is not None:
+                self._partitions[partition.name] = partition
+        logger.info(
+            "Found %d partitions of '%s'", len(self._partitions), collection_name
+        )
+
+    def close(self) -> None:
+        """Stop the fan-out threads."""
+        self._pool.shutdown()
+
+    # -- partitions ----------------------------------------------------------
+
+    def _parse(self, name: str) -> Optional[Partition]:
+        if not name.startswith(self.collection_name + "__"):
+            return None
+        match = _NAME.match(name[len(self.collection_name):])
+        if match is None:
+            return None
+        room, bucket = match.group("room"), match.group("bucket")
+        if (room is not None) != self.by_room or (bucket is not None) != (self.bucket_s is not None):
+            return None
+        return Partition(name, room, None if bucket is None else int(bucket))
+
+    def partition_for(self, payload: dict) -> Partition:
+        """The partition a payload is written to."""
+        name = self.collection_name
+        room = bucket = None
+        if self.by_room:
+            room = room_token(payload.get("room_id"))
+            name += f"__r-{room}"
+        if self.bucket_s is not None:
+            bucket = math.floor(payload["timestamp"] / self.bucket_s)
+            name += f"__t-{bucket}"
+        return Partition(name, room, bucket)
+
+    @property
+    def partitions(self) -> list[Partition]:
+        return sorted(self._partitions.values())
+
+    def _ensure(self, partition: Partition) -> None:
+        if partition.name in self._partitions:
+            return
+        with self._lock:
+            if partition.name not in self._partitions:
+                self._create_collection(partition.name)
+                self._partitions[partition.name] = partition
+
+    def select(self, query_filter: Optional[Filter]) -> list[Partition]:
+        """Partitions that may hold points matching the filter's top-level `must`."""
+        rooms: Optional[set[str]] = None
+        low, high = -math.inf, math.inf
+        conditions = query_filter.must if query_filter is not None and query_filter.must else []
+        if isinstance(conditions, (FieldCondition, Filter)):
+            conditions = [conditions]
+        for condition in conditions:
+            if not isinstance(condition, FieldCondition):
+                continue
+            if condition.key == "room_id" and isinstance(condition.match, MatchValue):
+                rooms = {room_token(condition.match.value)}
+            elif condition.key == "room_id" and isinstance(condition.match, MatchAny):
+                rooms = {room_token(v) for v in condition.match.any}
+            elif condition.key == "timestamp" and condition.range is not None:
+                r = condition.range
+                low = max(low, *(v for v in (r.gte, r.gt) if v is not None), -math.inf)
+                high = min(high, *(v for v in (r.lte, r.lt) if v is not None), math.inf)
+
+        selected = []
+        for partition in self.partitions:
+            if rooms is not None and partition.room is not None and partition.room not in rooms:
+                continue
+            if partition.bucket is not None:
+                start = partition.bucket * self.bucket_s
+                if start > high or start + self.bucket_s < low:
+                    continue
+            selected.append(partition)
+        return selected
+
+    def drop(self, partitions: Iterable[Partition]) -> list[str]:
+        """Delete whole partitions."""
+        dropped = []
+        with self._lock:
+            for partition in partitions:
+                self.client.delete_collection(partition.name)
+                self._partitions.pop(partition.name, None)
+                dropped.append(partition.name)
+        if dropped:
+            logger.info("Dropped %d partitions of '%s'", len(dropped), self.collection_name)
+        return dropped
+
+    def _fan_out(self, fn: Callable[[Partition], Any], partitions: Sequence[Partition]) -> list[Any]:
+        if len(partitions) == 1:
+            return [fn(partitions[0])]
+        return list(self._pool.map(fn, partitions))
+
+    # -- QdrantClient API ----------------------------------------------------
+
+    def _check_collection(self, collection_name: str) -> None:
+        if collection_name != self.collection_name:
+            raise ValueError(f"Unknown collection '{collection_name}'")
+
+    def upsert(
+        self, collection_name: str, points: Union[Sequence[PointStruct], Batch], **kwargs: Any
+    ) -> UpdateResult:
+        """Write each point to its partition, creating partitions as needed."""
+        self._check_collection(collection_name)
+        payloads = points.payloads if isinstance(points, Batch) else [p.payload for p in points]
+        groups: dict[Partition, list[int]] = {}
+        for i, payload in enumerate(payloads or []):
+            groups.setdefault(self.partition_for(payload or {}), []).append(i)
+
+        for partition, rows in groups.items():
+            self._ensure(partition)
+            if isinstance(points, Batch):
+                part = Batch.model_construct(
+                    ids=[points.ids[i] for i in rows],
+                    vectors=[points.vectors[i] for i in rows],
+                    payloads=[points.payloads[i] for i in rows],
+                )
+            else:
+                part = [points[i] for i in rows]
+            self.client.upsert(collection_name=partition.name, points=part, **kwargs)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: Sequence[float],
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        **kwargs: Any,
+    ) -> QueryResponse:
+        """Search the matching partitions in parallel and merge the top `limit`."""
+        self._check_collection(collection_name)
+        partitions = self.select(query_filter)
+        if not partitions:
+            return QueryResponse(points=[])
+        results = self._fan_out(
+            lambda p: self.client.query_points(
+                collection_name=p.name, query=query, query_filter=query_filter, limit=limit, **kwargs
+            ).points,
+            partitions,
+        )
+        return QueryResponse(points=heapq.nlargest(limit, chain(*results), key=lambda p: p.score))
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Optional[tuple[str, Any]] = None,
+        order_by: Union[str, OrderBy, None] = None,
+        **kwargs: Any,
+    ) -> tuple[list[Any], Optional[tuple[str, Any]]]:
+        """Page through the matching partitions one after another.
+
+        The offset is an opaque (partition, offset) pair; a page never
+        spans two partitions and may be short. With `order_by`, each
+        partition's first `limit` points are merged by the key, and, as in
+        Qdrant, there is no next offset.
+        """
+        self._check_collection(collection_name)
+        partitions = self.select(scroll_filter)
+        if order_by is not None:
+            return self._scroll_ordered(partitions, scroll_filter, limit, order_by, kwargs), None
+        if offset is not None:
+            partitions = [p for p in partitions if p.name >= offset[0]]
+            if partitions and partitions[0].name != offset[0]:
+                offset = None  # the partition was dropped meanwhile
+        if not partitions:
+            return [], None
+        inner = offset[1] if offset is not None else None
+        records, inner = self.client.scroll(
+            collection_name=partitions[0].name,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            offset=inner,
+            **kwargs,
+        )
+        if inner is not None:
+            return records, (partitions[0].name, inner)
+        return records, (partitions[1].name, None) if len(partitions) > 1 else None
+
+    def _scroll_ordered(
+        self,
+        partitions: Sequence[Partition],
+        scroll_filter: Optional[Filter],
+        limit: int,
+        order_by: Union[str, OrderBy],
+        kwargs: dict[str, Any],
+    ) -> list[Any]:
+        if isinstance(order_by, str):
+            order_by = OrderBy(key=order_by)
+        if not partitions:
+            return []
+        pages = self._fan_out(
+            lambda p: self.client.scroll(
+                collection_name=p.name,
+                scroll_filter=scroll_filter,
+                limit=limit,
+                order_by=order_by,
+                **kwargs,
+            )[0],
+            partitions,
+        )
+        # The key must be in the payload to merge by it.
+        merge = heapq.nlargest if order_by.direction == Direction.DESC else heapq.nsmallest
+        return merge(limit, chain(*pages), key=lambda r: r.payload[order_by.key])
+
+    def delete(
+        self,
+        collection_name: str,
+        points_selector: Union[Iterable[Any], PointIdsList, Filter, FilterSelector],
+        **kwargs: Any,
+    ) -> UpdateResult:
+        """Delete points by id or filter from every partition that may hold them."""
+        self._check_collection(collection_name)
+        if isinstance(points_selector, FilterSelector):
+            partitions = self.select(points_selector.filter)
+        elif isinstance(points_selector, Filter):
+            partitions = self.select(points_selector)
+        else:
+            if not isinstance(points_selector, PointIdsList):
+                points_selector = list(points_selector)
+            partitions = self.partitions
+        if partitions:
+            self._fan_out(
+                lambda p: self.client.delete(
+                    collection_name=p.name, points_selector=points_selector, **kwargs
+                ),
+                partitions,
+            )
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def batch_update_points(
+        self, collection_name: str, update_operations: Sequence[Any], **kwargs: Any
+    ) -> list[UpdateResult]:
+        """Apply payload updates to every partition.
+
+        Point ids do not say which partition holds them, so payload updates
+        by id are sent as id filters, which match nothing in the other
+        partitions instead of failing.
+        """
+        self._check_collection(collection_name)
+        operations = [
+            SetPayloadOperation(
+                set_payload=SetPayload(
+                    payload=op.set_payload.payload,
+                    filter=Filter(must=[HasIdCondition(has_id=list(op.set_payload.points))]),
+                )
+            )
+            if isinstance(op, SetPayloadOperation) and op.set_payload.points is not None
+            else op
+            for op in update_operations
+        ]
+        partitions = self.partitions
+        if partitions:
+            self._fan_out(
+                lambda p: self.client.batch_update_points(
+                    collection_name=p.name, update_operations=operations, **kwargs
+                ),
+                partitions,
+            )
+        return [UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)]
+
+    def count(
+        self, collection_name: str, count_filter: Optional[Filter] = None, **kwargs: Any
+    ) -> CountResult:
+        """Sum the point counts of the matching partitions."""
+        self._check_collection(collection_name)
+        partitions = self.select(count_filter)
+        if not partitions:
+            return CountResult(count=0)
+        counts = self._fan_out(
+            lambda p: self.client.count(
+                collection_name=p.name, count_filter=count_filter, **kwargs
+            ).count,
+            partitions,
+        )
+        return CountResult(count=sum(counts))
+
+
+class PartitionedMemoryClient(QdrantMemoryClient):
+    """Qdrant memory backend that stores each room and/or time bucket separately.
+
+    Behaves like `QdrantMemoryClient` for `VisualMemory`, `SceneRetriever`
+    and `MemoryCompressor`; the logical collection is never created itself.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6333,
+        collection_name: str = "robot_visual_memory",
+        vector_size: int = 512,
+        quantization_config: Optional[dict[str, Any]] = None,
+        projection: Optional[EmbeddingProjection] = None,
+        hnsw_config: Optional[dict[str, Any]] = None,
+        datatype: str = "float32",
+        by_room: bool = True,
+        time_bucket_hours: Optional[float] = None,
+        fanout_workers: int = 8,
+    ) -> None:
+        super().__init__(
+            host=host,
+            port=port,
+            collection_name=collection_name,
+            vector_size=vector_size,
+            quantization_config=quantization_config,
+            projection=projection,
+            hnsw_config=hnsw_config,
+            datatype=datatype,
+        )
+        self.client = PartitionRouter(
+            self.qdrant,
+            self.collection_name,
+            create_collection=self._create_collection,
+            by_room=by_room,
+            bucket_s=None if time_bucket_hours is None else time_bucket_hours * 3600,
+            fanout_workers=fanout_workers,
+        )
+
+    def close(self) -> None:
+        """Stop the router's fan-out threads."""
+        self.client.close()
+
+    def _ensure_collection(self) -> None:
+        """Partitions are created on first write."""
+
+    @property
+    def partitions(self) -> list[Partition]:
+        return self.client.partitions
+
+    @property
+    def time_partitioned(self) -> bool:
+        """Whether old points can be dropped by time bucket."""
+        return self.client.bucket_s is not None
+
+    def drop_partitions(
+        self, before: Optional[float] = None, room_id: Optional[str] = None
+    ) -> list[str]:
+        """Drop whole partitions instead of deleting their points.
+
+        Args:
+            before: Drop time buckets that end at or before this timestamp.
+            room_id: Drop the partitions of this room.
+
+        Returns:
+            Names of the dropped collections.
+        """
+        if before is None and room_id is None:
+            raise ValueError("Pass `before`, `room_id` or both")
+        if before is not None and self.client.bucket_s is None:
+            raise ValueError("Collection is not partitioned by time")
+        if room_id is not None and not self.client.by_room:
+            raise ValueError("Collection is not partitioned by room")
+        selected = [
+            p
+            for p in self.client.partitions
+            if (before is None or (p.bucket + 1) * self.client.bucket_s <= before)
+            and (room_id is None or p.room == room_token(room_id))
+        ]
+        return self.client.drop(selected)
+
+    def delete_collection(self) -> None:
+        """Delete every partition."""
+        dropped = self.client.drop(self.client.partitions)
+        logger.info("Deleted collection '%s' (%d partitions)", self.collection_name, len(dropped))
+
+    def count(self) -> int:
+        """Return the number of points across partitions."""
+        return self.client.count(self.collection_name).count
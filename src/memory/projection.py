@@ -0,0 +1,142 @@
+"""Linear projections that shrink stored embeddings below the encoder width."""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ("pca", "random")
+
+
+class EmbeddingProjection:
+    """Centers, projects and re-normalizes embeddings for cosine search.
+
+    The projection is identified by `version`, a hash of its parameters.
+    A collection holding projected vectors carries the version in its name
+    (see `collection_suffix`), so vectors projected with different matrices
+    never share a collection.
+    """
+
+    def __init__(self, matrix: np.ndarray, mean: np.ndarray, method: str) -> None:
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unknown projection method '{method}'")
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.mean = np.ascontiguousarray(mean, dtype=np.float32)
+        self.method = method
+
+        h = hashlib.blake2b(digest_size=4)
+        h.update(method.encode())
+        h.update(self.mean.tobytes())
+        h.update(self.matrix.tobytes())
+        self.version = h.hexdigest()
+
+    @property
+    def input_dim(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def output_dim(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def collection_suffix(self) -> str:
+        """Suffix for the collection that stores vectors from this projection."""
+        return f"__{self.method}{self.output_dim}_{self.version}"
+
+    @classmethod
+    def fit_pca(cls, embeddings: np.ndarray, dim: int) -> "EmbeddingProjection":
+        """Fit a PCA projection onto the top `dim` principal components.
+
+        Args:
+            embeddings: (N, D) embeddings, typically existing memories.
+            dim: Output dimension, at most min(N, D).
+        """
+        x = np.asarray(embeddings, dtype=np.float32)
+        if dim > min(x.shape):
+            raise ValueError(f"Cannot fit {dim} components from {x.shape[0]}x{x.shape[1]} data")
+        mean = x.mean(axis=0)
+        _, _, vt = np.linalg.svd(x - mean, full_matrices=False)
+        return cls(vt[:dim].T, mean, "pca")
+
+    @classmethod
+    def random_orthogonal(
+        cls, input_dim: int, dim: int, seed: int = 0
+    ) -> "EmbeddingProjection":
+        """Build a data-independent random orthogonal projection."""
+        rng = np.random.default_rng(seed)
+        q, _ = np.linalg.qr(rng.normal(size=(input_dim, dim)))
+        return cls(q, np.zeros(input_dim), "random")
+
+    def apply(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project (N, D) or (D,) embeddings and L2-normalize the result."""
+        x = np.asarray(embeddings, dtype=np.float32)
+        y = (x - self.mean) @ self.matrix
+        norms = np.linalg.norm(y, axis=-1, keepdims=True)
+        return y / np.maximum(norms, 1e-12)
+
+    def save(self, path: str) -> None:
+        """Write the projection to an .npz file atomically."""
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp.npz")
+        np.savez(tmp, matrix=self.matrix, mean=self.mean, method=self.method)
+        os.replace(tmp, target)
+        logger.info(
+            "Saved %s projection %d->%d (version %s) to %s",
+            self.method,
+            self.input_dim,
+            self.output_dim,
+            self.version,
+            target,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProjection":
+        """Read a projection written by `save`."""
+        with np.load(Path(path).expanduser()) as data:
+            return cls(data["matrix"], data["mean"], str(data["method"]))
+
+
+def recall_at_k(
+    full: np.ndarray,
+    projected: np.ndarray,
+    k: int = 5,
+    num_queries: Optional[int] = 500,
+    seed: int = 0,
+) -> float:
+    """Recall@k of projected search against exact full-dimension search.
+
+    Sampled rows are used as queries against all other rows. For each query,
+    the exact cosine top-k in `full` is the ground truth.
+
+    Args:
+        full: (N, D) normalized full-dimension embeddings.
+        projected: (N, d) projected embeddings of the same points.
+        k: Neighbours per query.
+        num_queries: Queries to sample, or None to use every row.
+        seed: Query sampling seed.
+
+    Returns:
+        Mean fraction of the exact top-k found by the projected search.
+    """
+    n = len(full)
+    k = min(k, n - 1)
+    if k < 1:
+        raise ValueError("recall_at_k needs at least two embeddings")
+    queries = np.arange(n)
+    if num_queries is not None and num_queries < n:
+        queries = np.random.default_rng(seed).choice(n, num_queries, replace=False)
+
+    def top_k(x: np.ndarray) -> np.ndarray:
+        sims = x[queries] @ x.T
+        sims[np.arange(len(queries)), queries] = -np.inf
+        return np.argpartition(-sims, k, axis=1)[:, :k]
+
+    truth, found = top_k(full), top_k(projected)
+    hits = [len(np.intersect1d(t, f)) for t, f in zip(truth, found)]
+    return float(np.mean(hits)) / k
@@ -1,21 +1,227 @@
 """Qdrant vector database client wrapper."""
 
 import logging
-from typing import Any, Optional
+from abc import ABC, abstractmethod
+from typing import Any, Mapping, Optional, Sequence
 
-from qdrant_client import QdrantClient
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import (
+    Batch,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CompressionRatio,
+    Datatype,
     Distance,
+    HnswConfigDiff,
     PayloadSchemaType,
+    ProductQuantization,
+    ProductQuantizationConfig,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
     ScalarQuantizationConfig,
     ScalarType,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
     VectorParams,
 )
 
+from src.memory.projection import EmbeddingProjection
+
 logger = logging.getLogger(__name__)
 
+QUANTIZATION_TYPES = ("scalar", "binary", "product")
+VECTOR_DATATYPES = ("float32", "float16")
+PAYLOAD_INDEXES = {
+    "room_id": PayloadSchemaType.KEYWORD,
+    "camera_id": PayloadSchemaType.KEYWORD,
+    "timestamp": PayloadSchemaType.FLOAT,
+}
+
+
+def quantization_from_config(config: Optional[dict[str, Any]]) -> Optional[QuantizationConfig]:
+    """Build the collection quantization from a `memory.quantization` section.
+
+    The section holds at most one of `scalar` (`type`, `quantile`),
+    `binary` or `product` (`compression`, e.g. "x16"); each also takes
+    `always_ram`.
+    """
+    if not config:
+        return None
+    kinds = [k for k in QUANTIZATION_TYPES if k in config]
+    unknown = set(config) - set(QUANTIZATION_TYPES)
+    if unknown or len(kinds) > 1:
+        raise ValueError(
+            f"memory.quantization must hold one of {QUANTIZATION_TYPES}, got {sorted(config)}"
+        )
+    if not kinds:
+        return None
+    kind = kinds[0]
+    cfg = config[kind] or {}
+    always_ram = cfg.get("always_ram", True)
+    if kind == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType(cfg.get("type", "int8")),
+                quantile=cfg.get("quantile"),
+                always_ram=always_ram,
+            )
+        )
+    if kind == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+    return ProductQuantization(
+        product=ProductQuantizationConfig(
+            compression=CompressionRatio(cfg.get("compression", "x16")),
+            always_ram=always_ram,
+        )
+    )
+
+
+def search_params_from_config(config: Optional[dict[str, Any]]) -> Optional[SearchParams]:
+    """Build per-query search parameters from a `retrieval.search` section.
+
+    `hnsw_ef` widens the HNSW beam (higher recall, slower), `exact`
+    bypasses the index, and `rescore` / `oversampling` control how
+    quantized candidates are re-ranked with the original vectors. Unset
+    values keep Qdrant's defaults; returns None when nothing is set.
+    """
+    if not config:
+        return None
+    quantization = None
+    if config.get("rescore") is not None or config.get("oversampling") is not None:
+        quantization = QuantizationSearchParams(
+            rescore=config.get("rescore"),
+            oversampling=config.get("oversampling"),
+        )
+    hnsw_ef = config.get("hnsw_ef")
+    exact = config.get("exact", False)
+    if hnsw_ef is None and not exact and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+
+def collection_config(
+    vector_size: int,
+    hnsw_config: Optional[dict[str, Any]] = None,
+    quantization_config: Optional[dict[str, Any]] = None,
+    datatype: str = "float32",
+) -> dict[str, Any]:
+    """Build the `create_collection` arguments for a memory collection.
+
+    Raises:
+        ValueError: If `datatype` is not one of `VECTOR_DATATYPES`.
+    """
+    if datatype not in VECTOR_DATATYPES:
+        raise ValueError(f"Unknown vector datatype '{datatype}', expected one of {VECTOR_DATATYPES}")
+    return {
+        "vectors_config": VectorParams(
+            size=vector_size,
+            distance=Distance.COSINE,
+            datatype=Datatype(datatype),
+        ),
+        "hnsw_config": HnswConfigDiff(**hnsw_config) if hnsw_config else None,
+        "quantization_config": quantization_from_config(quantization_config),
+    }
+
+
+def set_payload_operations(updates: Mapping[Any, dict]) -> list[SetPayloadOperation]:
+    """One `SetPayloadOperation` per point, for a single `batch_update_points`."""
+    return [
+        SetPayloadOperation(set_payload=SetPayload(payload=fields, points=[point_id]))
+        for point_id, fields in updates.items()
+    ]
+
+
+class MemoryClient(ABC):
+    """Collection naming and vector conversion shared by memory backends.
+
+    A backend exposes a QdrantClient-compatible object as `client`, so
+    `VisualMemory`, `SceneRetriever` and `MemoryCompressor` work with any of
+    them, and implements `count` and `delete_collection`.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        vector_size: int,
+        projection: Optional[EmbeddingProjection] = None,
+    ) -> None:
+        # Projected vectors live in their own collection, named after the
+        # projection version, with the projected width.
+        self.projection = projection
+        if projection is not None:
+            if projection.input_dim != vector_size:
+                raise ValueError(
+                    f"Projection expects {projection.input_dim}-dim embeddings, "
+                    f"collection is configured for {vector_size}"
+                )
+            collection_name += projection.collection_suffix
+            vector_size = projection.output_dim
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+
+    def to_vector(self, embedding: np.ndarray) -> list[float]:
+        """Convert an encoder embedding to the vector stored in this collection."""
+        if self.projection is not None:
+            embedding = self.projection.apply(embedding)
+        return embedding.tolist()
+
+    def stored_vectors(self, embeddings: np.ndarray) -> np.ndarray:
+        """Return the float32 (N, d) matrix stored for (N, D) encoder embeddings."""
+        if self.projection is not None:
+            embeddings = self.projection.apply(embeddings)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def to_vectors(self, embeddings: np.ndarray) -> list[list[float]]:
+        """Convert an (N, D) embedding matrix with one projection and one tolist."""
+        return self.stored_vectors(embeddings).tolist()
+
+    def upsert_arrays(
+        self, ids: Sequence[Any], embeddings: np.ndarray, payloads: Sequence[dict]
+    ) -> None:
+        """Upsert an (N, D) embedding matrix as one columnar batch."""
+        self.client.upsert(
+            collection_name=self.collection_name, points=self.to_batch(ids, embeddings, payloads)
+        )
+
+    def to_batch(
+        self, ids: Sequence[Any], embeddings: np.ndarray, payloads: Sequence[dict]
+    ) -> Batch:
+        """Build a columnar `Batch` from an (N, D) embedding matrix."""
+        # The vectors come from a float32 array, so skip validating each float.
+        return Batch.model_construct(
+            ids=list(ids), vectors=self.to_vectors(embeddings), payloads=list(payloads)
+        )
+
+    def set_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of many points in one request.
+
+        Args:
+            updates: Point id to the fields to set on that point; other
+                fields are left unchanged.
+        """
+        if not updates:
+            return
+        self.client.batch_update_points(
+            collection_name=self.collection_name,
+            update_operations=set_payload_operations(updates),
+        )
+
+    def close(self) -> None:
+        """Release resources held by the backend; a no-op for most of them."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return the number of points in the collection."""
+
+    @abstractmethod
+    def delete_collection(self) -> None:
+        """Delete the collection."""
+
 
-class QdrantMemoryClient:
+class QdrantMemoryClient(MemoryClient):
     """Wrapper around Qdrant for managing visual memory collections."""
 
     def __init__(
@@ -25,49 +231,44 @@ class QdrantMemoryClient:
         collection_name: str = "robot_visual_memory",
         vector_size: int = 512,
         quantization_config: Optional[dict[str, Any]] = None,
+        projection: Optional[EmbeddingProjection] = None,
+        hnsw_config: Optional[dict[str, Any]] = None,
+        datatype: str = "float32",
     ) -> None:
-        self.collection_name = collection_name
-        self.vector_size = vector_size
+        super().__init__(collection_name, vector_size, projection)
+        self._collection_config = collection_config(
+            self.vector_size, hnsw_config, quantization_config, datatype
+        )
 
         logger.info("Connecting to Qdrant at %s:%d", host, port)
-        self.client = QdrantClient(host=host, port=port)
-
-        self._quantization = None
-        if quantization_config and "scalar" in quantization_config:
-            scalar_cfg = quantization_config["scalar"]
-            self._quantization = ScalarQuantizationConfig(
-                type=ScalarType(scalar_cfg.get("type", "int8")),
-                always_ram=scalar_cfg.get("always_ram", True),
-            )
+        self.qdrant = QdrantClient(host=host, port=port)
+        self.client = self.qdrant
 
         self._ensure_collection()
 
     def _ensure_collection(self) -> None:
-        """Create the collection if it does not exist."""
+        """Create the collection if it does not exist.
+
+        Index, quantization and datatype settings only apply to a new
+        collection; an existing one keeps the settings it was created with.
+        """
         collections = [c.name for c in self.client.get_collections().collections]
         if self.collection_name not in collections:
-            logger.info("Creating collection '%s'", self.collection_name)
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE,
-                ),
-                quantization_config=self._quantization,
-            )
-            self._create_payload_indexes()
+            self._create_collection(self.collection_name)
         else:
             logger.info("Collection '%s' already exists", self.collection_name)
 
-    def _create_payload_indexes(self) -> None:
+    def _create_collection(self, name: str) -> None:
+        """Create a collection with the configured vector, index and payload settings."""
+        logger.info("Creating collection '%s'", name)
+        self.qdrant.create_collection(collection_name=name, **self._collection_config)
+        self._create_payload_indexes(name)
+
+    def _create_payload_indexes(self, name: str) -> None:
         """Create payload indexes for efficient filtering."""
-        indexes = {
-            "room_id": PayloadSchemaType.KEYWORD,
-            "timestamp": PayloadSchemaType.FLOAT,
-        }
-        for field, schema_type in indexes.items():
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
+        for field, schema_type in PAYLOAD_INDEXES.items():
+            self.qdrant.create_payload_index(
+                collection_name=name,
                 field_name=field,
                 field_schema=schema_type,
             )
@@ -82,3 +283,86 @@ class QdrantMemoryClient:
         """Return the number of points in the collection."""
         info = self.client.get_collection(self.collection_name)
         return info.points_count or 0
+
+
+class AsyncQdrantMemoryClient(MemoryClient):
+    """Asyncio counterpart of `QdrantMemoryClient` on `AsyncQdrantClient`.
+
+    `client` is the async Qdrant client; every method that talks to the
+    server is a coroutine. Pass a shared `client` to let several memories,
+    e.g. one per robot or camera, use one connection pool on one event
+    loop; a client created here is closed by `close`.
+
+    The collection is not created in the constructor: await
+    `ensure_collection` (or use `config.build_async_memory_client`).
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6333,
+        collection_name: str = "robot_visual_memory",
+        vector_size: int = 512,
+        quantization_config: Optional[dict[str, Any]] = None,
+        projection: Optional[EmbeddingProjection] = None,
+        hnsw_config: Optional[dict[str, Any]] = None,
+        datatype: str = "float32",
+        client: Optional[AsyncQdrantClient] = None,
+    ) -> None:
+        super().__init__(collection_name, vector_size, projection)
+        self._collection_config = collection_config(
+            self.vector_size, hnsw_config, quantization_config, datatype
+        )
+        self._owns_client = client is None
+        if client is None:
+            logger.info("Connecting to Qdrant at %s:%d (async)", host, port)
+            client = AsyncQdrantClient(host=host, port=port)
+        self.client = client
+
+    async def ensure_collection(self) -> None:
+        """Create the collection with its payload indexes if it does not exist."""
+        if await self.client.collection_exists(self.collection_name):
+            logger.info("Collection '%s' already exists", self.collection_name)
+            return
+        logger.info("Creating collection '%s'", self.collection_name)
+        await self.client.create_collection(
+            collection_name=self.collection_name, **self._collection_config
+        )
+        for field, schema_type in PAYLOAD_INDEXES.items():
+            await self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=schema_type,
+            )
+
+    async def upsert_arrays(
+        self, ids: Sequence[Any], embeddings: np.ndarray, payloads: Sequence[dict]
+    ) -> None:
+        """Upsert an (N, D) embedding matrix as one columnar batch."""
+        await self.client.upsert(
+            collection_name=self.collection_name, points=self.to_batch(ids, embeddings, payloads)
+        )
+
+    async def set_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of many points in one request."""
+        if not updates:
+            return
+        await self.client.batch_update_points(
+            collection_name=self.collection_name,
+            update_operations=set_payload_operations(updates),
+        )
+
+    async def count(self) -> int:
+        """Return the number of points in the collection."""
+        info = await self.client.get_collection(self.collection_name)
+        return info.points_count or 0
+
+    async def delete_collection(self) -> None:
+        """Delete the collection."""
+        await self.client.delete_collection(self.collection_name)
+        logger.info("Deleted collection '%s'", self.collection_name)
+
+    async def close(self) -> None:
+        """Close the Qdrant client if this memory created it."""
+        if self._owns_client:
+            await self.client.close()
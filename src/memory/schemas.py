@@ -1,7 +1,12 @@
-"""Pydantic models for structured data across the system."""
+"""Pydantic models for structured data across the system.
+
+The retrieval hot path uses the lightweight `PayloadRecord` and
+`RetrievalMatch` tuples instead, which skip validation; convert them
+with `to_model` / `to_result` where validated models are needed.
+"""
 
 from enum import Enum
-from typing import Optional
+from typing import Any, NamedTuple, Optional, Sequence
 
 from pydantic import BaseModel
 
@@ -22,7 +27,92 @@ class MemoryPayload(BaseModel):
     pose_y: float = 0.0
     pose_theta: float = 0.0
     room_id: str = "unknown"
+    camera_id: Optional[str] = None
+    depth_mean: Optional[float] = None
+    last_seen: Optional[float] = None  # refreshed when a revisit is not stored
+
+    def to_payload(self) -> dict:
+        """Return the payload dict, equal to `model_dump` for this flat model but cheaper."""
+        return dict(self.__dict__)
+
+    @classmethod
+    def bulk(cls, timestamps: Sequence[float], **fields: Any) -> list[dict]:
+        """Build payload dicts for many points with one validation.
+
+        Scalar fields are shared by every point. A field given as a list,
+        tuple or array holds one value per point. Only the first point is
+        validated, so per-point columns must have consistent types.
+
+        Args:
+            timestamps: One timestamp per point.
+            **fields: Other MemoryPayload fields.
+
+        Returns:
+            One payload dict per timestamp, as `model_dump` would produce.
+        """
+        timestamps = list(map(float, timestamps))
+        columns = {
+            name: value.tolist() if hasattr(value, "tolist") else list(value)
+            for name, value in fields.items()
+            if isinstance(value, (list, tuple)) or hasattr(value, "tolist")
+        }
+        for name, column in columns.items():
+            if len(column) != len(timestamps):
+                raise ValueError(
+                    f"Column '{name}' has {len(column)} values for {len(timestamps)} points"
+                )
+        if not timestamps:
+            return []
+
+        shared = {name: value for name, value in fields.items() if name not in columns}
+        first = {name: column[0] for name, column in columns.items()}
+        template = cls(timestamp=timestamps[0], **shared, **first).model_dump()
+        if not columns:
+            return [{**template, "timestamp": t} for t in timestamps]
+        names = list(columns)
+        return [
+            {**template, "timestamp": t, **dict(zip(names, row))}
+            for t, *row in zip(timestamps, *columns.values())
+        ]
+
+
+class PayloadRecord(NamedTuple):
+    """Unvalidated read-only view of a stored payload; mirrors `MemoryPayload`."""
+
+    timestamp: float
+    pose_x: float = 0.0
+    pose_y: float = 0.0
+    pose_theta: float = 0.0
+    room_id: str = "unknown"
+    camera_id: Optional[str] = None
     depth_mean: Optional[float] = None
+    last_seen: Optional[float] = None
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "PayloadRecord":
+        """Wrap a payload dict read back from a memory backend."""
+        try:
+            return cls(**payload)
+        except TypeError:  # keys this schema version does not know
+            return cls(**{k: v for k, v in payload.items() if k in cls._fields})
+
+    def to_model(self) -> MemoryPayload:
+        """Validate into a `MemoryPayload`."""
+        return MemoryPayload(**self._asdict())
+
+
+class RetrievalMatch(NamedTuple):
+    """A single retrieval hit as returned by `SceneRetriever.query`."""
+
+    point_id: str
+    score: float
+    payload: PayloadRecord
+
+    def to_result(self) -> "RetrievalResult":
+        """Validate into a `RetrievalResult`, e.g. for serialization."""
+        return RetrievalResult(
+            point_id=self.point_id, score=self.score, payload=self.payload.to_model()
+        )
 
 
 class NavigationAction(str, Enum):
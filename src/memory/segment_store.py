@@ -0,0 +1,761 @@
+"""Append-only, memory-mapped on-disk store for embeddings and payloads.
+
+A store is a directory with a JSON manifest and one subdirectory per
+segment. Each segment holds fixed-width column files:
+
+    vectors.f32      (N, D) float32, L2-normalized
+    ids.s36          point ids as 36-byte ASCII
+    deleted.u8       tombstones, 1 for deleted rows
+    <field>.f64      numeric payload fields (timestamp, pose_x, ...), NaN for None
+    <field>.i32      string payload fields (room_id, camera_id) as vocabulary codes
+    ids_order.i64    row order that sorts the ids, written once the segment is full
+
+Rows are only ever appended; the manifest records how many rows of each
+segment are committed, so bytes written after the last manifest update
+are ignored and truncated on reopen. Opening a store reads the manifest
+only; the column files are memory-mapped on first use, so gigabytes of
+memory open instantly and are paged in by the OS as searches touch them.
+Deletes and overwrites set tombstones, and `compact` rewrites the live
+rows into full segments. Ids are looked up by binary search over each
+full segment's persisted id order, and through an in-memory map of the
+active segment only, so writes after a reopen never scan every stored id.
+Payload-only updates (e.g. `last_seen`) are the
+one exception to append-only: they overwrite committed rows in place.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import (
+    Batch,
+    CountResult,
+    Filter,
+    FilterSelector,
+    OrderBy,
+    PointIdsList,
+    PointStruct,
+    Record,
+    ScoredPoint,
+    UpdateResult,
+    UpdateStatus,
+)
+
+from src.memory.numpy_store import (
+    PayloadColumns,
+    normalize_rows,
+    order_rows,
+    selector_ids_or_filter,
+    top_k,
+    unpack_points,
+)
+from src.memory.projection import EmbeddingProjection
+from src.memory.qdrant_client import MemoryClient
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FORMAT = 1
+MANIFEST = "manifest.json"
+ID_WIDTH = 36
+ORDER_FILE = "ids_order.i64"
+
+# Rows scored per block, so a search reads a bounded slice of each memmap.
+_SCORE_BLOCK = 65536
+
+
+class Segment:
+    """Lazily memory-mapped columns of one segment directory."""
+
+    def __init__(self, path: Path, count: int, vector_size: int, deleted: int = 0) -> None:
+        self.path = path
+        self.count = count
+        self.vector_size = vector_size
+        self.deleted_count = deleted
+        self._maps: dict[str, np.ndarray] = {}
+        self._rows: Optional[dict[str, int]] = None
+
+    def column(
+        self, name: str, dtype: np.dtype, width: int = 1, fill: Any = 0
+    ) -> np.ndarray:
+        """Read-only memmap of the first `count` rows of a column file.
+
+        A column missing from the segment, e.g. a payload field added after
+        it was written, reads as `fill`.
+        """
+        array = self._maps.get(name)
+        if array is None:
+            shape = (self.count, width) if width > 1 else (self.count,)
+            if self.count == 0 or not (self.path / name).exists():
+                array = np.full(shape, fill, dtype=dtype)
+            else:
+                array = np.memmap(self.path / name, dtype=dtype, mode="r", shape=shape)
+            self._maps[name] = array
+        return array
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.column("vectors.f32", np.dtype(np.float32), self.vector_size)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.column("ids.s36", np.dtype(f"S{ID_WIDTH}"))
+
+    @property
+    def deleted(self) -> np.ndarray:
+        return self.column("deleted.u8", np.dtype(np.uint8))
+
+    def mark_deleted(self, rows: Sequence[int]) -> None:
+        tombstones = np.memmap(
+            self.path / "deleted.u8", dtype=np.uint8, mode="r+", shape=(self.count,)
+        )
+        tombstones[list(rows)] = 1
+        tombstones.flush()
+        del tombstones
+        self.deleted_count += len(rows)
+        self._maps.pop("deleted.u8", None)
+
+    def writable(self, name: str, dtype: np.dtype, fill: Any) -> np.memmap:
+        """Writable memmap of a payload column, created as `fill` if missing."""
+        file = self.path / name
+        if not file.exists() or file.stat().st_size < self.count * dtype.itemsize:
+            np.full(self.count, fill, dtype=dtype).tofile(file)
+        self._maps.pop(name, None)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=(self.count,))
+
+    def grow(self, ids: Sequence[str]) -> None:
+        """Expose rows appended since the columns were mapped."""
+        if self._rows is not None:
+            self._rows.update((point_id, self.count + i) for i, point_id in enumerate(ids))
+        self.count += len(ids)
+        self._maps.clear()
+
+    def seal(self) -> None:
+        """Persist the id order of a full segment, used by `find` from now on."""
+        order = np.argsort(self.ids, kind="stable").astype(np.int64)
+        tmp = self.path / (ORDER_FILE + ".tmp")
+        order.tofile(tmp)
+        os.replace(tmp, self.path / ORDER_FILE)
+        self._maps.pop(ORDER_FILE, None)
+        self._rows = None
+
+    def sort_order(self) -> np.ndarray:
+        """Memmap of the persisted id order, sealing the segment if it is missing."""
+        array = self._maps.get(ORDER_FILE)
+        if array is None:
+            file = self.path / ORDER_FILE
+            if not file.exists() or file.stat().st_size != self.count * 8:
+                self.seal()
+            array = np.memmap(file, dtype=np.int64, mode="r", shape=(self.count,))
+            self._maps[ORDER_FILE] = array
+        return array
+
+    def find(self, keys: np.ndarray, sealed: bool) -> list[tuple[int, int]]:
+        """Return (position in `keys`, row) for the keys that are live rows here.
+
+        A sealed segment is binary-searched through its id order, touching
+        O(log count) ids per key; the active one keeps an id -> row map.
+        """
+        if not self.count:
+            return []
+        if sealed:
+            # An id overwritten within the segment has several rows; at most
+            # one of them is live.
+            order = self.sort_order()
+            lo = np.searchsorted(self.ids, keys, side="left", sorter=order)
+            hi = np.searchsorted(self.ids, keys, side="right", sorter=order)
+            found = (
+                (i, int(row))
+                for i in np.flatnonzero(hi > lo).tolist()
+                for row in order[lo[i] : hi[i]]
+            )
+        else:
+            if self._rows is None:
+                self._rows = {point_id.decode(): row for row, point_id in enumerate(self.ids)}
+            found = (
+                (i, self._rows[key])
+                for i, key in enumerate(k.decode() for k in keys)
+                if key in self._rows
+            )
+        deleted = self.deleted
+        return [(i, row) for i, row in found if not deleted[row]]
+
+
+class SegmentCollection:
+    """QdrantClient-compatible facade over a segment store directory.
+
+    Point ids must be UUID strings (or anything whose `str` fits in 36
+    bytes); they are returned as strings.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        collection_name: str,
+        vector_size: int,
+        segment_capacity: int = 65536,
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.segment_capacity = segment_capacity
+        self._lock = threading.RLock()
+        self._schema = PayloadColumns()
+
+        manifest_path = self.path / MANIFEST
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text())
+            if manifest["format"] != SEGMENT_FORMAT or manifest["vector_size"] != vector_size:
+                raise ValueError(
+                    f"Segment store at {self.path} has format {manifest['format']} and "
+                    f"{manifest['vector_size']}-dim vectors, expected format "
+                    f"{SEGMENT_FORMAT} and {vector_size}"
+                )
+            self._next_segment = manifest["next_segment"]
+            self._schema.load_vocab(manifest["vocab"])
+            self._segments = [
+                Segment(self.path / s["name"], s["count"], vector_size, s["deleted"])
+                for s in manifest["segments"]
+            ]
+            self._truncate_uncommitted()
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._next_segment = 0
+            self._segments: list[Segment] = []
+            self._write_manifest()
+        logger.info(
+            "Opened segment store %s: %d segments, %d points",
+            self.path,
+            len(self._segments),
+            self.size,
+        )
+
+    @property
+    def segments(self) -> list[Segment]:
+        return list(self._segments)
+
+    @property
+    def size(self) -> int:
+        """Number of live (non-deleted) points."""
+        return sum(s.count - s.deleted_count for s in self._segments)
+
+    # -- files ---------------------------------------------------------------
+
+    def _payload_files(self) -> dict[str, tuple[str, np.dtype, Any]]:
+        """Map payload fields to their column file name, dtype and missing value."""
+        return {
+            name: (f"{name}.i32", column.dtype, -1)
+            if column.dtype == np.int32
+            else (f"{name}.f64", column.dtype, np.nan)
+            for name, column in self._schema.columns.items()
+        }
+
+    def _column_files(self) -> dict[str, np.dtype]:
+        files = {
+            "vectors.f32": np.dtype(np.float32),
+            "ids.s36": np.dtype(f"S{ID_WIDTH}"),
+            "deleted.u8": np.dtype(np.uint8),
+        }
+        files.update((file, dtype) for file, dtype, _ in self._payload_files().values())
+        return files
+
+    def _payloads(self, segment: Segment) -> PayloadColumns:
+        """Payload columns of a segment, decoded with the store vocabulary."""
+        return PayloadColumns.wrap(
+            {
+                name: segment.column(file, dtype, fill=fill)
+                for name, (file, dtype, fill) in self._payload_files().items()
+            },
+            self._schema,
+        )
+
+    def _row_bytes(self, name: str, dtype: np.dtype) -> int:
+        return dtype.itemsize * (self.vector_size if name == "vectors.f32" else 1)
+
+    def _truncate_uncommitted(self) -> None:
+        """Drop bytes appended after the last manifest write, e.g. by a crash.
+
+        Payload columns the active segment lacks are back-filled so that
+        appended rows stay aligned.
+        """
+        if not self._segments:
+            return
+        active = self._segments[-1]
+        for name, dtype in self._column_files().items():
+            file = active.path / name
+            size = active.count * self._row_bytes(name, dtype)
+            if file.exists() and file.stat().st_size > size:
+                os.truncate(file, size)
+        for file, dtype, fill in self._payload_files().values():
+            if not (active.path / file).exists():
+                np.full(active.count, fill, dtype=dtype).tofile(active.path / file)
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": SEGMENT_FORMAT,
+            "vector_size": self.vector_size,
+            "next_segment": self._next_segment,
+            "vocab": self._schema.vocab,
+            "segments": [
+                {"name": s.path.name, "count": s.count, "deleted": s.deleted_count}
+                for s in self._segments
+            ],
+        }
+        tmp = self.path / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.path / MANIFEST)
+
+    def _new_segment(self) -> Segment:
+        path = self.path / f"seg-{self._next_segment:06d}"
+        self._next_segment += 1
+        path.mkdir()
+        for name in self._column_files():
+            (path / name).touch()
+        segment = Segment(path, 0, self.vector_size)
+        self._segments.append(segment)
+        return segment
+
+    def _append(self, ids: list[str], vectors: np.ndarray, payloads: list[dict]) -> None:
+        """Append rows, filling the active segment before opening a new one."""
+        start = 0
+        while start < len(ids):
+            if not self._segments or self._segments[-1].count >= self.segment_capacity:
+                self._new_segment()
+            segment = self._segments[-1]
+            end = min(len(ids), start + self.segment_capacity - segment.count)
+            n = end - start
+
+            files = self._payload_files()
+            staged = PayloadColumns.wrap(
+                {name: np.empty(n, dtype=dtype) for name, (_, dtype, _) in files.items()},
+                self._schema,
+            )
+            staged.write(np.arange(n), payloads[start:end])
+            data = {
+                "vectors.f32": np.ascontiguousarray(vectors[start:end], dtype=np.float32),
+                "ids.s36": np.asarray([i.encode() for i in ids[start:end]], dtype=f"S{ID_WIDTH}"),
+                "deleted.u8": np.zeros(n, dtype=np.uint8),
+            }
+            for name, column in staged.columns.items():
+                data[files[name][0]] = column
+            for name, array in data.items():
+                with open(segment.path / name, "ab") as f:
+                    f.write(array.tobytes())
+
+            segment.grow(ids[start:end])
+            if segment.count >= self.segment_capacity:
+                segment.seal()
+            start = end
+
+    def _locate(self, ids: Iterable[Any]) -> dict[str, tuple[int, int]]:
+        """Map those of `ids` that are live points to their (segment, row)."""
+        keys = list(dict.fromkeys(str(i) for i in ids))
+        if not keys:
+            return {}
+        encoded = np.asarray([k.encode() for k in keys], dtype=f"S{ID_WIDTH}")
+        last = len(self._segments) - 1
+        located: dict[str, tuple[int, int]] = {}
+        for seg_index, segment in enumerate(self._segments):
+            sealed = seg_index < last or segment.count >= self.segment_capacity
+            for position, row in segment.find(encoded, sealed):
+                located[keys[position]] = (seg_index, row)
+        return located
+
+    def _delete_ids(self, ids: Iterable[Any]) -> int:
+        by_segment: dict[int, list[int]] = {}
+        for seg_index, row in self._locate(ids).values():
+            by_segment.setdefault(seg_index, []).append(row)
+        for seg_index, rows in by_segment.items():
+            self._segments[seg_index].mark_deleted(rows)
+        return sum(len(rows) for rows in by_segment.values())
+
+    # -- QdrantClient API ----------------------------------------------------
+
+    def _check_collection(self, collection_name: str) -> None:
+        if collection_name != self.collection_name:
+            raise ValueError(f"Unknown collection '{collection_name}'")
+
+    def upsert(
+        self, collection_name: str, points: Union[Sequence[PointStruct], Batch], **_: Any
+    ) -> UpdateResult:
+        """Append points; existing ids are tombstoned and re-appended."""
+        self._check_collection(collection_name)
+        self.write(*unpack_points(points, self.vector_size))
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def write(self, ids: list[Any], vectors: np.ndarray, payloads: Sequence[dict]) -> None:
+        """Append rows from an L2-normalized (N, D) matrix and commit the manifest."""
+        if not ids:
+            return
+        with self._lock:
+            if self.size:
+                self._delete_ids(ids)
+            self._append([str(i) for i in ids], vectors, payloads)
+            self._write_manifest()
+
+    def write_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of live points in place.
+
+        Unknown ids are ignored. The manifest is only rewritten when a new
+        string value extends the vocabulary.
+        """
+        with self._lock:
+            located = self._locate(updates)
+            by_segment: dict[int, tuple[list[int], list[dict]]] = {}
+            for point_id, fields in updates.items():
+                location = located.get(str(point_id))
+                if location is not None:
+                    rows, payloads = by_segment.setdefault(location[0], ([], []))
+                    rows.append(location[1])
+                    payloads.append(fields)
+            files = self._payload_files()
+            vocab_size = sum(len(v) for v in self._schema.vocab.values())
+            for seg_index, (rows, payloads) in by_segment.items():
+                segment = self._segments[seg_index]
+                names = {name for p in payloads for name in p if name in files}
+                columns = {name: segment.writable(*files[name]) for name in names}
+                PayloadColumns.wrap(columns, self._schema).update(np.asarray(rows), payloads)
+                for column in columns.values():
+                    column.flush()
+            if sum(len(v) for v in self._schema.vocab.values()) != vocab_size:
+                self._write_manifest()
+
+    def set_payload(
+        self,
+        collection_name: str,
+        payload: dict,
+        points: Union[Iterable[Any], PointIdsList],
+        **_: Any,
+    ) -> UpdateResult:
+        """Set the same payload fields on several points."""
+        self._check_collection(collection_name)
+        ids = points.points if isinstance(points, PointIdsList) else points
+        self.write_payloads({point_id: payload for point_id in ids})
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def _segment_rows(
+        self, segment: Segment, query_filter: Optional[Filter]
+    ) -> Optional[np.ndarray]:
+        """Live rows of a segment that match the filter, or None for all rows."""
+        live = segment.deleted == 0
+        payloads = self._payloads(segment)
+        mask = payloads.mask(query_filter, segment.count)
+        if mask is None:
+            return None if live.all() else np.flatnonzero(live)
+        return np.flatnonzero(mask & live)
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: Sequence[float],
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        **_: Any,
+    ) -> QueryResponse:
+        """Exact cosine search, scanning each segment's memmap in blocks."""
+        self._check_collection(collection_name)
+        q = np.asarray(query, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+        with self._lock:
+            best_scores = [np.empty(0, dtype=np.float32)]
+            best_rows = [np.empty((0, 2), dtype=np.int64)]
+            for seg_index, segment in enumerate(self._segments):
+                rows = self._segment_rows(segment, query_filter)
+                n = segment.count if rows is None else len(rows)
+                for start in range(0, n, _SCORE_BLOCK):
+                    if rows is None:
+                        block = np.arange(start, min(start + _SCORE_BLOCK, n))
+                        scores = segment.vectors[start : start + _SCORE_BLOCK] @ q
+                    else:
+                        block = rows[start : start + _SCORE_BLOCK]
+                        scores = segment.vectors[block] @ q
+                    scores, block = top_k(scores, block, limit, score_threshold)
+                    best_scores.append(scores)
+                    best_rows.append(np.stack([np.full(len(block), seg_index), block], axis=1))
+
+            scores = np.concatenate(best_scores)
+            locations = np.concatenate(best_rows)
+            scores, order = top_k(scores, np.arange(len(scores)), limit, None)
+            points = []
+            for score, (seg_index, row) in zip(scores, locations[order]):
+                segment = self._segments[seg_index]
+                points.append(
+                    ScoredPoint(
+                        id=segment.ids[row].decode(),
+                        version=0,
+                        score=float(score),
+                        payload=self._payloads(segment).read(row) if with_payload else None,
+                        vector=segment.vectors[row].tolist() if with_vectors else None,
+                    )
+                )
+        return QueryResponse(points=points)
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: bool = False,
+        order_by: Union[str, OrderBy, None] = None,
+        **_: Any,
+    ) -> tuple[list[Record], Optional[int]]:
+        """Page through live points in append order, or by a numeric payload field.
+
+        The offset is a global row position, stable until the next `compact`.
+        With `order_by`, as in Qdrant, there is no next offset: continue
+        from the last key with `OrderBy.start_from`.
+        """
+        self._check_collection(collection_name)
+        fields = None if isinstance(with_payload, bool) else list(with_payload)
+        if order_by is not None:
+            return self._scroll_ordered(
+                scroll_filter, limit, fields, with_payload, with_vectors, order_by
+            )
+        position = offset or 0
+        records: list[Record] = []
+        with self._lock:
+            base = 0
+            for segment in self._segments:
+                if base + segment.count <= position:
+                    base += segment.count
+                    continue
+                rows = self._segment_rows(segment, scroll_filter)
+                if rows is None:
+                    rows = np.arange(segment.count)
+                rows = rows[rows >= position - base]
+                payloads = self._payloads(segment) if with_payload else None
+                for row in map(int, rows):
+                    if len(records) == limit:
+                        return records, base + row
+                    records.append(
+                        Record(
+                            id=segment.ids[row].decode(),
+                            payload=payloads.read(row, fields) if payloads is not None else None,
+                            vector=segment.vectors[row].tolist() if with_vectors else None,
+                        )
+                    )
+                base += segment.count
+        return records, None
+
+    def _scroll_ordered(
+        self,
+        scroll_filter: Optional[Filter],
+        limit: int,
+        fields: Optional[list[str]],
+        with_payload: Union[bool, Sequence[str]],
+        with_vectors: bool,
+        order_by: Union[str, OrderBy],
+    ) -> tuple[list[Record], None]:
+        with self._lock:
+            records = []
+            for seg_index, row in self._ordered_locations(scroll_filter, order_by)[:limit]:
+                segment = self._segments[seg_index]
+                records.append(
+                    Record(
+                        id=segment.ids[row].decode(),
+                        payload=self._payloads(segment).read(row, fields) if with_payload else None,
+                        vector=segment.vectors[row].tolist() if with_vectors else None,
+                    )
+                )
+        return records, None
+
+    def _ordered_locations(
+        self, scroll_filter: Optional[Filter], order_by: Union[str, OrderBy]
+    ) -> np.ndarray:
+        """(segment, row) of the live points matching a filter, in `order_by` order."""
+        key = order_by if isinstance(order_by, str) else order_by.key
+        locations = [np.empty((0, 2), dtype=np.int64)]
+        keys = [np.empty(0)]
+        for seg_index, segment in enumerate(self._segments):
+            rows = self._segment_rows(segment, scroll_filter)
+            if rows is None:
+                rows = np.arange(segment.count)
+            keys.append(self._payloads(segment).numeric(key, segment.count)[rows])
+            locations.append(np.stack([np.full(len(rows), seg_index), rows], axis=1))
+        return np.concatenate(locations)[order_rows(np.concatenate(keys), order_by)]
+
+    def ordered_ids(self, scroll_filter: Optional[Filter], key: str) -> list[str]:
+        """Ids of the live points matching a filter, sorted once by a numeric field.
+
+        Lets `MemoryCompressor` walk the whole order without re-sorting the
+        remaining rows for every `order_by` page.
+        """
+        with self._lock:
+            return [
+                self._segments[seg_index].ids[row].decode()
+                for seg_index, row in self._ordered_locations(scroll_filter, key)
+            ]
+
+    def count(
+        self, collection_name: str, count_filter: Optional[Filter] = None, **_: Any
+    ) -> CountResult:
+        """Count the live points matching a filter."""
+        self._check_collection(collection_name)
+        if count_filter is None:
+            return CountResult(count=self.size)
+        with self._lock:
+            return CountResult(
+                count=sum(len(self._segment_rows(s, count_filter)) for s in self._segments)
+            )
+
+    def delete(
+        self,
+        collection_name: str,
+        points_selector: Union[Iterable[Any], PointIdsList, Filter, FilterSelector],
+        **_: Any,
+    ) -> UpdateResult:
+        """Tombstone points by id or filter."""
+        self._check_collection(collection_name)
+        ids, selector_filter = selector_ids_or_filter(points_selector)
+        with self._lock:
+            if selector_filter is not None:
+                ids = [
+                    point_id.decode()
+                    for segment in self._segments
+                    for point_id in segment.ids[self._segment_rows(segment, selector_filter)]
+                ]
+            if self._delete_ids(ids):
+                self._write_manifest()
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    # -- maintenance ---------------------------------------------------------
+
+    def compact(self) -> int:
+        """Rewrite live rows into full segments and remove the old ones.
+
+        Returns:
+            Number of deleted rows reclaimed.
+        """
+        with self._lock:
+            reclaimed = sum(s.deleted_count for s in self._segments)
+            if not reclaimed and all(
+                s.count == self.segment_capacity for s in self._segments[:-1]
+            ):
+                return 0
+            old = self._segments
+            self._segments = []
+            for segment in old:
+                live = np.flatnonzero(segment.deleted == 0)
+                if not len(live):
+                    continue
+                payloads = self._payloads(segment)
+                self._append(
+                    [i.decode() for i in segment.ids[live]],
+                    np.asarray(segment.vectors[live]),
+                    [payloads.read(int(row)) for row in live],
+                )
+            self._write_manifest()
+            for segment in old:
+                shutil.rmtree(segment.path)
+        logger.info("Compacted %s: reclaimed %d rows", self.path, reclaimed)
+        return reclaimed
+
+    def clear(self) -> None:
+        """Remove every segment."""
+        with self._lock:
+            for segment in self._segments:
+                shutil.rmtree(segment.path)
+            self._segments = []
+            self._write_manifest()
+
+
+class SegmentMemoryClient(MemoryClient):
+    """Persistent local memory backend with the interface of `QdrantMemoryClient`.
+
+    Each collection is a segment store under `path/<collection_name>`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        collection_name: str = "robot_visual_memory",
+        vector_size: int = 512,
+        projection: Optional[EmbeddingProjection] = None,
+        segment_capacity: int = 65536,
+    ) -> None:
+        super().__init__(collection_name, vector_size, projection)
+        self.client = SegmentCollection(
+            os.path.join(os.path.expanduser(path), self.collection_name),
+            self.collection_name,
+            self.vector_size,
+            segment_capacity=segment_capacity,
+        )
+
+    def upsert_arrays(
+        self, ids: Sequence[Any], embeddings: np.ndarray, payloads: Sequence[dict]
+    ) -> None:
+        """Append an (N, D) embedding matrix without converting it to lists."""
+        vectors = normalize_rows(self.stored_vectors(embeddings), self.vector_size)
+        self.client.write(list(ids), vectors, payloads)
+
+    def set_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of many points in place."""
+        self.client.write_payloads(updates)
+
+    def count(self) -> int:
+        """Return the number of points in the collection."""
+        return self.client.size
+
+    def delete_collection(self) -> None:
+        """Delete every segment of the collection."""
+        self.client.clear()
+        logger.info("Deleted collection '%s'", self.collection_name)
+
+    def compact(self) -> int:
+        """Reclaim deleted rows; see `SegmentCollection.compact`."""
+        return self.client.compact()
+
+
+def copy_points(source: MemoryClient, target: MemoryClient, chunk_size: int = 1024) -> int:
+    """Copy every point, with vector and payload, between two memory backends.
+
+    Used to export a segment store to a Qdrant collection and to import one.
+
+    Returns:
+        Number of points copied.
+    """
+    if source.vector_size != target.vector_size:
+        raise ValueError(
+            f"Cannot copy {source.vector_size}-dim vectors into a "
+            f"{target.vector_size}-dim collection"
+        )
+    copied = 0
+    offset = None
+    while True:
+        records, offset = source.client.scroll(
+            collection_name=source.collection_name,
+            limit=chunk_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            target.client.upsert(
+                collection_name=target.collection_name,
+                points=Batch(
+                    ids=[r.id for r in records],
+                    vectors=[r.vector for r in records],
+                    payloads=[r.payload for r in records],
+                ),
+            )
+            copied += len(records)
+        if offset is None:
+            break
+    logger.info(
+        "Copied %d points from '%s' to '%s'",
+        copied,
+        source.collection_name,
+        target.collection_name,
+    )
+    return copied
@@ -1,29 +1,86 @@
 """Visual memory storage and management."""
 
+import asyncio
 import logging
+import threading
+import time
 import uuid
-from typing import Optional
+from typing import Any, Callable, Mapping, Optional, Sequence, Union
 
 import numpy as np
 from qdrant_client.models import PointStruct
 
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.memory.qdrant_client import MemoryClient
 from src.memory.schemas import MemoryPayload
 
 logger = logging.getLogger(__name__)
 
+BACKPRESSURE_POLICIES = ("block", "drop_oldest")
+
+# Called after each successful write with (ids, stored vectors, payload dicts).
+WriteListener = Callable[[list[Any], np.ndarray, list[dict]], None]
+
 
 class VisualMemory:
-    """Manages storage and batched insertion of visual embeddings into Qdrant."""
+    """Manages storage and batched insertion of visual embeddings into Qdrant.
+
+    By default `store` flushes synchronously once `batch_size` points are
+    buffered. With `background=True` a writer thread owns the upserts: it
+    swaps the filled buffer for an empty one and writes the full one while
+    producers keep appending, triggered by `batch_size` or `flush_interval_s`,
+    whichever comes first. The buffer is bounded by `max_buffer`; when it is
+    full, `store` either blocks or drops the oldest buffered point, according
+    to `backpressure`. `flush` is a synchronous barrier in both modes.
+
+    A batch whose upsert fails is put back at the front of the buffer. The
+    background writer then pauses, and the next `flush` raises the error;
+    the flush after that retries the write.
+    """
 
     def __init__(
         self,
-        client: QdrantMemoryClient,
+        client: MemoryClient,
         batch_size: int = 64,
+        background: bool = False,
+        flush_interval_s: float = 1.0,
+        max_buffer: int = 1024,
+        backpressure: str = "block",
     ) -> None:
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy '{backpressure}', "
+                f"expected one of {BACKPRESSURE_POLICIES}"
+            )
         self.client = client
         self.batch_size = batch_size
+        self.background = background
+        self.flush_interval_s = flush_interval_s
+        self.max_buffer = max(max_buffer, batch_size)
+        self.backpressure = backpressure
         self._buffer: list[PointStruct] = []
+        self.dropped = 0
+        self._listeners: list[WriteListener] = []
+
+        # _cond guards the buffer; _write_lock serializes upserts so a
+        # flush() waits for a background write that is already running.
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._writer: Optional[threading.Thread] = None
+        if background:
+            self._writer = threading.Thread(
+                target=self._run, name="memory-writer", daemon=True
+            )
+            self._writer.start()
+            logger.info(
+                "VisualMemory background writer started (batch_size=%d, "
+                "interval=%.2fs, max_buffer=%d, backpressure=%s)",
+                batch_size,
+                flush_interval_s,
+                self.max_buffer,
+                backpressure,
+            )
 
     def store(
         self,
@@ -33,6 +90,8 @@ class VisualMemory:
     ) -> str:
         """Store a single embedding with metadata.
 
+        Safe to call from several threads.
+
         Args:
             embedding: 512-dim normalized embedding.
             payload: Metadata to attach.
@@ -44,35 +103,153 @@ class VisualMemory:
         if point_id is None:
             point_id = str(uuid.uuid4())
 
-        point = PointStruct(
+        # Vector and payload are already valid; skip per-float validation.
+        point = PointStruct.model_construct(
             id=point_id,
-            vector=embedding.tolist(),
-            payload=payload.model_dump(),
+            vector=self.client.to_vector(embedding),
+            payload=payload.to_payload(),
         )
-        self._buffer.append(point)
 
-        if len(self._buffer) >= self.batch_size:
-            self.flush()
+        if not self.background:
+            with self._cond:
+                self._buffer.append(point)
+                full = len(self._buffer) >= self.batch_size
+            if full:
+                self.flush()
+            return point_id
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("VisualMemory is closed")
+            if len(self._buffer) >= self.max_buffer:
+                if self.backpressure == "drop_oldest":
+                    self._buffer.pop(0)
+                    self.dropped += 1
+                else:
+                    self._cond.wait_for(
+                        lambda: len(self._buffer) < self.max_buffer or self._closed
+                    )
+            self._buffer.append(point)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
 
         return point_id
 
-    def flush(self) -> int:
-        """Flush the internal buffer to Qdrant.
+    def _take_buffer(self) -> list[PointStruct]:
+        """Swap the active buffer for an empty one. Caller holds `_cond`."""
+        batch, self._buffer = self._buffer, []
+        self._cond.notify_all()
+        return batch
 
-        Returns:
-            Number of points flushed.
+    def add_write_listener(self, listener: WriteListener) -> None:
+        """Register a callback for points once they are written.
+
+        The callback receives the point ids, the (N, d) float32 vectors as
+        stored (after any projection) and the payload dicts. It runs on the
+        writing thread, so it must be quick and thread-safe.
         """
-        if not self._buffer:
-            return 0
+        self._listeners.append(listener)
+
+    def _notify(self, ids: list[Any], vectors: np.ndarray, payloads: list[dict]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(ids, vectors, payloads)
+            except Exception:
+                logger.exception("Write listener %r failed", listener)
 
-        count = len(self._buffer)
+    def _write(self, batch: list[PointStruct]) -> None:
         self.client.client.upsert(
             collection_name=self.client.collection_name,
-            points=self._buffer,
+            points=batch,
         )
-        logger.info("Flushed %d points to Qdrant", count)
-        self._buffer.clear()
-        return count
+        logger.info("Flushed %d points to Qdrant", len(batch))
+        if self._listeners:
+            self._notify(
+                [p.id for p in batch],
+                np.asarray([p.vector for p in batch], dtype=np.float32),
+                [p.payload for p in batch],
+            )
+
+    def _restore(self, batch: list[PointStruct]) -> None:
+        """Put a batch that failed to write back at the front of the buffer."""
+        with self._cond:
+            self._buffer[:0] = batch
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or (
+                        self._error is None
+                        and (
+                            len(self._buffer) >= self.batch_size
+                            or (
+                                self._buffer
+                                and time.monotonic() - last_flush >= self.flush_interval_s
+                            )
+                        )
+                    ),
+                    timeout=self.flush_interval_s,
+                )
+                if self._closed:
+                    return
+            with self._write_lock:
+                # Wait for flush() to report a failed write before retrying.
+                if self._error is not None:
+                    continue
+                with self._cond:
+                    batch = self._take_buffer()
+                if batch:
+                    try:
+                        self._write(batch)
+                    except Exception as e:  # surfaced by the next flush()
+                        logger.exception("Background flush of %d points failed", len(batch))
+                        self._restore(batch)
+                        self._error = e
+            last_flush = time.monotonic()
+
+    def flush(self) -> int:
+        """Flush the internal buffer to Qdrant.
+
+        Blocks until every point stored before the call has been written,
+        including a batch the background writer is currently upserting.
+        If a write fails, its points stay buffered for the next flush.
+
+        Returns:
+            Number of points flushed by this call.
+
+        Raises:
+            RuntimeError: If a background write failed since the last flush.
+        """
+        with self._write_lock:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise RuntimeError("Background flush failed") from error
+            with self._cond:
+                batch = self._take_buffer()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                self._restore(batch)
+                raise
+            return len(batch)
+
+    def close(self) -> None:
+        """Flush pending points and stop the background writer."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+        if self.dropped:
+            logger.warning("Dropped %d points under backpressure", self.dropped)
 
     def store_immediate(
         self,
@@ -93,17 +270,240 @@ class VisualMemory:
         if point_id is None:
             point_id = str(uuid.uuid4())
 
-        point = PointStruct(
+        # Vector and payload are already valid; skip per-float validation.
+        point = PointStruct.model_construct(
             id=point_id,
-            vector=embedding.tolist(),
-            payload=payload.model_dump(),
+            vector=self.client.to_vector(embedding),
+            payload=payload.to_payload(),
         )
         self.client.client.upsert(
             collection_name=self.client.collection_name,
             points=[point],
         )
+        if self._listeners:
+            self._notify([point_id], np.asarray([point.vector], dtype=np.float32), [point.payload])
+        return point_id
+
+    def store_many(
+        self,
+        embeddings: np.ndarray,
+        payloads: Union[Sequence[MemoryPayload], Sequence[dict]],
+        ids: Optional[Sequence[str]] = None,
+        chunk_size: int = 1024,
+    ) -> list[str]:
+        """Store many embeddings with columnar upserts, bypassing the buffer.
+
+        Each chunk goes through `MemoryClient.upsert_arrays`: Qdrant gets a
+        columnar `Batch` built with one `tolist`, local backends take the
+        array as is. No per-point `PointStruct` is built. Payloads may be
+        dicts, e.g. from `MemoryPayload.bulk`, which are sent as-is.
+
+        Args:
+            embeddings: (N, 512) normalized embeddings.
+            payloads: N payload models or payload dicts.
+            ids: Optional N UUID strings. Generated if not provided.
+            chunk_size: Points per upsert request.
+
+        Returns:
+            The point IDs used for storage, in input order.
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim != 2:
+            raise ValueError(f"Expected an (N, D) embedding matrix, got shape {embeddings.shape}")
+        n = len(embeddings)
+        if len(payloads) != n:
+            raise ValueError(f"Got {len(payloads)} payloads for {n} embeddings")
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in range(n)]
+        elif len(ids) != n:
+            raise ValueError(f"Got {len(ids)} ids for {n} embeddings")
+        ids = list(ids)
+        payload_dicts = [
+            p.to_payload() if isinstance(p, MemoryPayload) else p for p in payloads
+        ]
+
+        with self._write_lock:
+            for start in range(0, n, chunk_size):
+                end = min(start + chunk_size, n)
+                self.client.upsert_arrays(
+                    ids[start:end], embeddings[start:end], payload_dicts[start:end]
+                )
+                if self._listeners:
+                    self._notify(
+                        ids[start:end],
+                        self.client.stored_vectors(embeddings[start:end]),
+                        payload_dicts[start:end],
+                    )
+        if n:
+            logger.info("Stored %d points in %d columnar batches", n, -(-n // chunk_size))
+        return ids
+
+    def update_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of stored points in one batched request.
+
+        Serialized with upserts. Write listeners are not notified.
+
+        Args:
+            updates: Point id to the fields to set on that point.
+        """
+        if not updates:
+            return
+        with self._write_lock:
+            self.client.set_payloads(updates)
+        logger.debug("Updated payloads of %d points", len(updates))
+
+    @property
+    def buffer_size(self) -> int:
+        """Return current buffer size."""
+        with self._cond:
+            return len(self._buffer)
+
+
+class AsyncVisualMemory:
+    """Asyncio counterpart of `VisualMemory` for an `AsyncQdrantMemoryClient`.
+
+    `store` buffers points; once `batch_size` are buffered it starts their
+    upsert as a task and returns without waiting for it, so the caller can
+    query or encode the next frame while the write is in flight. At most
+    one write is in flight: the next full batch first awaits the previous
+    one. A failed write puts its batch back at the front of the buffer and
+    is raised by the next `store` that starts a write, or by `flush`. Use
+    from a single event loop.
+    """
+
+    def __init__(self, client: MemoryClient, batch_size: int = 64) -> None:
+        self.client = client
+        self.batch_size = batch_size
+        self._buffer: list[PointStruct] = []
+        # Held while waiting for the in-flight write and starting the next.
+        self._write_lock = asyncio.Lock()
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def store(
+        self,
+        embedding: np.ndarray,
+        payload: MemoryPayload,
+        point_id: Optional[str] = None,
+    ) -> str:
+        """Buffer a single embedding with metadata.
+
+        Args:
+            embedding: 512-dim normalized embedding.
+            payload: Metadata to attach.
+            point_id: Optional UUID string. Generated if not provided.
+
+        Returns:
+            The point ID used for storage.
+        """
+        if point_id is None:
+            point_id = str(uuid.uuid4())
+
+        self._buffer.append(
+            PointStruct.model_construct(
+                id=point_id,
+                vector=self.client.to_vector(embedding),
+                payload=payload.to_payload(),
+            )
+        )
+        if len(self._buffer) >= self.batch_size:
+            async with self._write_lock:
+                # Drain before taking the batch, so a failed earlier write
+                # leaves these points buffered for the next flush.
+                await self._drain()
+                if len(self._buffer) >= self.batch_size:
+                    batch, self._buffer = self._buffer, []
+                    self._inflight = asyncio.create_task(self._write(batch))
         return point_id
 
+    async def _write(self, batch: list[PointStruct]) -> None:
+        try:
+            await self.client.client.upsert(
+                collection_name=self.client.collection_name,
+                points=batch,
+            )
+        except Exception:
+            self._buffer[:0] = batch
+            raise
+        logger.info("Flushed %d points to Qdrant", len(batch))
+
+    async def _drain(self) -> None:
+        """Wait for the in-flight write. Caller holds `_write_lock`."""
+        task, self._inflight = self._inflight, None
+        if task is None:
+            return
+        try:
+            await task
+        except Exception as e:
+            raise RuntimeError("Background flush failed") from e
+
+    async def flush(self) -> int:
+        """Write the buffer and wait until every stored point is written.
+
+        If a write fails, its points stay buffered for the next flush.
+
+        Returns:
+            Number of points flushed from the buffer by this call.
+        """
+        async with self._write_lock:
+            await self._drain()
+            batch, self._buffer = self._buffer, []
+            if batch:
+                await self._write(batch)
+            return len(batch)
+
+    async def close(self) -> None:
+        """Flush pending points."""
+        await self.flush()
+
+    async def store_many(
+        self,
+        embeddings: np.ndarray,
+        payloads: Union[Sequence[MemoryPayload], Sequence[dict]],
+        ids: Optional[Sequence[str]] = None,
+        chunk_size: int = 1024,
+    ) -> list[str]:
+        """Store many embeddings with columnar upserts, bypassing the buffer.
+
+        See `VisualMemory.store_many`. If an earlier background write
+        failed, its error is raised before any of these points is written.
+        """
+        embeddings = np.asarray(embeddings)
+        n = len(embeddings)
+        if embeddings.ndim != 2 or len(payloads) != n:
+            raise ValueError(
+                f"Expected an (N, D) embedding matrix and N payloads, "
+                f"got shape {embeddings.shape} and {len(payloads)} payloads"
+            )
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in range(n)]
+        if len(ids) != n:
+            raise ValueError(f"Got {len(ids)} ids for {n} embeddings")
+        payload_dicts = [
+            p.to_payload() if isinstance(p, MemoryPayload) else p for p in payloads
+        ]
+
+        async with self._write_lock:
+            await self._drain()
+            for start in range(0, n, chunk_size):
+                end = min(start + chunk_size, n)
+                await self.client.upsert_arrays(
+                    ids[start:end], embeddings[start:end], payload_dicts[start:end]
+                )
+        return ids
+
+    async def update_payloads(self, updates: Mapping[Any, dict]) -> None:
+        """Overwrite some payload fields of stored points in one batched request.
+
+        Not ordered with an in-flight upsert, so only update points that
+        are already written, e.g. ones returned by a query.
+
+        Args:
+            updates: Point id to the fields to set on that point.
+        """
+        if not updates:
+            return
+        await self.client.set_payloads(updates)
+        logger.debug("Updated payloads of %d points", len(updates))
+
     @property
     def buffer_size(self) -> int:
         """Return current buffer size."""
@@ -1,11 +1,12 @@
 """Navigation decision controller based on visual memory retrieval."""
 
 import logging
-from typing import Optional
+from typing import Optional, Sequence, Union
 
 from src.memory.schemas import (
     NavigationAction,
     NavigationDecision,
+    RetrievalMatch,
     RetrievalResult,
 )
 
@@ -29,7 +30,9 @@ class NavigationController:
         self.confident_threshold = confident_threshold
         self.partial_threshold = partial_threshold
 
-    def decide(self, results: list[RetrievalResult]) -> NavigationDecision:
+    def decide(
+        self, results: Sequence[Union[RetrievalMatch, RetrievalResult]]
+    ) -> NavigationDecision:
         """Produce a navigation decision from retrieval results.
 
         Args:
@@ -0,0 +1,54 @@
+"""Embedding agreement metrics for checking optimized encoders against eager CLIP."""
+
+import numpy as np
+
+# Optimized encoders must keep at least this mean top-k neighbour overlap
+# with float32 eager CLIP on the harness frame set.
+MIN_TOPK_AGREEMENT = 0.9
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding sets.
+
+    Args:
+        reference: (N, D) embeddings from the reference encoder.
+        candidate: (N, D) embeddings for the same inputs.
+
+    Returns:
+        Array of shape (N,) with one cosine similarity per input.
+    """
+    reference = np.atleast_2d(reference).astype(np.float32)
+    candidate = np.atleast_2d(candidate).astype(np.float32)
+    dots = np.einsum("nd,nd->n", reference, candidate)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return dots / np.maximum(norms, 1e-12)
+
+
+def topk_agreement(reference: np.ndarray, candidate: np.ndarray, k: int = 5) -> np.ndarray:
+    """Per-query overlap of top-k retrieval results between two embedding sets.
+
+    Every row is used as a query against all other rows of the same set,
+    and the neighbour ids found with `candidate` embeddings are compared to
+    those found with `reference` embeddings.
+
+    Args:
+        reference: (N, D) embeddings from the reference encoder.
+        candidate: (N, D) embeddings for the same inputs.
+        k: Neighbours per query, capped at N - 1.
+
+    Returns:
+        Array of shape (N,) with the fraction of shared top-k neighbours.
+    """
+    k = min(k, len(reference) - 1)
+    if k < 1:
+        raise ValueError("topk_agreement needs at least two embeddings")
+
+    def neighbours(embeddings: np.ndarray) -> np.ndarray:
+        e = np.atleast_2d(embeddings).astype(np.float32)
+        e = e / np.maximum(np.linalg.norm(e, axis=1, keepdims=True), 1e-12)
+        sims = e @ e.T
+        np.fill_diagonal(sims, -np.inf)
+        return np.argsort(-sims, axis=1, kind="stable")[:, :k]
+
+    ref, cand = neighbours(reference), neighbours(candidate)
+    return np.array([len(set(a) & set(b)) / k for a, b in zip(ref, cand)])
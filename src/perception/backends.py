@@ -0,0 +1,287 @@
+"""Exported CPU inference backends for the CLIP vision tower.
+
+`torchscript`, `onnx` and `onnx-int8` export the eager open_clip image
+tower once, cache the artifact on disk and load it on later startups.
+The ONNX backends need the optional `onnx` and `onnxruntime` packages.
+
+A model snapshot is a traced copy of the eval-mode image tower saved
+together with its preprocessing parameters, so later startups skip
+open_clip model construction and pretrained weight resolution.
+"""
+
+import inspect
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Optional
+
+import numpy as np
+import torch
+
+from src.config import DEFAULT_CACHE_DIR
+from src.perception.accuracy import cosine_agreement
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torchscript", "onnx", "onnx-int8")
+
+# Exported backends whose embeddings agree with eager CLIP below this mean
+# cosine similarity are logged as suspect.
+MIN_COSINE_AGREEMENT = 0.99
+
+_SUFFIXES = {
+    "torchscript": ".torchscript.pt",
+    "onnx": ".onnx",
+    "onnx-int8": ".int8.onnx",
+    "snapshot": ".snapshot.pt",
+}
+
+# Bumped when the snapshot layout changes, so older files are rebuilt.
+SNAPSHOT_FORMAT = 1
+
+# Newer torch defaults to the dynamo exporter; the TorchScript-based one
+# handles open_clip's dynamic batch axis without extra dependencies.
+_LEGACY_EXPORTER = (
+    {"dynamo": False}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters
+    else {}
+)
+
+Forward = Callable[[torch.Tensor], torch.Tensor]
+
+
+class _ImageTower(torch.nn.Module):
+    """Exposes `encode_image` as `forward` for tracing and ONNX export."""
+
+    def __init__(self, model: torch.nn.Module) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return self.model.encode_image(pixel_values)
+
+
+class _OnnxRunner:
+    """Runs an ONNX image tower with onnxruntime on CPU."""
+
+    def __init__(self, path: Path, device: str) -> None:
+        ort = _import_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        self.device = device
+
+    def __call__(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        inputs = {"pixel_values": pixel_values.detach().cpu().numpy()}
+        (embeddings,) = self.session.run(["embedding"], inputs)
+        return torch.from_numpy(embeddings).to(self.device)
+
+
+def _import_onnxruntime() -> ModuleType:
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            "ONNX backends require onnx and onnxruntime: "
+            "pip install 'robot-visual-memory[onnx]'"
+        ) from e
+    return onnxruntime
+
+
+def artifact_path(
+    cache_dir: str, model_name: str, pretrained: str, backend: str
+) -> Path:
+    """Return the cache location of an exported backend artifact."""
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{model_name}__{pretrained}")
+    return Path(cache_dir).expanduser() / f"{stem}{_SUFFIXES[backend]}"
+
+
+def _atomic_target(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.with_name(path.name + ".tmp")
+
+
+def _export_torchscript(model: torch.nn.Module, path: Path, example: torch.Tensor) -> None:
+    tmp = _atomic_target(path)
+    with torch.no_grad():
+        traced = torch.jit.trace(_ImageTower(model).eval(), example)
+        traced = torch.jit.freeze(traced)
+    traced.save(str(tmp))
+    os.replace(tmp, path)
+
+
+def _export_onnx(model: torch.nn.Module, path: Path, example: torch.Tensor) -> None:
+    tmp = _atomic_target(path)
+    torch.onnx.export(
+        _ImageTower(model).eval(),
+        (example.cpu(),),
+        str(tmp),
+        input_names=["pixel_values"],
+        output_names=["embedding"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "embedding": {0: "batch"}},
+        opset_version=17,
+        **_LEGACY_EXPORTER,
+    )
+    os.replace(tmp, path)
+
+
+def _quantize_onnx(source: Path, path: Path) -> None:
+    _import_onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp = _atomic_target(path)
+    quantize_dynamic(str(source), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, path)
+
+
+def load_backend(
+    backend: str,
+    model: Optional[torch.nn.Module],
+    model_name: str,
+    pretrained: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    image_size: tuple[int, int] = (224, 224),
+    device: str = "cpu",
+) -> Optional[Forward]:
+    """Load an exported image tower, exporting it on first use.
+
+    Args:
+        backend: One of BACKENDS.
+        model: Eager open_clip model, used for export and the agreement check.
+        model_name: open_clip model name, part of the cache key.
+        pretrained: Pretrained tag, part of the cache key.
+        cache_dir: Directory holding exported artifacts.
+        image_size: Input (height, width) used for the export example.
+        device: Device the returned embeddings are placed on.
+
+    Returns:
+        Callable mapping a preprocessed (N, 3, H, W) tensor to unnormalized
+        embeddings, or None for the eager `torch` backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {BACKENDS}")
+    if backend == "torch":
+        return None
+
+    path = artifact_path(cache_dir, model_name, pretrained, backend)
+    example = torch.randn(2, 3, *image_size, device=device)
+    exported = False
+    if not path.exists():
+        if model is None:
+            raise FileNotFoundError(f"No cached {backend} artifact at {path}")
+        logger.info("Exporting %s backend to %s", backend, path)
+        if backend == "torchscript":
+            _export_torchscript(model, path, example)
+        elif backend == "onnx":
+            _export_onnx(model, path, example)
+        else:
+            fp32 = artifact_path(cache_dir, model_name, pretrained, "onnx")
+            if not fp32.exists():
+                _export_onnx(model, fp32, example)
+            _quantize_onnx(fp32, path)
+        exported = True
+    else:
+        logger.info("Loading cached %s backend from %s", backend, path)
+
+    forward: Forward
+    if backend == "torchscript":
+        forward = torch.jit.load(str(path), map_location=device).eval()
+    else:
+        forward = _OnnxRunner(path, device)
+
+    if exported:
+        with torch.no_grad():
+            reference = model.encode_image(example).cpu().numpy()
+            candidate = forward(example).cpu().numpy()
+        agreement = cosine_agreement(reference, candidate)
+        level = logging.INFO if agreement.mean() >= MIN_COSINE_AGREEMENT else logging.WARNING
+        logger.log(
+            level,
+            "%s backend cosine agreement vs eager: mean=%.5f min=%.5f",
+            backend,
+            float(np.mean(agreement)),
+            float(np.min(agreement)),
+        )
+    return forward
+
+
+def save_snapshot(
+    model: torch.nn.Module,
+    path: Path,
+    model_name: str,
+    pretrained: str,
+    preprocess: dict,
+    device: str = "cpu",
+) -> None:
+    """Trace the eval-mode image tower and save it with its preprocessing.
+
+    Args:
+        model: Eager open_clip model.
+        path: Snapshot file to write.
+        model_name: open_clip model name, checked on load.
+        pretrained: Pretrained tag, checked on load.
+        preprocess: Resize, crop, interpolation and normalization settings.
+        device: Device the tower is traced on, checked on load.
+    """
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "model_name": model_name,
+        "pretrained": pretrained,
+        "device": device,
+        "torch": torch.__version__,
+        "preprocess": preprocess,
+    }
+    tmp = _atomic_target(path)
+    example = torch.randn(2, 3, *preprocess["crop"], device=device)
+    with torch.no_grad():
+        traced = torch.jit.trace(_ImageTower(model).eval(), example)
+    torch.jit.save(traced, str(tmp), _extra_files={"meta.json": json.dumps(meta)})
+    os.replace(tmp, path)
+    logger.info("Saved model snapshot to %s", path)
+
+
+def load_snapshot(
+    path: Path, model_name: str, pretrained: str, device: str = "cpu"
+) -> Optional[tuple[Forward, dict]]:
+    """Load a snapshot written by `save_snapshot`.
+
+    Args:
+        path: Snapshot file.
+        model_name: Expected open_clip model name.
+        pretrained: Expected pretrained tag.
+        device: Device to load the tower on.
+
+    Returns:
+        Tuple of (image tower, preprocessing settings), or None if the file
+        is missing, unreadable or was built for a different model, tag or
+        device.
+    """
+    if not path.exists():
+        return None
+
+    extra_files = {"meta.json": ""}
+    try:
+        tower = torch.jit.load(str(path), map_location=device, _extra_files=extra_files)
+        meta = json.loads(extra_files["meta.json"])
+    except (RuntimeError, ValueError) as e:
+        logger.warning("Ignoring unreadable model snapshot %s: %s", path, e)
+        return None
+
+    expected = {
+        "format": SNAPSHOT_FORMAT,
+        "model_name": model_name,
+        "pretrained": pretrained,
+        "device": device,
+    }
+    stale = sorted(key for key, value in expected.items() if meta.get(key) != value)
+    if stale:
+        logger.info("Model snapshot %s is stale (%s changed)", path, ", ".join(stale))
+        return None
+
+    logger.info("Loading model snapshot from %s", path)
+    return tower.eval(), meta["preprocess"]
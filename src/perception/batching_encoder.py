@@ -0,0 +1,135 @@
+"""Dynamic micro-batching front-end for the CLIP encoder."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class BatchingEncoder:
+    """Gathers single-image encode requests into `encode_batch` calls.
+
+    A worker thread waits for the first request, then keeps collecting until
+    either `max_batch_size` images are queued or `max_wait_ms` has elapsed,
+    and runs one batched forward pass. Each caller gets its own Future. The
+    worst-case added latency per image is `max_wait_ms` plus one batch encode.
+    Futures resolve in submission order.
+    """
+
+    def __init__(
+        self,
+        encoder: Any,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._requests: queue.Queue = queue.Queue()
+        # Orders the closed check and enqueue of `submit` with `close`, so
+        # no request can land behind the close marker.
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.images = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name="batching-encoder", daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            "BatchingEncoder started (max_batch_size=%d, max_wait_ms=%.1f)",
+            max_batch_size,
+            max_wait_ms,
+        )
+
+    def submit(self, image: Any) -> Future:
+        """Queue an image for encoding.
+
+        Args:
+            image: Image accepted by the wrapped encoder's `encode_batch`.
+
+        Returns:
+            Future resolving to a normalized numpy array of shape (512,).
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchingEncoder is closed")
+            self._requests.put((image, future))
+        return future
+
+    def encode(self, image: Any) -> np.ndarray:
+        """Encode a single image, blocking until its batch has run."""
+        return self.submit(image).result()
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of images per forward pass so far."""
+        return self.images / self.batches if self.batches else 0.0
+
+    def close(self) -> None:
+        """Finish pending requests and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._requests.put(_CLOSE)
+        self._worker.join()
+        logger.info(
+            "BatchingEncoder closed: %d images in %d batches (mean %.1f)",
+            self.images,
+            self.batches,
+            self.mean_batch_size,
+        )
+
+    def _collect(self) -> tuple[list[tuple[Any, Future]], bool]:
+        """Block for one request, then gather more until full or timed out."""
+        first = self._requests.get()
+        if first is _CLOSE:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _CLOSE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            batch, closing = self._collect()
+            if not batch:
+                continue
+
+            images = [image for image, _ in batch]
+            try:
+                embeddings = self.encoder.encode_batch(images)
+            except Exception as e:
+                logger.exception("Batch encode failed for %d images", len(batch))
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.images += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
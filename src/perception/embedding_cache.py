@@ -0,0 +1,116 @@
+"""Content-addressed cache of CLIP embeddings keyed by decoded pixels."""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: a bounded in-memory LRU and optional disk store.
+
+    Keys hash the raw pixel bytes together with the image shape, channel
+    order and a namespace (model and pretrained tag), so a cached vector is
+    only reused for byte-identical input to the same model.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 10_000,
+        disk_dir: Optional[str] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir).expanduser() if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        logger.info(
+            "EmbeddingCache initialized (max_entries=%d, disk_dir=%s)",
+            max_entries,
+            self.disk_dir,
+        )
+
+    def key(self, pixels: np.ndarray, bgr: bool = False) -> str:
+        """Return the cache key for a decoded uint8 image.
+
+        Args:
+            pixels: Decoded image array.
+            bgr: Channel order of `pixels`, part of the key.
+
+        Returns:
+            Hex digest identifying the image content for this namespace.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{self.namespace}|{pixels.shape}|{pixels.dtype}|{bgr}".encode())
+        h.update(np.ascontiguousarray(pixels).data)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up an embedding, checking memory first and then disk."""
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if path.exists():
+                embedding = np.load(path)
+                self._remember(key, embedding)
+                self.hits += 1
+                self.disk_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        """Insert an embedding into memory and, if configured, onto disk."""
+        self._remember(key, embedding)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if not path.exists():
+                tmp = path.with_name(path.name + ".tmp.npy")
+                np.save(tmp, embedding)
+                os.replace(tmp, path)
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.npy"
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from either tier."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def summary(self) -> dict[str, float]:
+        """Return a summary dict of cache counters."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
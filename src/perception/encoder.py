@@ -1,64 +1,356 @@
 """CLIP-based visual encoder for extracting frame embeddings."""
 
 import logging
-from typing import Optional
+import time
+from functools import partial
+from typing import Optional, Sequence, Union
 
 import numpy as np
 import torch
+import torch.nn.functional as F
 from PIL import Image
 
+from src.perception.backends import (
+    DEFAULT_CACHE_DIR,
+    artifact_path,
+    load_backend,
+    load_snapshot,
+    save_snapshot,
+)
+from src.perception.embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
+# OpenAI CLIP normalization, used when the transform does not specify one.
+_DEFAULT_MEAN = (0.48145466, 0.4578275, 0.40821073)
+_DEFAULT_STD = (0.26862954, 0.26130258, 0.27577711)
+
+# Max absolute deviation of `preprocess_array` from the PIL `preprocess`
+# output, in normalized units (about one uint8 level after normalization).
+ARRAY_PREPROCESS_ATOL = 0.02
+
+ImageInput = Union[Image.Image, np.ndarray, torch.Tensor]
+
+PRECISIONS = ("fp32", "bf16")
+
+
+def bf16_supported() -> bool:
+    """Whether this CPU runs bfloat16 matmuls natively (AVX512-BF16 or AMX)."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def _preprocess_params(transform: object) -> dict:
+    """Extract resize, crop and normalization settings from a transform.
+
+    Args:
+        transform: torchvision Compose returned by open_clip.
+
+    Returns:
+        Dict with resize, crop, interpolation, mean and std.
+    """
+    params = {
+        "resize": 224,
+        "crop": (224, 224),
+        "interpolation": "bicubic",
+        "mean": _DEFAULT_MEAN,
+        "std": _DEFAULT_STD,
+    }
+    for t in getattr(transform, "transforms", None) or []:
+        name = type(t).__name__
+        if name == "Resize":
+            params["resize"] = t.size
+            params["interpolation"] = getattr(t.interpolation, "value", "bicubic")
+        elif name == "CenterCrop":
+            params["crop"] = tuple(t.size)
+        elif name == "Normalize":
+            params["mean"] = tuple(t.mean)
+            params["std"] = tuple(t.std)
+    return params
+
+
+def _pil_transform(params: dict) -> object:
+    """Rebuild open_clip's eval transform from saved preprocessing settings."""
+    from torchvision import transforms as T
+
+    return T.Compose(
+        [
+            T.Resize(
+                params["resize"],
+                interpolation=T.InterpolationMode(params["interpolation"]),
+                antialias=True,
+            ),
+            T.CenterCrop(params["crop"]),
+            T.Lambda(lambda img: img.convert("RGB")),
+            T.ToTensor(),
+            T.Normalize(params["mean"], params["std"]),
+        ]
+    )
+
 
 class CLIPEncoder:
-    """Encodes images into normalized 512-dim embeddings using CLIP ViT-B/32."""
+    """Encodes images into normalized 512-dim embeddings using CLIP ViT-B/32.
+
+    With `snapshot` set, the traced eval-mode image tower and its
+    preprocessing settings are saved under `cache_dir` on first start and
+    loaded on later starts without constructing the open_clip model.
+
+    `precision="bf16"` runs the eager model under bfloat16 autocast, and
+    `channels_last` switches the model and its inputs to NHWC layout.
+    Embeddings are always returned as float32.
+    """
 
     def __init__(
         self,
         model_name: str = "ViT-B-32",
         pretrained: str = "laion2b_s34b_b79k",
         device: Optional[str] = None,
+        backend: str = "torch",
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        cache: Optional[EmbeddingCache] = None,
+        snapshot: bool = False,
+        precision: str = "fp32",
+        channels_last: bool = False,
     ) -> None:
-        import open_clip
-
+        t0 = time.perf_counter()
         if device is None or device == "auto":
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
             self.device = device
 
+        self.model: Optional[torch.nn.Module] = None
+        tower = None
+        snapshot_file = artifact_path(cache_dir, model_name, pretrained, "snapshot")
+        loaded = (
+            load_snapshot(snapshot_file, model_name, pretrained, self.device)
+            if snapshot
+            else None
+        )
+        if loaded is not None:
+            tower, params = loaded
+            self.preprocess = _pil_transform(params)
+        else:
+            params = self._load_open_clip(model_name, pretrained)
+            if snapshot:
+                save_snapshot(
+                    self.model, snapshot_file, model_name, pretrained, params, self.device
+                )
+        self._set_array_preprocess(params)
+        self.backend = backend
+        self.cache = cache
+
+        load = partial(
+            load_backend,
+            backend,
+            model_name=model_name,
+            pretrained=pretrained,
+            cache_dir=cache_dir,
+            image_size=self._crop,
+            device=self.device,
+        )
+        try:
+            self._forward = load(self.model)
+        except FileNotFoundError:
+            # The snapshot carries no eager model to export this backend from.
+            self._load_open_clip(model_name, pretrained)
+            self._forward = load(self.model)
+        if self._forward is None and self.model is None:
+            self._forward = tower
+        self._set_precision(precision, channels_last)
+
+        logger.info(
+            "CLIP encoder ready in %.2fs (backend=%s, precision=%s, source=%s)",
+            time.perf_counter() - t0,
+            backend,
+            self.precision,
+            "snapshot" if self.model is None else "open_clip",
+        )
+
+    def _load_open_clip(self, model_name: str, pretrained: str) -> dict:
+        """Build the eager open_clip model and return its preprocessing settings."""
+        import open_clip
+
         logger.info("Loading CLIP model %s on %s", model_name, self.device)
         self.model, _, self.preprocess = open_clip.create_model_and_transforms(
             model_name, pretrained=pretrained
         )
         self.model = self.model.to(self.device).eval()
-        logger.info("CLIP model loaded successfully")
+        return _preprocess_params(self.preprocess)
 
-    @torch.no_grad()
-    def encode(self, image: Image.Image) -> np.ndarray:
-        """Encode a PIL image into a normalized 512-dim embedding.
+    def _set_precision(self, precision: str, channels_last: bool) -> None:
+        """Validate the precision mode and apply the memory layout."""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        if precision == "bf16":
+            # Autocast only reaches the eager model; exported graphs keep
+            # the dtype they were traced or converted with.
+            if self._forward is not None:
+                logger.warning("bf16 needs the eager torch model; using fp32")
+                precision = "fp32"
+            elif self.device == "cpu" and not bf16_supported():
+                logger.warning("CPU lacks native bfloat16 support; using fp32")
+                precision = "fp32"
+        self.precision = precision
+        self._autocast_device = "cuda" if self.device.startswith("cuda") else "cpu"
+
+        self.channels_last = channels_last and self.model is not None
+        if self.channels_last:
+            self.model = self.model.to(memory_format=torch.channels_last)
+
+    def _set_array_preprocess(self, params: dict) -> None:
+        """Precompute constants for the vectorized preprocessing path."""
+        self._resize = params["resize"]
+        self._crop = tuple(params["crop"])
+        self._interpolation = params["interpolation"]
+        mean = torch.tensor(params["mean"], dtype=torch.float32).view(1, 3, 1, 1)
+        std = torch.tensor(params["std"], dtype=torch.float32).view(1, 3, 1, 1)
+        # (x / 255 - mean) / std folded into a single multiply-add.
+        self._norm_scale = (1.0 / (255.0 * std)).to(self.device)
+        self._norm_shift = (-mean / std).to(self.device)
+
+    def _resized_shape(self, h: int, w: int) -> tuple[int, int]:
+        """Output size of the Resize step, matching torchvision semantics."""
+        if isinstance(self._resize, Sequence) and len(self._resize) == 2:
+            return int(self._resize[0]), int(self._resize[1])
+        size = self._resize[0] if isinstance(self._resize, Sequence) else self._resize
+        if h <= w:
+            return size, int(size * w / h)
+        return int(size * h / w), size
+
+    def preprocess_array(self, frames: np.ndarray, bgr: bool = False) -> torch.Tensor:
+        """Resize, crop and normalize raw uint8 frames without PIL.
+
+        Matches `preprocess` to within `ARRAY_PREPROCESS_ATOL`.
+
+        Args:
+            frames: uint8 array of shape (H, W, 3) or (N, H, W, 3).
+            bgr: Set for OpenCV frames to swap channels to RGB.
+
+        Returns:
+            Float tensor of shape (N, 3, crop_h, crop_w) on the encoder device.
+        """
+        if frames.ndim == 3:
+            frames = frames[None]
+        x = torch.from_numpy(np.ascontiguousarray(frames)).to(self.device)
+        x = x.permute(0, 3, 1, 2)
+        if bgr:
+            x = x.flip(1)
+
+        h, w = x.shape[-2:]
+        new_h, new_w = self._resized_shape(h, w)
+        x = x.float()
+        if (new_h, new_w) != (h, w):
+            x = F.interpolate(
+                x,
+                size=(new_h, new_w),
+                mode=self._interpolation,
+                align_corners=False,
+                antialias=True,
+            )
+            # PIL resizes in uint8; round to the same grid.
+            x = x.round_().clamp_(0, 255)
+
+        crop_h, crop_w = self._crop
+        top = int(round((new_h - crop_h) / 2.0))
+        left = int(round((new_w - crop_w) / 2.0))
+        x = x[..., top : top + crop_h, left : left + crop_w]
+
+        return x * self._norm_scale + self._norm_shift
+
+    def _encode_image(self, tensor: torch.Tensor) -> torch.Tensor:
+        """Run the image tower on the configured backend."""
+        if self._forward is None:
+            return self.model.encode_image(tensor)
+        return self._forward(tensor)
+
+    def _to_tensor(self, images: Sequence[ImageInput], bgr: bool = False) -> torch.Tensor:
+        """Preprocess a mix of PIL images, uint8 arrays and preprocessed tensors."""
+        if all(isinstance(img, np.ndarray) for img in images):
+            shapes = {img.shape for img in images}
+            if len(shapes) == 1:
+                return self.preprocess_array(np.stack(images), bgr=bgr)
+
+        tensors = []
+        for img in images:
+            if isinstance(img, torch.Tensor):
+                tensors.append(img if img.ndim == 4 else img.unsqueeze(0))
+            elif isinstance(img, np.ndarray):
+                tensors.append(self.preprocess_array(img, bgr=bgr))
+            else:
+                tensors.append(self.preprocess(img).unsqueeze(0))
+        return torch.cat([t.to(self.device) for t in tensors])
+
+    def _cache_key(self, image: ImageInput, bgr: bool) -> Optional[str]:
+        """Key decoded pixels; preprocessed tensors are not cacheable."""
+        if isinstance(image, torch.Tensor):
+            return None
+        if isinstance(image, np.ndarray):
+            return self.cache.key(image, bgr=bgr)
+        return self.cache.key(np.asarray(image), bgr=False)
+
+    @torch.inference_mode()
+    def _embed(
+        self, images: Union[Sequence[ImageInput], np.ndarray], bgr: bool
+    ) -> np.ndarray:
+        if isinstance(images, np.ndarray):
+            tensors = self.preprocess_array(images, bgr=bgr)
+        else:
+            tensors = self._to_tensor(images, bgr=bgr)
+        if self.channels_last:
+            tensors = tensors.contiguous(memory_format=torch.channels_last)
+        with torch.autocast(
+            self._autocast_device,
+            dtype=torch.bfloat16,
+            enabled=self.precision == "bf16",
+        ):
+            embeddings = self._encode_image(tensors)
+        embeddings = embeddings.float()
+        embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
+        return embeddings.cpu().numpy().astype(np.float32)
+
+    def encode(self, image: ImageInput, bgr: bool = False) -> np.ndarray:
+        """Encode a single image into a normalized 512-dim embedding.
 
         Args:
-            image: PIL Image to encode.
+            image: PIL Image, uint8 array (H, W, 3), or a tensor already
+                produced by `preprocess_array`.
+            bgr: Set when an array input is in OpenCV channel order.
 
         Returns:
             Normalized numpy array of shape (512,).
         """
-        tensor = self.preprocess(image).unsqueeze(0).to(self.device)
-        embedding = self.model.encode_image(tensor)
-        embedding = embedding / embedding.norm(dim=-1, keepdim=True)
-        return embedding.cpu().numpy().flatten().astype(np.float32)
+        return self.encode_batch([image], bgr=bgr)[0]
+
+    def encode_batch(
+        self, images: Union[Sequence[ImageInput], np.ndarray], bgr: bool = False
+    ) -> np.ndarray:
+        """Encode a batch of images.
 
-    @torch.no_grad()
-    def encode_batch(self, images: list[Image.Image]) -> np.ndarray:
-        """Encode a batch of PIL images.
+        Images found in the embedding cache skip the model; the rest are
+        encoded in one forward pass and added to the cache.
 
         Args:
-            images: List of PIL Images.
+            images: List of PIL Images, uint8 arrays or preprocessed tensors,
+                or a single uint8 array of shape (N, H, W, 3).
+            bgr: Set when array inputs are in OpenCV channel order.
 
         Returns:
             Numpy array of shape (N, 512) with normalized embeddings.
         """
-        tensors = torch.stack([self.preprocess(img) for img in images]).to(self.device)
-        embeddings = self.model.encode_image(tensors)
-        embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
-        return embeddings.cpu().numpy().astype(np.float32)
+        if self.cache is None:
+            return self._embed(images, bgr)
+
+        keys = [self._cache_key(img, bgr) for img in images]
+        results: list[Optional[np.ndarray]] = [
+            self.cache.get(k) if k is not None else None for k in keys
+        ]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            fresh = self._embed([images[i] for i in missing], bgr)
+            for i, embedding in zip(missing, fresh):
+                results[i] = embedding
+                if keys[i] is not None:
+                    self.cache.put(keys[i], embedding.copy())
+        return np.stack(results)
@@ -0,0 +1,89 @@
+"""Grouping of near-simultaneous frames from several cameras."""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FrameGroup = list[tuple[str, Any]]
+
+
+class FrameGrouper:
+    """Collects one frame per camera into groups for a single batched encode.
+
+    A group is released as soon as every camera has contributed a frame, or
+    by `poll` once `window_ms` has passed since its first frame, whichever
+    comes first. A camera that publishes again before its group is released
+    replaces its earlier frame, so a group holds at most one frame per camera
+    and a slow camera cannot make the others queue up.
+    """
+
+    def __init__(
+        self,
+        camera_ids: Sequence[str],
+        window_ms: float = 20.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not camera_ids:
+            raise ValueError("FrameGrouper needs at least one camera")
+        self.camera_ids = list(camera_ids)
+        self.window_s = window_ms / 1000.0
+        self._clock = clock
+        self._pending: dict[str, Any] = {}
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.groups = 0
+        self.frames = 0
+        self.frames_replaced = 0
+
+    def add(self, camera_id: str, frame: Any) -> Optional[FrameGroup]:
+        """Add a frame and return the group if it is now complete.
+
+        Args:
+            camera_id: One of the configured camera ids.
+            frame: The camera's latest frame.
+
+        Returns:
+            List of (camera_id, frame) pairs in camera order, or None while
+            the group is still waiting for other cameras.
+        """
+        if camera_id not in self.camera_ids:
+            raise KeyError(f"Unknown camera '{camera_id}'")
+        with self._lock:
+            if camera_id in self._pending:
+                self.frames_replaced += 1
+            elif self._opened_at is None:
+                self._opened_at = self._clock()
+            self._pending[camera_id] = frame
+            if len(self._pending) == len(self.camera_ids):
+                return self._release()
+            return None
+
+    def poll(self) -> Optional[FrameGroup]:
+        """Release a partial group whose window has expired."""
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            if self._clock() - self._opened_at < self.window_s:
+                return None
+            return self._release()
+
+    def flush(self) -> Optional[FrameGroup]:
+        """Release whatever is pending, regardless of the window."""
+        with self._lock:
+            return self._release() if self._pending else None
+
+    def _release(self) -> FrameGroup:
+        group = [(cid, self._pending[cid]) for cid in self.camera_ids if cid in self._pending]
+        self._pending = {}
+        self._opened_at = None
+        self.groups += 1
+        self.frames += len(group)
+        return group
+
+    @property
+    def mean_group_size(self) -> float:
+        """Average number of frames per released group."""
+        return self.frames / self.groups if self.groups else 0.0
@@ -0,0 +1,103 @@
+"""Adaptive frame striding for video ingestion."""
+
+import logging
+import threading
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def read_frames(cap: Any) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (frame_number, BGR frame) pairs until the capture is exhausted."""
+    frame_number = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return
+        frame_number += 1
+        yield frame_number, frame
+
+
+class AdaptiveFrameSampler:
+    """Skips frames with `cap.grab()` at a stride driven by keyframe feedback.
+
+    The stride doubles while consecutive frames stay far below the keyframe
+    threshold, halves as the distance approaches it, and drops back to
+    `min_stride` as soon as a keyframe fires. Skipped frames are grabbed but
+    never retrieved, so they avoid color conversion and the copy to numpy.
+    """
+
+    def __init__(
+        self,
+        min_stride: int = 1,
+        max_stride: int = 8,
+        threshold: float = 0.15,
+        low_ratio: float = 0.5,
+        high_ratio: float = 0.8,
+    ) -> None:
+        if not 1 <= min_stride <= max_stride:
+            raise ValueError("Require 1 <= min_stride <= max_stride")
+        self.min_stride = min_stride
+        self.max_stride = max_stride
+        self.threshold = threshold
+        self.low_ratio = low_ratio
+        self.high_ratio = high_ratio
+        self.stride = min_stride
+        self.frames_read = 0
+        self.frames_skipped = 0
+        self._lock = threading.Lock()
+
+    def update(self, is_keyframe: bool, distance: Optional[float]) -> int:
+        """Adapt the stride to the latest keyframe decision.
+
+        Args:
+            is_keyframe: Whether the last sampled frame became a keyframe.
+            distance: Its cosine distance to the last keyframe, if known.
+                Frames rejected before encoding can pass 0.0.
+
+        Returns:
+            The stride used for the next frame.
+        """
+        with self._lock:
+            if is_keyframe:
+                self.stride = self.min_stride
+            elif distance is not None:
+                ratio = distance / self.threshold
+                if ratio < self.low_ratio:
+                    self.stride = min(self.stride * 2, self.max_stride)
+                elif ratio > self.high_ratio:
+                    self.stride = max(self.stride // 2, self.min_stride)
+            return self.stride
+
+    def frames(self, cap: Any) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield (frame_number, BGR frame) pairs, skipping by the current stride.
+
+        Args:
+            cap: An opened cv2.VideoCapture.
+        """
+        frame_number = 0
+        while True:
+            for _ in range(self.stride - 1):
+                if not cap.grab():
+                    return
+                frame_number += 1
+                self.frames_skipped += 1
+
+            ret, frame = cap.read()
+            if not ret:
+                return
+            frame_number += 1
+            self.frames_read += 1
+            yield frame_number, frame
+
+    def summary(self) -> dict[str, float]:
+        """Return a summary dict of sampling counters."""
+        total = self.frames_read + self.frames_skipped
+        return {
+            "frames_read": self.frames_read,
+            "frames_skipped": self.frames_skipped,
+            "skip_fraction": round(self.frames_skipped / total, 4) if total else 0.0,
+            "stride": self.stride,
+        }
@@ -8,13 +8,112 @@ import numpy as np
 logger = logging.getLogger(__name__)
 
 
+def frame_thumbnail(frame: np.ndarray, size: int = 16) -> np.ndarray:
+    """Downsample a frame to a small grayscale thumbnail.
+
+    Args:
+        frame: uint8 image of shape (H, W) or (H, W, C).
+        size: Side length of the square thumbnail.
+
+    Returns:
+        float32 array of shape (size, size) with values in [0, 1].
+    """
+    h, w = frame.shape[:2]
+    # Subsample to a few pixels per cell before averaging to keep cost low.
+    step = max(1, min(h, w) // (size * 4))
+    sub = frame[::step, ::step]
+    cell_h, cell_w = sub.shape[0] // size, sub.shape[1] // size
+    if cell_h == 0 or cell_w == 0:
+        rows = np.linspace(0, sub.shape[0] - 1, size).astype(int)
+        cols = np.linspace(0, sub.shape[1] - 1, size).astype(int)
+        sub = sub[rows][:, cols]
+        cell_h = cell_w = 1
+    sub = sub[: cell_h * size, : cell_w * size].astype(np.float32)
+    if sub.ndim == 3:
+        sub = sub.mean(axis=2)
+    blocks = sub.reshape(size, cell_h, size, cell_w).mean(axis=(1, 3))
+    return blocks / 255.0
+
+
 class KeyframeSelector:
-    """Selects keyframes when cosine distance exceeds a threshold."""
+    """Selects keyframes when cosine distance exceeds a threshold.
+
+    With `history_size` > 1, a candidate is compared against the last N
+    keyframes, held in a preallocated (N, D) ring buffer, and only becomes
+    a keyframe if it is far from all of them. This keeps a robot that
+    oscillates between viewpoints from storing a keyframe on every swing.
+    Scoring is one matrix-vector product per frame.
 
-    def __init__(self, threshold: float = 0.15) -> None:
+    Optionally gates frames before encoding: `should_encode` compares a
+    small grayscale thumbnail against the last frame that passed the gate,
+    and rejects frames whose mean absolute pixel difference is below
+    `gate_threshold`, so a static camera does not pay for a CLIP pass.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.15,
+        gate_threshold: Optional[float] = None,
+        gate_size: int = 16,
+        history_size: int = 1,
+    ) -> None:
+        if history_size < 1:
+            raise ValueError("history_size must be at least 1")
         self.threshold = threshold
-        self._last_embedding: Optional[np.ndarray] = None
-        logger.info("KeyframeSelector initialized with threshold=%.3f", threshold)
+        self.gate_threshold = gate_threshold
+        self.gate_size = gate_size
+        self.history_size = history_size
+        # Allocated on the first embedding, once its width is known.
+        self._history: Optional[np.ndarray] = None
+        self._history_count = 0
+        self._history_next = 0
+        self.last_distance: Optional[float] = None
+        self._gate_reference: Optional[np.ndarray] = None
+        self.frames_checked = 0
+        self.frames_gated = 0
+        logger.info(
+            "KeyframeSelector initialized with threshold=%.3f gate_threshold=%s "
+            "history_size=%d",
+            threshold,
+            gate_threshold,
+            history_size,
+        )
+
+    def should_encode(self, frame: np.ndarray) -> bool:
+        """Cheaply decide whether a raw frame could be a keyframe.
+
+        Args:
+            frame: uint8 image of shape (H, W, C).
+
+        Returns:
+            False if the frame is near-identical to the last frame that
+            passed the gate and can skip encoding; True otherwise.
+        """
+        if self.gate_threshold is None:
+            return True
+        return self.passes_gate(frame_thumbnail(frame, self.gate_size))
+
+    def passes_gate(self, thumb: np.ndarray) -> bool:
+        """`should_encode` for a precomputed `frame_thumbnail` of `gate_size`."""
+        if self.gate_threshold is None:
+            return True
+
+        self.frames_checked += 1
+        if self._gate_reference is not None:
+            diff = float(np.mean(np.abs(thumb - self._gate_reference)))
+            if diff < self.gate_threshold:
+                self.frames_gated += 1
+                return False
+
+        self._gate_reference = thumb
+        return True
+
+    @property
+    def gated_fraction(self) -> float:
+        """Fraction of gate-checked frames that skipped encoding."""
+        if not self.frames_checked:
+            return 0.0
+        return self.frames_gated / self.frames_checked
 
     def is_keyframe(self, embedding: np.ndarray) -> tuple[bool, np.ndarray]:
         """Determine if the current embedding represents a keyframe.
@@ -25,21 +124,39 @@ class KeyframeSelector:
         Returns:
             Tuple of (is_keyframe, embedding).
         """
-        if self._last_embedding is None:
-            self._last_embedding = embedding
+        if self._history_count == 0:
+            self._remember(embedding)
+            self.last_distance = None
             logger.debug("First frame accepted as keyframe")
             return True, embedding
 
-        similarity = float(np.dot(self._last_embedding, embedding))
-        distance = 1.0 - similarity
+        # Distance to the nearest recent keyframe.
+        similarities = self._history[: self._history_count] @ embedding
+        distance = 1.0 - float(similarities.max())
+        self.last_distance = distance
 
         if distance >= self.threshold:
-            self._last_embedding = embedding
+            self._remember(embedding)
             logger.debug("Keyframe selected (distance=%.4f)", distance)
             return True, embedding
 
         return False, embedding
 
+    def _remember(self, embedding: np.ndarray) -> None:
+        """Write a keyframe into the ring buffer, overwriting the oldest."""
+        if self._history is None:
+            self._history = np.empty(
+                (self.history_size, embedding.shape[-1]), dtype=np.float32
+            )
+        self._history[self._history_next] = embedding
+        self._history_next = (self._history_next + 1) % self.history_size
+        self._history_count = min(self._history_count + 1, self.history_size)
+
     def reset(self) -> None:
         """Reset the selector state."""
-        self._last_embedding = None
+        self._history_count = 0
+        self._history_next = 0
+        self.last_distance = None
+        self._gate_reference = None
+        self.frames_checked = 0
+        self.frames_gated = 0
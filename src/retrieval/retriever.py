@@ -1,29 +1,83 @@
 """Scene retrieval from visual memory."""
 
 import logging
-from typing import Optional
+import time
+from functools import lru_cache
+from typing import Any, Optional
 
 import numpy as np
-from qdrant_client.models import FieldCondition, Filter, MatchValue, Range
+from qdrant_client.models import FieldCondition, Filter, MatchValue, Range, SearchParams
 
-from src.memory.qdrant_client import QdrantMemoryClient
-from src.memory.schemas import MemoryPayload, RetrievalResult
+from src.memory.qdrant_client import MemoryClient
+from src.memory.schemas import PayloadRecord, RetrievalMatch
+from src.retrieval.room_cache import RoomCache
+from src.utils.timing import LatencyTracker
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _room_condition(room_id: str) -> FieldCondition:
+    # Nearly every query repeats the current room; build its condition once.
+    return FieldCondition(key="room_id", match=MatchValue(value=room_id))
+
+
+def build_filter(
+    room_id: Optional[str] = None,
+    time_start: Optional[float] = None,
+    time_end: Optional[float] = None,
+) -> Optional[Filter]:
+    """Build the room / timestamp-range filter of a query, or None."""
+    conditions = []
+
+    if room_id is not None:
+        conditions.append(_room_condition(room_id))
+    if time_start is not None or time_end is not None:
+        range_params = {}
+        if time_start is not None:
+            range_params["gte"] = time_start
+        if time_end is not None:
+            range_params["lte"] = time_end
+        conditions.append(
+            FieldCondition(key="timestamp", range=Range(**range_params))
+        )
+
+    return Filter(must=conditions) if conditions else None
+
+
+def to_matches(points: list[Any]) -> list[RetrievalMatch]:
+    """Convert scored points to unvalidated RetrievalMatch tuples."""
+    return [
+        RetrievalMatch(str(point.id), point.score, PayloadRecord.from_payload(point.payload))
+        for point in points
+    ]
+
+
 class SceneRetriever:
-    """Retrieves similar scenes from visual memory with optional filtering."""
+    """Retrieves similar scenes from visual memory with optional filtering.
+
+    With a `RoomCache`, queries filtered only by room are answered from the
+    cached copy of that room; other queries go to the memory backend.
+    Latencies of both paths are tracked separately. `search_params` (HNSW
+    beam width, exact search, quantization rescoring) is sent with every
+    backend query; the local backends always search exactly and ignore it.
+    """
 
     def __init__(
         self,
-        client: QdrantMemoryClient,
+        client: MemoryClient,
         top_k: int = 5,
         score_threshold: float = 0.5,
+        cache: Optional[RoomCache] = None,
+        search_params: Optional[SearchParams] = None,
     ) -> None:
         self.client = client
         self.top_k = top_k
         self.score_threshold = score_threshold
+        self.cache = cache
+        self.search_params = search_params
+        self.cache_latency = LatencyTracker()
+        self.backend_latency = LatencyTracker()
 
     def query(
         self,
@@ -32,7 +86,7 @@ class SceneRetriever:
         time_start: Optional[float] = None,
         time_end: Optional[float] = None,
         top_k: Optional[int] = None,
-    ) -> list[RetrievalResult]:
+    ) -> list[RetrievalMatch]:
         """Query visual memory for similar scenes.
 
         Args:
@@ -43,40 +97,112 @@ class SceneRetriever:
             top_k: Override default top_k.
 
         Returns:
-            List of RetrievalResult sorted by score descending.
+            Unvalidated RetrievalMatch tuples sorted by score descending.
         """
-        conditions = []
-
-        if room_id is not None:
-            conditions.append(
-                FieldCondition(key="room_id", match=MatchValue(value=room_id))
-            )
-        if time_start is not None or time_end is not None:
-            range_params = {}
-            if time_start is not None:
-                range_params["gte"] = time_start
-            if time_end is not None:
-                range_params["lte"] = time_end
-            conditions.append(
-                FieldCondition(key="timestamp", range=Range(**range_params))
-            )
-
-        query_filter = Filter(must=conditions) if conditions else None
+        t0 = time.perf_counter()
+        vector = self.client.to_vector(embedding)
         k = top_k or self.top_k
 
+        points = None
+        room_only = room_id is not None and time_start is None and time_end is None
+        if self.cache is not None and room_only:
+            points = self.cache.query(room_id, vector, k, self.score_threshold)
+            if points is not None:
+                self.cache_latency.record((time.perf_counter() - t0) * 1000)
+
+        if points is None:
+            points = self._query_backend(vector, room_id, time_start, time_end, k)
+            self.backend_latency.record((time.perf_counter() - t0) * 1000)
+
+        return to_matches(points)
+
+    def _query_backend(
+        self,
+        vector: list[float],
+        room_id: Optional[str],
+        time_start: Optional[float],
+        time_end: Optional[float],
+        k: int,
+    ) -> list[Any]:
         results = self.client.client.query_points(
             collection_name=self.client.collection_name,
-            query=embedding.tolist(),
-            query_filter=query_filter,
+            query=vector,
+            query_filter=build_filter(room_id, time_start, time_end),
             limit=k,
             score_threshold=self.score_threshold,
+            search_params=self.search_params,
+        )
+        return results.points
+
+    def summary(self) -> dict[str, Any]:
+        """Return query latencies per path and cache counters."""
+        summary: dict[str, Any] = {"backend": self.backend_latency.summary()}
+        if self.cache is not None:
+            summary["cache"] = self.cache_latency.summary()
+            summary.update(self.cache.summary())
+        return summary
+
+    def observe_writes(self, ids: list[Any], vectors: Any, payloads: list[dict]) -> None:
+        """`VisualMemory` write listener that keeps the room cache current."""
+        if self.cache is not None:
+            self.cache.observe(ids, vectors, payloads)
+
+
+class AsyncSceneRetriever:
+    """Asyncio counterpart of `SceneRetriever` for an `AsyncQdrantMemoryClient`.
+
+    `query` awaits the search, so other coroutines (stores, other cameras)
+    run while it is in flight. There is no room cache: it would be updated
+    from the event loop and answered from it, which only pays off for a
+    local, blocking backend.
+    """
+
+    def __init__(
+        self,
+        client: MemoryClient,
+        top_k: int = 5,
+        score_threshold: float = 0.5,
+        search_params: Optional[SearchParams] = None,
+    ) -> None:
+        self.client = client
+        self.top_k = top_k
+        self.score_threshold = score_threshold
+        self.search_params = search_params
+        self.backend_latency = LatencyTracker()
+
+    async def query(
+        self,
+        embedding: np.ndarray,
+        room_id: Optional[str] = None,
+        time_start: Optional[float] = None,
+        time_end: Optional[float] = None,
+        top_k: Optional[int] = None,
+    ) -> list[RetrievalMatch]:
+        """Query visual memory for similar scenes.
+
+        Args:
+            embedding: 512-dim query embedding.
+            room_id: Optional room filter.
+            time_start: Optional timestamp lower bound.
+            time_end: Optional timestamp upper bound.
+            top_k: Override default top_k.
+
+        Returns:
+            Unvalidated RetrievalMatch tuples sorted by score descending.
+        """
+        t0 = time.perf_counter()
+        results = await self.client.client.query_points(
+            collection_name=self.client.collection_name,
+            query=self.client.to_vector(embedding),
+            query_filter=build_filter(room_id, time_start, time_end),
+            limit=top_k or self.top_k,
+            score_threshold=self.score_threshold,
+            search_params=self.search_params,
         )
+        # Includes time waiting for the event loop, not only the round-trip.
+        self.backend_latency.record((time.perf_counter() - t0) * 1000)
+        return to_matches(results.points)
 
-        return [
-            RetrievalResult(
-                point_id=str(point.id),
-                score=point.score,
-                payload=MemoryPayload(**point.payload),
-            )
-            for point in results.points
-        ]
+    def summary(self) -> dict[str, Any]:
+        """Return query latencies."""
+        return {"backend": self.backend_latency.summary()}
@@ -0,0 +1,172 @@
+"""In-process cache of the vectors of recently queried rooms."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+from qdrant_client.models import FieldCondition, Filter, MatchValue, ScoredPoint
+
+from src.memory.numpy_store import NumpyCollection, normalize_rows
+from src.memory.qdrant_client import MemoryClient
+
+logger = logging.getLogger(__name__)
+
+_SCROLL_PAGE = 1024
+
+
+class RoomCache:
+    """Exact, room-scoped search over a local copy of each room's points.
+
+    A room is loaded in bulk from the memory backend the first time it is
+    queried. Cached rooms are kept current through `observe`, which should
+    be registered as a `VisualMemory` write listener, and the least recently
+    queried rooms are evicted once their total size exceeds `max_bytes`.
+    A room that alone exceeds the budget is not cached and its queries go
+    to the backend. Deletes made through other clients (e.g. compression)
+    are not seen; call `invalidate` after them.
+    """
+
+    def __init__(self, client: MemoryClient, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.client = client
+        self.max_bytes = max_bytes
+        self._rooms: OrderedDict[str, NumpyCollection] = OrderedDict()
+        self._too_large: set[str] = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(room.nbytes for room in self._rooms.values())
+
+    def _bytes_per_point(self) -> int:
+        probe = NumpyCollection("probe", self.client.vector_size, initial_capacity=1)
+        return probe.nbytes
+
+    def _load(self, room_id: str) -> Optional[NumpyCollection]:
+        """Copy every point of a room from the backend, or None if it is too large."""
+        max_points = self.max_bytes // self._bytes_per_point()
+        room = NumpyCollection(room_id, self.client.vector_size)
+        room_filter = Filter(must=[FieldCondition(key="room_id", match=MatchValue(value=room_id))])
+        offset = None
+        while True:
+            records, offset = self.client.client.scroll(
+                collection_name=self.client.collection_name,
+                scroll_filter=room_filter,
+                limit=_SCROLL_PAGE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if records:
+                room.write(
+                    [r.id for r in records],
+                    normalize_rows(np.asarray([r.vector for r in records]), room.vector_size),
+                    [r.payload for r in records],
+                )
+            if room.size > max_points:
+                logger.info("Room '%s' exceeds the cache budget; querying the backend", room_id)
+                return None
+            if offset is None:
+                break
+        room.trim()
+        logger.info("Cached room '%s': %d points", room_id, room.size)
+        return room
+
+    def _evict(self, keep: str) -> None:
+        while self.nbytes > self.max_bytes and len(self._rooms) > 1:
+            victim = next(r for r in self._rooms if r != keep)
+            del self._rooms[victim]
+            self.evictions += 1
+            logger.debug("Evicted room '%s' from the cache", victim)
+        if self.nbytes > self.max_bytes:
+            del self._rooms[keep]
+            self._too_large.add(keep)
+
+    def query(
+        self,
+        room_id: str,
+        vector: list[float],
+        limit: int,
+        score_threshold: Optional[float],
+    ) -> Optional[list[ScoredPoint]]:
+        """Search one room locally.
+
+        Args:
+            room_id: Room to search.
+            vector: Query vector as stored in the collection.
+            limit: Maximum number of results.
+            score_threshold: Minimum cosine score.
+
+        Returns:
+            Scored points, best first, or None if the room cannot be cached.
+        """
+        with self._lock:
+            if room_id in self._too_large:
+                return None
+            room = self._rooms.get(room_id)
+            if room is None:
+                self.misses += 1
+                room = self._load(room_id)
+                if room is None:
+                    self._too_large.add(room_id)
+                    return None
+                self._rooms[room_id] = room
+                self._evict(keep=room_id)
+                if room_id not in self._rooms:
+                    return None
+            else:
+                self.hits += 1
+            self._rooms.move_to_end(room_id)
+            return room.query_points(
+                collection_name=room_id,
+                query=vector,
+                limit=limit,
+                score_threshold=score_threshold,
+            ).points
+
+    def observe(self, ids: list[Any], vectors: np.ndarray, payloads: list[dict]) -> None:
+        """Apply written points to the rooms that are cached."""
+        with self._lock:
+            by_room: dict[str, list[int]] = {}
+            for i, payload in enumerate(payloads):
+                room_id = payload.get("room_id")
+                if room_id in self._rooms:
+                    by_room.setdefault(room_id, []).append(i)
+            for room_id, rows in by_room.items():
+                self._rooms[room_id].write(
+                    [ids[i] for i in rows],
+                    normalize_rows(vectors[rows], self.client.vector_size),
+                    [payloads[i] for i in rows],
+                )
+            if by_room:
+                self._evict(keep=next(reversed(self._rooms)))
+
+    def invalidate(self, room_id: Optional[str] = None) -> None:
+        """Drop one room, or every room, so the next query reloads it."""
+        with self._lock:
+            if room_id is None:
+                self._rooms.clear()
+                self._too_large.clear()
+            else:
+                self._rooms.pop(room_id, None)
+                self._too_large.discard(room_id)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> dict[str, float]:
+        """Return a summary dict of cache counters."""
+        return {
+            "rooms": len(self._rooms),
+            "mb": round(self.nbytes / 2**20, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
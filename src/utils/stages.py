@@ -0,0 +1,158 @@
+"""Threaded stage pipeline with bounded queues."""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class _StageError:
+    """Carries an exception raised inside a worker thread downstream."""
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        self.stage = stage
+        self.error = error
+
+
+class StagedPipeline:
+    """Runs a source and a chain of stages on dedicated worker threads.
+
+    Each stage owns one thread and writes into a bounded queue read by the
+    next stage, so items keep their source order and a slow stage applies
+    backpressure to everything upstream of it. Iterating the pipeline yields
+    the output of the last stage on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: list[tuple[str, Callable[[Any], Any]]],
+        source_name: str = "source",
+        queue_size: int = 8,
+        should_stop: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self.source = source
+        self.stages = stages
+        self.source_name = source_name
+        self.queue_size = queue_size
+        self.should_stop = should_stop or (lambda: False)
+        self.poll_interval = poll_interval
+
+        self._names = [source_name] + [name for name, _ in stages]
+        self._queues: list[queue.Queue] = [
+            queue.Queue(maxsize=queue_size) for _ in self._names
+        ]
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "StagedPipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start one worker thread per stage."""
+        if self._threads:
+            return
+        self._threads.append(
+            threading.Thread(
+                target=self._run_source, name=self.source_name, daemon=True
+            )
+        )
+        for i, (name, fn) in enumerate(self.stages):
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(fn, self._queues[i], self._queues[i + 1]),
+                    name=name,
+                    daemon=True,
+                )
+            )
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            "Started staged pipeline: %s (queue_size=%d)",
+            " -> ".join(self._names),
+            self.queue_size,
+        )
+
+    def __iter__(self) -> Iterator[Any]:
+        self.start()
+        out = self._queues[-1]
+        while True:
+            item = self._get(out)
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                self.close()
+                raise RuntimeError(
+                    f"Pipeline stage '{item.stage}' failed"
+                ) from item.error
+            yield item
+
+    def queue_depths(self) -> dict[str, int]:
+        """Return the number of items waiting in each stage's output queue."""
+        return {name: q.qsize() for name, q in zip(self._names, self._queues)}
+
+    def close(self) -> None:
+        """Stop all workers and wait for them to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _stopping(self) -> bool:
+        return self._stop.is_set() or self.should_stop()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stopping():
+            try:
+                q.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stopping():
+            try:
+                return q.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _run_source(self) -> None:
+        out = self._queues[0]
+        try:
+            for item in self.source:
+                if not self._put(out, item):
+                    return
+        except Exception as e:
+            logger.exception("Pipeline source '%s' failed", self.source_name)
+            self._put(out, _StageError(self.source_name, e))
+            return
+        self._put(out, _END)
+
+    def _run_stage(
+        self, fn: Callable[[Any], Any], inbox: queue.Queue, out: queue.Queue
+    ) -> None:
+        name = threading.current_thread().name
+        while True:
+            item = self._get(inbox)
+            if item is _END or isinstance(item, _StageError):
+                self._put(out, item)
+                return
+            try:
+                result = fn(item)
+            except Exception as e:
+                logger.exception("Pipeline stage '%s' failed", name)
+                self._put(out, _StageError(name, e))
+                return
+            if not self._put(out, result):
+                return
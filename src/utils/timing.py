@@ -49,6 +49,16 @@ class LatencyTracker:
     def min_ms(self) -> float:
         return min(self._samples) if self._samples else 0.0
 
+    def percentile_ms(self, q: float) -> float:
+        """Return the q-th percentile (0-100) of the samples, linearly interpolated."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        pos = (len(ordered) - 1) * q / 100
+        lo = int(pos)
+        hi = min(lo + 1, len(ordered) - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
     def summary(self) -> dict[str, float]:
         """Return a summary dict of tracked latencies."""
         return {
@@ -56,4 +66,6 @@ class LatencyTracker:
             "mean_ms": round(self.mean_ms, 2),
             "min_ms": round(self.min_ms, 2),
             "max_ms": round(self.max_ms, 2),
+            "p50_ms": round(self.percentile_ms(50), 2),
+            "p99_ms": round(self.percentile_ms(99), 2),
         }
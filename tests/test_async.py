@@ -0,0 +1,120 @@
+"""Tests for the asyncio memory client, writer and retriever."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from src.memory.compressor import AsyncMemoryCompressor
+from src.memory.novelty_gate import NoveltyGate
+from src.memory.qdrant_client import AsyncQdrantMemoryClient
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import AsyncVisualMemory
+from src.retrieval.retriever import AsyncSceneRetriever
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+async def _memory_client(qdrant: AsyncQdrantClient, name: str) -> AsyncQdrantMemoryClient:
+    client = AsyncQdrantMemoryClient(collection_name=name, client=qdrant)
+    await client.ensure_collection()
+    await client.ensure_collection()  # idempotent
+    return client
+
+
+def test_cameras_share_one_client_with_writes_in_flight():
+    """Two memories on one client should store, query and refresh concurrently."""
+
+    async def camera(qdrant, name, places):
+        client = await _memory_client(qdrant, name)
+        memory = AsyncVisualMemory(client, batch_size=2)
+        retriever = AsyncSceneRetriever(client, top_k=3, score_threshold=-1.0)
+        gate = NoveltyGate(memory, threshold=0.95, refresh_batch_size=1)
+        stored = []
+        for ts, emb in enumerate(places, start=1):
+            matches = await retriever.query(emb, room_id="lab")
+            stored.append(await gate.offer_async(emb, MemoryPayload(timestamp=ts, room_id="lab"), matches))
+            await asyncio.sleep(0)
+        await gate.flush_async()
+        await memory.close()
+        return client, retriever, gate, stored
+
+    async def run():
+        qdrant = AsyncQdrantClient(":memory:")
+        places = _embeddings(4)
+        # The fifth visit repeats the first place after it has been written.
+        route = [places[0], places[1], places[2], places[3], places[0]]
+        results = await asyncio.gather(
+            camera(qdrant, "front", route), camera(qdrant, "rear", places[:3])
+        )
+        (front, retriever, gate, stored), (rear, *_) = results
+        counts = (await front.count(), await rear.count())
+        matches = await retriever.query(places[0], room_id="lab", time_end=1.0)
+        await qdrant.close()
+        return counts, gate, stored, matches
+
+    counts, gate, stored, matches = asyncio.run(run())
+    assert counts == (4, 3)
+    assert stored[4] is None and all(stored[:4])
+    assert gate.summary() == {"stored": 4, "skipped": 1, "skip_rate": 0.2}
+    assert matches[0].point_id == stored[0]
+    assert matches[0].payload.last_seen == 5.0
+    assert len(matches) == 1
+
+
+def test_failed_write_surfaces_on_flush():
+    """A failed background upsert should be raised by the next flush and retried."""
+
+    async def run():
+        client = AsyncQdrantMemoryClient(collection_name="mem", client=AsyncMock())
+        client.client.upsert.side_effect = [ConnectionError("down"), None]
+        memory = AsyncVisualMemory(client, batch_size=1)
+        await memory.store(_embeddings(1)[0], MemoryPayload(timestamp=1.0, room_id="lab"))
+        with pytest.raises(RuntimeError, match="Background flush failed"):
+            await memory.flush()
+        assert await memory.flush() == 1
+        assert await memory.flush() == 0
+
+    asyncio.run(run())
+
+
+def test_batch_after_failed_write_survives():
+    """The batch of a failed write and the next full batch should both stay buffered."""
+
+    async def run():
+        client = AsyncQdrantMemoryClient(collection_name="mem", client=AsyncMock())
+        client.client.upsert.side_effect = [ConnectionError("down"), None]
+        memory = AsyncVisualMemory(client, batch_size=1)
+        emb = _embeddings(2)
+        await memory.store(emb[0], MemoryPayload(timestamp=1.0, room_id="lab"))
+        with pytest.raises(RuntimeError, match="Background flush failed"):
+            await memory.store(
+                emb[1], MemoryPayload(timestamp=2.0, room_id="lab"), point_id="second"
+            )
+        assert memory.buffer_size == 2
+        assert await memory.flush() == 2
+        first, second = client.client.upsert.call_args.kwargs["points"]
+        assert second.id == "second"
+
+    asyncio.run(run())
+
+
+def test_async_compressor_and_store_many():
+    """Bulk-stored aged memories should be compressed through the async client."""
+
+    async def run():
+        qdrant = AsyncQdrantClient(":memory:")
+        client = await _memory_client(qdrant, "mem")
+        memory = AsyncVisualMemory(client)
+        await memory.store_many(_embeddings(30), MemoryPayload.bulk(np.arange(30.0), room_id="lab"))
+        deleted = await AsyncMemoryCompressor(client, keep_every_nth=3).compress()
+        remaining = await client.count()
+        await qdrant.close()
+        return deleted, remaining
+
+    assert asyncio.run(run()) == (20, 10)
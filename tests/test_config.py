@@ -0,0 +1,79 @@
+"""Tests for config loading, component builders and import cost."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.config import (
+    build_embedding_cache,
+    build_memory_client,
+    build_retriever,
+    build_sampler,
+    build_selector,
+    load_config,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def config():
+    return load_config(str(ROOT / "config" / "default.yaml"))
+
+
+def test_optional_components_follow_enabled_flags(config):
+    """Cache and sampler are only built when enabled."""
+    assert build_embedding_cache(config) is None
+    assert build_sampler(config) is None
+
+    config["perception"]["cache"] = {"enabled": True, "max_entries": 4}
+    config["sampling"] = {"enabled": True, "max_stride": 4}
+    assert build_embedding_cache(config).max_entries == 4
+    assert build_sampler(config).max_stride == 4
+
+
+def test_build_selector_gate(config):
+    """The pixel gate threshold is only set when the gate is enabled."""
+    config["keyframe"]["gate"] = {"enabled": False, "threshold": 0.05}
+    assert build_selector(config).gate_threshold is None
+    config["keyframe"]["gate"]["enabled"] = True
+    assert build_selector(config).gate_threshold == 0.05
+
+
+def test_retriever_sends_search_params(config):
+    """Configured search settings should accompany every backend query."""
+    config["memory"]["backend"] = "numpy"
+    client = build_memory_client(config)
+    assert build_retriever(config, client).search_params is None
+
+    config["retrieval"]["search"] = {"hnsw_ef": 128, "oversampling": 2.0}
+    retriever = build_retriever(config, client)
+    calls = []
+    query_points = client.client.query_points
+    client.client.query_points = lambda **kw: calls.append(kw) or query_points(**kw)
+    retriever.query(np.ones(512, dtype=np.float32))
+
+    params = calls[0]["search_params"]
+    assert params.hnsw_ef == 128 and params.exact is False
+    assert params.quantization.oversampling == 2.0
+
+
+@pytest.mark.parametrize(
+    "script", ["scripts/reset_collection.py", "scripts/compress_memories.py"]
+)
+def test_qdrant_scripts_skip_encoder_stack(script):
+    """Scripts that only talk to Qdrant must not import torch, open_clip or cv2."""
+    code = (
+        "import runpy, sys; "
+        f"runpy.run_path({script!r}, run_name='__test__'); "
+        "import src.memory.qdrant_client; "
+        "print(','.join(m for m in ('torch', 'open_clip', 'cv2') if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
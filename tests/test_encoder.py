@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
+import torch
 from PIL import Image
 
 from src.perception.encoder import CLIPEncoder
@@ -63,3 +64,355 @@ def test_encode_empty_image(mock_encoder):
     image = Image.fromarray(np.zeros((1, 1, 3), dtype=np.uint8))
     result = mock_encoder.encode(image)
     assert result.shape == (512,)
+
+
+class _FakeBatchEncoder:
+    """Records batch sizes and returns one-hot embeddings keyed by input."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes: list[int] = []
+
+    def encode_batch(self, images):
+        import time
+
+        time.sleep(self.delay)
+        self.batch_sizes.append(len(images))
+        out = np.zeros((len(images), 512), dtype=np.float32)
+        for i, idx in enumerate(images):
+            out[i, idx] = 1.0
+        return out
+
+
+def test_batching_encoder_groups_requests():
+    """Concurrent submissions should share forward passes and keep results aligned."""
+    from src.perception.batching_encoder import BatchingEncoder
+
+    fake = _FakeBatchEncoder()
+    batcher = BatchingEncoder(fake, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(10)]
+    results = [f.result(timeout=2) for f in futures]
+    batcher.close()
+
+    for i, emb in enumerate(results):
+        assert emb.shape == (512,)
+        assert emb[i] == 1.0
+    assert sum(fake.batch_sizes) == 10
+    assert max(fake.batch_sizes) <= 4
+    assert batcher.batches < 10
+
+
+def test_batching_encoder_flushes_partial_batch_after_wait():
+    """A lone request should be encoded once max_wait_ms expires."""
+    import time
+
+    from src.perception.batching_encoder import BatchingEncoder
+
+    fake = _FakeBatchEncoder()
+    batcher = BatchingEncoder(fake, max_batch_size=16, max_wait_ms=20)
+    t0 = time.perf_counter()
+    emb = batcher.encode(3)
+    elapsed = time.perf_counter() - t0
+    batcher.close()
+
+    assert emb[3] == 1.0
+    assert fake.batch_sizes == [1]
+    assert elapsed < 1.0
+
+
+def test_batching_encoder_propagates_errors():
+    """A failing batch should fail every future in it."""
+    from src.perception.batching_encoder import BatchingEncoder
+
+    broken = MagicMock()
+    broken.encode_batch.side_effect = RuntimeError("model failure")
+    batcher = BatchingEncoder(broken, max_batch_size=2, max_wait_ms=5)
+    future = batcher.submit(0)
+    with pytest.raises(RuntimeError, match="model failure"):
+        future.result(timeout=2)
+    batcher.close()
+
+
+def test_batching_encoder_close_during_submit():
+    """A request enqueued while close() runs should still be encoded."""
+    import queue
+    import threading
+    import time
+
+    from src.perception.batching_encoder import BatchingEncoder
+
+    class _RacingQueue(queue.Queue):
+        def put(self, item, *args, **kwargs):
+            if isinstance(item, tuple) and not closer.is_alive():
+                # close() starts between submit's closed check and its enqueue.
+                closer.start()
+                time.sleep(0.05)
+            super().put(item, *args, **kwargs)
+
+    fake = _FakeBatchEncoder()
+    with patch.object(queue, "Queue", _RacingQueue):
+        batcher = BatchingEncoder(fake, max_batch_size=4, max_wait_ms=5)
+    closer = threading.Thread(target=batcher.close)
+    future = batcher.submit(2)
+    closer.join(timeout=2)
+    assert future.result(timeout=2)[2] == 1.0
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(0)
+
+
+@pytest.fixture
+def array_encoder():
+    """Encoder with a stub model and open_clip's real eval transform."""
+    import open_clip
+    import torch
+
+    transform = open_clip.image_transform(
+        224,
+        is_train=False,
+        mean=open_clip.OPENAI_DATASET_MEAN,
+        std=open_clip.OPENAI_DATASET_STD,
+    )
+
+    class _MeanPoolModel(torch.nn.Module):
+        def encode_image(self, x):
+            pooled = x.mean(dim=(2, 3))
+            return torch.cat([pooled, torch.ones(x.shape[0], 509)], dim=1)
+
+    with patch("open_clip.create_model_and_transforms") as create:
+        create.return_value = (_MeanPoolModel(), None, transform)
+        yield CLIPEncoder(model_name="ViT-B-32", pretrained="test", device="cpu")
+
+
+def _textured_frame(h: int, w: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w]
+    wave = 60 * np.sin(xx / 17.0) * np.cos(yy / 11.0)
+    frame = 127 + wave[..., None] + rng.normal(0, 20, (h, w, 3))
+    return frame.clip(0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(480, 640), (720, 1280), (300, 200), (224, 224), (37, 51)])
+def test_preprocess_array_matches_pil(array_encoder, shape):
+    """Tensor preprocessing should match the PIL transform within tolerance."""
+    from src.perception.encoder import ARRAY_PREPROCESS_ATOL
+
+    frame = _textured_frame(*shape)
+    expected = array_encoder.preprocess(Image.fromarray(frame))
+    actual = array_encoder.preprocess_array(frame)[0]
+    assert actual.shape == expected.shape
+    assert float((actual - expected).abs().max()) <= ARRAY_PREPROCESS_ATOL
+
+
+def test_preprocess_array_batch_and_bgr(array_encoder):
+    """Batches should be processed at once and BGR input swapped to RGB."""
+    frames = np.stack([_textured_frame(120, 160, seed=s) for s in range(4)])
+    rgb = array_encoder.preprocess_array(frames)
+    bgr = array_encoder.preprocess_array(frames[..., ::-1], bgr=True)
+    assert rgb.shape == (4, 3, 224, 224)
+    assert np.allclose(rgb.numpy(), bgr.numpy(), atol=1e-6)
+
+
+def test_encode_accepts_arrays_and_tensors(array_encoder):
+    """encode should give the same embedding for PIL, array and tensor input."""
+    frame = _textured_frame(240, 320)
+    from_pil = array_encoder.encode(Image.fromarray(frame))
+    from_array = array_encoder.encode(frame)
+    from_tensor = array_encoder.encode(array_encoder.preprocess_array(frame))
+    assert from_array.shape == (512,)
+    assert float(np.dot(from_pil, from_array)) > 0.999
+    assert np.allclose(from_array, from_tensor)
+
+    batch = array_encoder.encode_batch(np.stack([frame, frame]))
+    assert batch.shape == (2, 512)
+
+
+class _TinyClip(torch.nn.Module):
+    """Minimal stand-in exposing open_clip's encode_image."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.net = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 7, stride=4),
+            torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1),
+            torch.nn.Flatten(),
+            torch.nn.Linear(8, 512),
+        ).eval()
+
+    def encode_image(self, x):
+        return self.net(x)
+
+
+@pytest.mark.parametrize("backend", ["torchscript", "onnx", "onnx-int8"])
+def test_backend_export_matches_eager(tmp_path, backend):
+    """Exported backends should agree with the eager model and be cached."""
+    import torch
+
+    from src.perception.accuracy import cosine_agreement
+    from src.perception.backends import artifact_path, load_backend
+
+    if backend.startswith("onnx"):
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+
+    model = _TinyClip()
+    forward = load_backend(
+        backend, model, "tiny", "test", cache_dir=str(tmp_path), image_size=(64, 64)
+    )
+    path = artifact_path(str(tmp_path), "tiny", "test", backend)
+    assert path.exists()
+
+    x = torch.randn(3, 3, 64, 64)
+    with torch.no_grad():
+        agreement = cosine_agreement(model.encode_image(x).numpy(), forward(x).numpy())
+    assert agreement.shape == (3,)
+    assert agreement.min() > 0.99
+
+    # A cached artifact loads without the eager model.
+    cached = load_backend(
+        backend, None, "tiny", "test", cache_dir=str(tmp_path), image_size=(64, 64)
+    )
+    with torch.no_grad():
+        assert torch.allclose(cached(x), forward(x), atol=1e-5)
+
+
+def test_torch_backend_uses_eager_model(tmp_path):
+    """The default backend should not export anything."""
+    from src.perception.backends import load_backend
+
+    assert load_backend("torch", _TinyClip(), "tiny", "test", cache_dir=str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(ValueError):
+        load_backend("tensorrt", _TinyClip(), "tiny", "test", cache_dir=str(tmp_path))
+
+
+def test_embedding_cache_lru_and_counters():
+    """The memory tier should evict least recently used entries."""
+    from src.perception.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(namespace="m/p", max_entries=2)
+    frames = [np.full((8, 8, 3), i, dtype=np.uint8) for i in range(3)]
+    keys = [cache.key(f) for f in frames]
+    assert len(set(keys)) == 3
+    assert cache.key(frames[0], bgr=True) != keys[0]
+    assert EmbeddingCache(namespace="other/p").key(frames[0]) != keys[0]
+
+    assert cache.get(keys[0]) is None
+    cache.put(keys[0], np.ones(512, dtype=np.float32))
+    cache.put(keys[1], np.ones(512, dtype=np.float32))
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], np.ones(512, dtype=np.float32))
+
+    assert cache.get(keys[1]) is None
+    assert len(cache) == 2
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_embedding_cache_disk_tier(tmp_path):
+    """Entries written to disk should be found by a fresh cache."""
+    from src.perception.embedding_cache import EmbeddingCache
+
+    frame = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+    first = EmbeddingCache(namespace="m/p", disk_dir=str(tmp_path))
+    first.put(first.key(frame), np.full(512, 0.5, dtype=np.float32))
+
+    second = EmbeddingCache(namespace="m/p", disk_dir=str(tmp_path))
+    cached = second.get(second.key(frame))
+    assert cached is not None and cached[0] == 0.5
+    assert second.disk_hits == 1
+
+
+def test_encoder_skips_model_on_cache_hit(array_encoder):
+    """Re-encoding identical pixels should be served from the cache."""
+    from src.perception.embedding_cache import EmbeddingCache
+
+    array_encoder.cache = EmbeddingCache(namespace="m/p")
+    calls = []
+    original = array_encoder.model.encode_image
+    array_encoder.model.encode_image = lambda x: calls.append(len(x)) or original(x)
+
+    frame = _textured_frame(120, 160)
+    first = array_encoder.encode(frame, bgr=True)
+    second = array_encoder.encode(frame.copy(), bgr=True)
+    batch = array_encoder.encode_batch([frame, _textured_frame(120, 160, seed=1)], bgr=True)
+
+    assert np.array_equal(first, second)
+    assert np.array_equal(batch[0], first)
+    assert calls == [1, 1]
+    assert array_encoder.cache.hits == 2
+
+
+def test_snapshot_skips_open_clip_on_restart(tmp_path):
+    """A saved snapshot should load without open_clip and match the eager model."""
+    import open_clip
+
+    from src.perception.backends import artifact_path, load_snapshot
+
+    transform = open_clip.image_transform(224, is_train=False)
+    frame = _textured_frame(240, 320)
+    with patch("open_clip.create_model_and_transforms") as create:
+        create.return_value = (_TinyClip(), None, transform)
+        first = CLIPEncoder(
+            pretrained="test", device="cpu", cache_dir=str(tmp_path), snapshot=True
+        )
+    assert artifact_path(str(tmp_path), "ViT-B-32", "test", "snapshot").exists()
+
+    with patch("open_clip.create_model_and_transforms") as create:
+        second = CLIPEncoder(
+            pretrained="test", device="cpu", cache_dir=str(tmp_path), snapshot=True
+        )
+    create.assert_not_called()
+    assert second.model is None
+    assert np.allclose(second.encode(frame), first.encode(frame), atol=1e-5)
+
+    image = Image.fromarray(frame)
+    assert torch.allclose(second.preprocess(image), first.preprocess(image), atol=1e-6)
+
+    # A different pretrained tag must not reuse the snapshot.
+    path = artifact_path(str(tmp_path), "ViT-B-32", "test", "snapshot")
+    assert load_snapshot(path, "ViT-B-32", "other", "cpu") is None
+
+
+def test_topk_agreement():
+    """Identical sets agree fully; a permuted candidate set does not."""
+    from src.perception.accuracy import topk_agreement
+
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(20, 16)).astype(np.float32)
+    assert topk_agreement(reference, reference, k=5).min() == 1.0
+
+    noisy = reference + rng.normal(scale=1e-4, size=reference.shape)
+    assert topk_agreement(reference, noisy, k=5).mean() > 0.95
+    shuffled = reference[rng.permutation(20)]
+    assert topk_agreement(reference, shuffled, k=5).mean() < 0.6
+
+
+def test_bf16_precision_close_to_fp32():
+    """bf16 autocast should keep embeddings close and report float32."""
+    import open_clip
+
+    from src.perception.encoder import bf16_supported
+
+    transform = open_clip.image_transform(224, is_train=False)
+    frames = np.stack([_textured_frame(120, 160, seed=s) for s in range(4)])
+    encoders = {}
+    for precision in ("fp32", "bf16"):
+        with patch("open_clip.create_model_and_transforms") as create:
+            create.return_value = (_TinyClip(), None, transform)
+            encoders[precision] = CLIPEncoder(
+                pretrained="test", device="cpu", precision=precision, channels_last=True
+            )
+
+    expected = "bf16" if bf16_supported() else "fp32"
+    assert encoders["bf16"].precision == expected
+    fp32 = encoders["fp32"].encode_batch(frames)
+    bf16 = encoders["bf16"].encode_batch(frames)
+    assert bf16.dtype == np.float32
+    assert float((fp32 * bf16).sum(axis=1).min()) > 0.99
+
+    with pytest.raises(ValueError):
+        with patch("open_clip.create_model_and_transforms") as create:
+            create.return_value = (_TinyClip(), None, transform)
+            CLIPEncoder(pretrained="test", device="cpu", precision="fp8")
@@ -0,0 +1,59 @@
+"""Tests for multi-camera frame grouping."""
+
+import pytest
+
+from ros2.visual_memory_node import camera_ids_from_topics
+from src.perception.frame_grouper import FrameGrouper
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_group_released_when_all_cameras_report():
+    """A group should be released as soon as every camera has a frame."""
+    grouper = FrameGrouper(["front", "left", "right"], window_ms=20.0)
+    assert grouper.add("right", "r0") is None
+    assert grouper.add("front", "f0") is None
+    group = grouper.add("left", "l0")
+    assert group == [("front", "f0"), ("left", "l0"), ("right", "r0")]
+    assert grouper.flush() is None
+
+
+def test_partial_group_released_after_window():
+    """A lagging camera should not hold back the others past the window."""
+    clock = _Clock()
+    grouper = FrameGrouper(["front", "left"], window_ms=20.0, clock=clock)
+    grouper.add("front", "f0")
+    clock.now = 0.010
+    assert grouper.poll() is None
+    grouper.add("front", "f1")
+    clock.now = 0.025
+    assert grouper.poll() == [("front", "f1")]
+    assert grouper.frames_replaced == 1
+    assert grouper.poll() is None
+
+
+def test_grouper_stats_and_unknown_camera():
+    grouper = FrameGrouper(["a", "b"])
+    grouper.add("a", 1)
+    grouper.add("b", 2)
+    grouper.add("a", 3)
+    grouper.flush()
+    assert grouper.groups == 2
+    assert grouper.mean_group_size == 1.5
+    with pytest.raises(KeyError):
+        grouper.add("c", 4)
+
+
+def test_camera_ids_from_topics_must_be_distinct():
+    """Topics that map to the same camera id should be rejected."""
+    assert camera_ids_from_topics(["/a/cam/image_raw", "/b/cam/image_raw"]) == ["a_cam", "b_cam"]
+    with pytest.raises(ValueError, match="distinct camera ids"):
+        camera_ids_from_topics(["/front/image_raw", "/front/image_rect"])
+    with pytest.raises(ValueError):
+        camera_ids_from_topics(["/camera/image_raw", "/camera/image_raw"])
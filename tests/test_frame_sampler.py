@@ -0,0 +1,67 @@
+"""Tests for adaptive grab-only frame striding."""
+
+import numpy as np
+import pytest
+
+from src.perception.frame_sampler import AdaptiveFrameSampler, read_frames
+
+
+class _FakeCapture:
+    """Minimal cv2.VideoCapture stand-in that counts grabs and reads."""
+
+    def __init__(self, num_frames: int):
+        self.num_frames = num_frames
+        self.position = 0
+        self.grabs = 0
+        self.reads = 0
+
+    def grab(self) -> bool:
+        if self.position >= self.num_frames:
+            return False
+        self.position += 1
+        self.grabs += 1
+        return True
+
+    def read(self):
+        if self.position >= self.num_frames:
+            return False, None
+        self.position += 1
+        self.reads += 1
+        return True, np.full((4, 4, 3), self.position, dtype=np.uint8)
+
+
+def test_read_frames_numbers_every_frame():
+    """Without sampling every frame should be read and numbered from 1."""
+    cap = _FakeCapture(5)
+    assert [n for n, _ in read_frames(cap)] == [1, 2, 3, 4, 5]
+
+
+def test_stride_grows_when_static_and_resets_on_keyframe():
+    """Low distances widen the stride; a keyframe snaps back to the minimum."""
+    sampler = AdaptiveFrameSampler(min_stride=1, max_stride=8, threshold=0.2)
+    assert [sampler.update(False, 0.01) for _ in range(5)] == [2, 4, 8, 8, 8]
+    assert sampler.update(False, 0.19) == 4
+    assert sampler.update(False, 0.12) == 4
+    assert sampler.update(True, 0.25) == 1
+
+
+def test_frames_skip_with_grab_only():
+    """Skipped frames should be grabbed, never read, with correct numbering."""
+    cap = _FakeCapture(20)
+    sampler = AdaptiveFrameSampler(min_stride=1, max_stride=4, threshold=0.2)
+    sampler.stride = 4
+
+    numbers = []
+    for n, frame in sampler.frames(cap):
+        numbers.append(n)
+        assert frame[0, 0, 0] == n
+
+    assert numbers == [4, 8, 12, 16, 20]
+    assert cap.reads == 5
+    assert cap.grabs == 15
+    assert sampler.summary()["frames_skipped"] == 15
+
+
+def test_invalid_strides_rejected():
+    with pytest.raises(ValueError):
+        AdaptiveFrameSampler(min_stride=4, max_stride=2)
@@ -0,0 +1,103 @@
+"""Tests for segmented, multi-video ingestion."""
+
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.ingestion import expand_video_inputs, ingest_videos, plan_segments
+
+CONFIG = {
+    "perception": {"model_name": "ViT-B-32", "pretrained": "test"},
+    "keyframe": {"threshold": 0.15},
+    "memory": {
+        "qdrant_host": "localhost",
+        "qdrant_port": 6333,
+        "collection_name": "test_collection",
+        "vector_size": 512,
+    },
+}
+
+
+class _BrightnessEncoder:
+    """Maps mean frame brightness to an angle on the unit circle."""
+
+    cache = None
+
+    def encode(self, frame, bgr=False):
+        angle = float(frame.mean()) / 50.0
+        emb = np.zeros(512, dtype=np.float32)
+        emb[0], emb[1] = np.cos(angle), np.sin(angle)
+        return emb
+
+
+@pytest.fixture
+def video(tmp_path):
+    """A 60-frame video whose brightness drifts slowly, so keyframes depend on history."""
+    path = str(tmp_path / "patrol.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 24))
+    for i in range(60):
+        writer.write(np.full((24, 32, 3), i * 3, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _ingest(video: str, config: dict, **kwargs) -> tuple[dict, np.ndarray]:
+    """Run ingest_videos against a mocked Qdrant; return the summary and stored vectors."""
+    with patch("src.memory.qdrant_client.QdrantClient") as MockClient, patch(
+        "src.ingestion.build_encoder", return_value=_BrightnessEncoder()
+    ):
+        MockClient.return_value.get_collections.return_value = MagicMock(collections=[])
+        summary = ingest_videos([video], config, room_id="lab", **kwargs)
+    upserts = MockClient.return_value.upsert.call_args_list
+    assert all(call.kwargs["points"].payloads[0]["room_id"] == "lab" for call in upserts)
+    vectors = [v for call in upserts for v in call.kwargs["points"].vectors]
+    return summary, np.asarray(vectors)
+
+
+def test_expand_video_inputs(tmp_path):
+    """Files, directories and globs should resolve to unique video paths."""
+    (tmp_path / "day1").mkdir()
+    for name in ["day1/a.mp4", "day1/b.avi", "day1/notes.txt", "c.mkv"]:
+        (tmp_path / name).write_bytes(b"")
+
+    paths = expand_video_inputs(
+        [str(tmp_path / "day1"), str(tmp_path / "*.mkv"), str(tmp_path / "c.mkv")]
+    )
+    assert [p.split("/")[-1] for p in paths] == ["c.mkv", "a.mp4", "b.avi"]
+
+
+def test_plan_segments():
+    """Videos should be split into ranges, the last one open-ended."""
+    with patch("src.ingestion.count_frames", return_value=250):
+        segments = plan_segments(["v.mp4"], segment_frames=100)
+    assert [(s.start_frame, s.end_frame) for s in segments] == [(0, 100), (100, 200), (200, None)]
+    assert not any(s.whole for s in segments)
+    with patch("src.ingestion.count_frames", return_value=250):
+        assert [s.whole for s in plan_segments(["v.mp4"], segment_frames=0)] == [True]
+        assert [s.whole for s in plan_segments(["v.mp4"], segment_frames=300)] == [True]
+
+
+def test_plan_segments_with_unknown_frame_count():
+    """A video that reports no frame count should become one whole segment."""
+    capture = MagicMock()
+    capture.get.side_effect = lambda prop: 0.0 if prop == cv2.CAP_PROP_FRAME_COUNT else 30.0
+    with patch("cv2.VideoCapture", return_value=capture):
+        segments = plan_segments(["stream.mkv"], segment_frames=100)
+    assert [(s.start_frame, s.end_frame) for s in segments] == [(0, None)]
+
+
+@pytest.mark.parametrize("gate", [False, True])
+def test_segmented_ingestion_matches_sequential(video, gate):
+    """Splitting a video anywhere should store exactly the keyframes of one pass."""
+    config = {**CONFIG, "keyframe": {"threshold": 0.15, "gate": {"enabled": gate, "threshold": 0.02}}}
+    whole, expected = _ingest(video, config)
+    assert whole["frames"] == 60
+    assert 3 <= whole["keyframes"] < 20
+
+    for segment_frames in (7, 25):
+        split, stored = _ingest(video, config, segment_frames=segment_frames)
+        assert split["segments"] == -(-60 // segment_frames)
+        assert (split["frames"], split["keyframes"]) == (60, whole["keyframes"])
+        np.testing.assert_array_equal(stored, expected)
@@ -0,0 +1,98 @@
+"""Tests for keyframe selection and the pre-encoder pixel gate."""
+
+import numpy as np
+import pytest
+
+from src.perception.keyframe_selector import KeyframeSelector, frame_thumbnail
+
+
+def _unit(v):
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_first_frame_is_keyframe():
+    """The first embedding should always be accepted."""
+    selector = KeyframeSelector(threshold=0.15)
+    is_kf, _ = selector.is_keyframe(_unit([1.0, 0.0]))
+    assert is_kf
+
+
+def test_small_change_is_not_keyframe():
+    """Embeddings close to the last keyframe should be rejected."""
+    selector = KeyframeSelector(threshold=0.15)
+    selector.is_keyframe(_unit([1.0, 0.0]))
+    is_kf, _ = selector.is_keyframe(_unit([1.0, 0.1]))
+    assert not is_kf
+    is_kf, _ = selector.is_keyframe(_unit([0.0, 1.0]))
+    assert is_kf
+
+
+def test_thumbnail_shape_and_range():
+    """Thumbnails should be square, grayscale and scaled to [0, 1]."""
+    frame = np.full((480, 640, 3), 255, dtype=np.uint8)
+    thumb = frame_thumbnail(frame, size=16)
+    assert thumb.shape == (16, 16)
+    assert np.allclose(thumb, 1.0)
+    assert frame_thumbnail(np.zeros((5, 7, 3), dtype=np.uint8), 16).shape == (16, 16)
+
+
+def test_gate_disabled_by_default():
+    """Without a gate threshold every frame should be encoded."""
+    selector = KeyframeSelector()
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    assert all(selector.should_encode(frame) for _ in range(5))
+    assert selector.frames_checked == 0
+
+
+def test_gate_skips_static_frames():
+    """Near-identical frames should be gated and counted."""
+    selector = KeyframeSelector(gate_threshold=0.02)
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+    assert selector.should_encode(base)
+    for _ in range(9):
+        noisy = np.clip(base.astype(int) + rng.integers(-2, 3, base.shape), 0, 255)
+        assert not selector.should_encode(noisy.astype(np.uint8))
+
+    assert selector.frames_checked == 10
+    assert selector.frames_gated == 9
+    assert selector.gated_fraction == pytest.approx(0.9)
+
+
+def test_gate_passes_changed_frames_and_accumulates_drift():
+    """Large changes pass, and slow drift passes once it adds up."""
+    selector = KeyframeSelector(gate_threshold=0.05)
+    frame = np.full((120, 160, 3), 100, dtype=np.uint8)
+    assert selector.should_encode(frame)
+    assert selector.should_encode(np.full_like(frame, 200))
+
+    passed = [selector.should_encode(np.full_like(frame, 200 + 4 * i)) for i in range(1, 8)]
+    # Each step is ~0.016; the reference only moves when a frame passes.
+    assert passed == [False, False, False, True, False, False, False]
+
+
+def test_history_suppresses_revisit_duplicates():
+    """Oscillating between two views should only store each view once."""
+    a, b = _unit([1.0, 0.0, 0.0]), _unit([0.0, 1.0, 0.0])
+    single = KeyframeSelector(threshold=0.15)
+    ring = KeyframeSelector(threshold=0.15, history_size=4)
+
+    swings = [a, b] * 5
+    assert sum(single.is_keyframe(e)[0] for e in swings) == 10
+    assert sum(ring.is_keyframe(e)[0] for e in swings) == 2
+    assert ring.last_distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_history_ring_evicts_oldest():
+    """Once N newer keyframes are stored, an old view counts as new again."""
+    views = [_unit(np.eye(4)[i]) for i in range(4)]
+    selector = KeyframeSelector(threshold=0.15, history_size=2)
+    assert all(selector.is_keyframe(v)[0] for v in views[:3])
+    assert selector.is_keyframe(views[0])[0]
+    assert not selector.is_keyframe(views[2])[0]
+
+    selector.reset()
+    assert selector.is_keyframe(views[2])[0]
+    assert selector.last_distance is None
@@ -1,11 +1,14 @@
 """Tests for visual memory and related components."""
 
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
 
-from src.memory.qdrant_client import QdrantMemoryClient
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.qdrant_client import MemoryClient, QdrantMemoryClient
 from src.memory.schemas import MemoryPayload, Pose
 from src.memory.visual_memory import VisualMemory
 
@@ -67,6 +70,7 @@ def test_memory_payload_defaults():
     p = MemoryPayload(timestamp=123.0)
     assert p.pose_x == 0.0
     assert p.room_id == "unknown"
+    assert p.camera_id is None
     assert p.depth_mean is None
 
 
@@ -75,3 +79,250 @@ def test_pose_model():
     pose = Pose(x=1.5, y=2.5, theta=0.785)
     d = pose.model_dump()
     assert d == {"x": 1.5, "y": 2.5, "theta": 0.785}
+
+
+def _low_rank_embeddings(n: int = 400, rank: int = 24, dim: int = 512) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(n, rank)) @ rng.normal(size=(rank, dim))
+    x += rng.normal(scale=0.05, size=x.shape)
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_pca_projection_recall_and_roundtrip(tmp_path):
+    """PCA should keep neighbours of low-rank data and reload identically."""
+    from src.memory.projection import EmbeddingProjection, recall_at_k
+
+    embeddings = _low_rank_embeddings()
+    projection = EmbeddingProjection.fit_pca(embeddings, 32)
+    projected = projection.apply(embeddings)
+    assert projected.shape == (400, 32)
+    assert np.allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+    assert recall_at_k(embeddings, projected, k=10) > 0.9
+
+    tiny = EmbeddingProjection.random_orthogonal(512, 4)
+    assert recall_at_k(embeddings, tiny.apply(embeddings), k=10) < 0.5
+
+    path = str(tmp_path / "projection.npz")
+    projection.save(path)
+    loaded = EmbeddingProjection.load(path)
+    assert loaded.version == projection.version
+    assert np.array_equal(loaded.apply(embeddings), projected)
+
+
+def test_projected_collection_stores_reduced_vectors():
+    """Projected vectors should go to a versioned collection of reduced width."""
+    from src.memory.projection import EmbeddingProjection
+
+    projection = EmbeddingProjection.fit_pca(_low_rank_embeddings(), 128)
+    with patch("src.memory.qdrant_client.QdrantClient") as MockClient:
+        MockClient.return_value.get_collections.return_value = MagicMock(collections=[])
+        client = QdrantMemoryClient(collection_name="mem", projection=projection)
+
+        with pytest.raises(ValueError):
+            QdrantMemoryClient(vector_size=256, projection=projection)
+
+    assert client.collection_name == f"mem__pca128_{projection.version}"
+    created = MockClient.return_value.create_collection.call_args.kwargs
+    assert created["vectors_config"].size == 128
+
+    stored = []
+    client.client.upsert.side_effect = lambda **kw: stored.extend(kw["points"])
+    memory = VisualMemory(client=client, batch_size=1)
+    memory.store(_low_rank_embeddings(n=1)[0], MemoryPayload(timestamp=1.0))
+    (point,) = stored
+    assert len(point.vector) == 128
+
+
+def _recording_upsert(client, delay_s: float = 0.0) -> list:
+    """Record the size of each upsert call, optionally making it slow."""
+    batches = []
+
+    def upsert(**kwargs):
+        time.sleep(delay_s)
+        batches.append(len(kwargs["points"]))
+
+    client.client.upsert.side_effect = upsert
+    return batches
+
+
+def test_background_flush_by_size_and_interval(mock_qdrant):
+    """The writer should flush full batches and stale partial ones on its own."""
+    batches = _recording_upsert(mock_qdrant)
+    memory = VisualMemory(
+        client=mock_qdrant, batch_size=4, background=True, flush_interval_s=0.05
+    )
+    for i in range(5):
+        memory.store(np.random.randn(512).astype(np.float32), MemoryPayload(timestamp=float(i)))
+
+    deadline = time.monotonic() + 2.0
+    while sum(batches) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sum(batches) == 5
+    assert memory.buffer_size == 0
+    memory.close()
+
+
+def test_flush_waits_for_background_write(mock_qdrant):
+    """flush() should return only after an in-flight background upsert."""
+    batches = _recording_upsert(mock_qdrant, delay_s=0.2)
+    memory = VisualMemory(client=mock_qdrant, batch_size=2, background=True)
+    for i in range(3):
+        memory.store(np.random.randn(512).astype(np.float32), MemoryPayload(timestamp=float(i)))
+
+    memory.flush()
+    assert sum(batches) == 3
+    memory.close()
+
+
+def test_drop_oldest_backpressure(mock_qdrant):
+    """A full buffer should drop the oldest point instead of blocking."""
+    _recording_upsert(mock_qdrant)
+    memory = VisualMemory(
+        client=mock_qdrant,
+        batch_size=4,
+        background=True,
+        flush_interval_s=60.0,
+        max_buffer=4,
+        backpressure="drop_oldest",
+    )
+    # Hold the write lock so the writer cannot drain the buffer.
+    with memory._write_lock:
+        ids = [
+            memory.store(np.random.randn(512).astype(np.float32), MemoryPayload(timestamp=float(i)))
+            for i in range(6)
+        ]
+        assert memory.buffer_size == 4
+        assert memory.dropped == 2
+        assert [p.id for p in memory._buffer] == ids[2:]
+    memory.close()
+
+    with pytest.raises(ValueError):
+        VisualMemory(client=mock_qdrant, backpressure="spill")
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_failed_write_keeps_points_for_the_next_flush(background):
+    """Points of a failed upsert, and points stored after it, should all be written."""
+    client = NumpyMemoryClient(collection_name="mem")
+    upsert = client.client.upsert
+    calls = []
+
+    def flaky_upsert(**kwargs):
+        calls.append(len(kwargs["points"]))
+        if len(calls) == 1:
+            raise ConnectionError("down")
+        return upsert(**kwargs)
+
+    client.client.upsert = flaky_upsert
+    memory = VisualMemory(
+        client=client, batch_size=3, background=background, flush_interval_s=60.0
+    )
+    embeddings = np.random.randn(4, 512).astype(np.float32)
+    for i in range(2):
+        memory.store(embeddings[i], MemoryPayload(timestamp=float(i)))
+    if background:
+        memory.store(embeddings[2], MemoryPayload(timestamp=2.0))
+        deadline = time.monotonic() + 2.0
+        while memory._error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        memory.store(embeddings[3], MemoryPayload(timestamp=3.0))
+        with pytest.raises(RuntimeError, match="Background flush failed"):
+            memory.flush()
+        assert memory.buffer_size == 4
+        assert memory.flush() == 4
+    else:
+        # A full batch is flushed by the store that fills it.
+        with pytest.raises(ConnectionError):
+            memory.store(embeddings[2], MemoryPayload(timestamp=2.0))
+        assert memory.buffer_size == 3
+        memory.store(embeddings[3], MemoryPayload(timestamp=3.0))
+
+    assert calls == [3, 4]
+    assert client.count() == 4
+    memory.close()
+
+
+def test_concurrent_producers_lose_nothing(mock_qdrant):
+    """Points from several producer threads should all be written exactly once."""
+    stored = []
+    mock_qdrant.client.upsert.side_effect = lambda **kw: stored.extend(p.id for p in kw["points"])
+    memory = VisualMemory(client=mock_qdrant, batch_size=8, background=True, max_buffer=16)
+
+    def produce(n: int) -> None:
+        for i in range(n):
+            memory.store(np.random.randn(512).astype(np.float32), MemoryPayload(timestamp=float(i)))
+
+    threads = [threading.Thread(target=produce, args=(50,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    memory.close()
+
+    assert len(stored) == 200
+    assert len(set(stored)) == 200
+
+
+def test_store_many_sends_columnar_batches(mock_qdrant):
+    """store_many should upsert Batch chunks that match per-point payloads."""
+    memory = VisualMemory(client=mock_qdrant)
+    embeddings = np.random.randn(5, 512).astype(np.float32)
+    payloads = MemoryPayload.bulk(np.arange(5.0), room_id="lab", camera_id=list("abcde"))
+
+    ids = memory.store_many(embeddings, payloads, chunk_size=2)
+
+    batches = [c.kwargs["points"] for c in mock_qdrant.client.upsert.call_args_list]
+    assert [len(b.ids) for b in batches] == [2, 2, 1]
+    assert [pid for b in batches for pid in b.ids] == ids
+    assert np.allclose(batches[2].vectors[0], embeddings[4])
+    assert batches[1].payloads[0] == MemoryPayload(
+        timestamp=2.0, room_id="lab", camera_id="c"
+    ).model_dump()
+
+    with pytest.raises(ValueError):
+        memory.store_many(embeddings, payloads[:4])
+    with pytest.raises(ValueError):
+        MemoryPayload.bulk([1.0, 2.0], room_id=["lab"])
+
+
+def test_collection_index_and_quantization_settings():
+    """HNSW, quantization and datatype settings should reach create_collection."""
+    from qdrant_client.models import BinaryQuantization, Datatype, ProductQuantization
+
+    from src.memory.qdrant_client import quantization_from_config
+
+    with patch("src.memory.qdrant_client.QdrantClient") as MockClient:
+        MockClient.return_value.get_collections.return_value = MagicMock(collections=[])
+        QdrantMemoryClient(
+            collection_name="mem",
+            hnsw_config={"m": 32, "ef_construct": 200, "on_disk": True},
+            quantization_config={"binary": {"always_ram": True}},
+            datatype="float16",
+        )
+        with pytest.raises(ValueError):
+            QdrantMemoryClient(datatype="int4")
+
+    created = MockClient.return_value.create_collection.call_args.kwargs
+    assert created["vectors_config"].datatype == Datatype.FLOAT16
+    assert (created["hnsw_config"].m, created["hnsw_config"].ef_construct) == (32, 200)
+    assert created["hnsw_config"].on_disk is True
+    assert isinstance(created["quantization_config"], BinaryQuantization)
+
+    product = quantization_from_config({"product": {"compression": "x32"}})
+    assert isinstance(product, ProductQuantization)
+    assert product.product.compression.value == "x32"
+    assert quantization_from_config({"scalar": {}}).scalar.type.value == "int8"
+    assert quantization_from_config(None) is None
+    with pytest.raises(ValueError):
+        quantization_from_config({"scalar": {}, "binary": {}})
+
+
+def test_backend_must_implement_count_and_delete():
+    """A backend missing the abstract methods should fail at construction."""
+
+    class Incomplete(MemoryClient):
+        def count(self) -> int:
+            return 0
+
+    with pytest.raises(TypeError, match="delete_collection"):
+        Incomplete("mem", 512)
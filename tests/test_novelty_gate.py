@@ -0,0 +1,82 @@
+"""Tests for novelty-gated storage and payload refreshes."""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.memory.novelty_gate import NoveltyGate
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.qdrant_client import QdrantMemoryClient
+from src.memory.schemas import MemoryPayload
+from src.memory.segment_store import SegmentMemoryClient
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def test_revisits_refresh_last_seen_instead_of_storing():
+    """Close same-room matches are skipped and their last_seen refreshed in one batch."""
+    client = NumpyMemoryClient(collection_name="mem")
+    memory = VisualMemory(client=client, batch_size=1)
+    retriever = SceneRetriever(client=client, top_k=3, score_threshold=0.0)
+    gate = NoveltyGate(memory, threshold=0.95, refresh_batch_size=2)
+    places = _embeddings(3)
+
+    def visit(emb: np.ndarray, ts: float, room_id: str = "lab"):
+        matches = retriever.query(emb, room_id=room_id)
+        return gate.offer(emb, MemoryPayload(timestamp=ts, room_id=room_id), matches)
+
+    first = visit(places[0], 1.0)
+    assert first is not None
+    assert visit(places[1], 2.0) is not None
+    assert visit(places[0], 3.0) is None
+    assert visit(places[0], 4.0) is None
+    assert visit(places[0], 5.0, room_id="hall") is not None  # other room: novel
+    assert client.count() == 3
+    assert gate.summary() == {"stored": 3, "skipped": 2, "skip_rate": 0.4}
+
+    # Both skips refreshed the same point, so it is still pending.
+    assert retriever.query(places[0], room_id="lab")[0].payload.last_seen is None
+    assert visit(places[1], 6.0) is None
+    updated = {r.point_id: r.payload for r in retriever.query(places[0], room_id="lab")}
+    assert updated[first].last_seen == 4.0
+    assert updated[first].timestamp == 1.0
+    assert gate.flush() == 0
+
+
+def test_segment_payload_updates_persist(tmp_path):
+    """In-place payload updates should survive a reopen and extend the vocabulary."""
+    client = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=4)
+    ids = VisualMemory(client=client).store_many(
+        _embeddings(6), MemoryPayload.bulk(np.arange(6.0), room_id="lab")
+    )
+    client.set_payloads({ids[1]: {"last_seen": 10.0}, ids[5]: {"camera_id": "rear"}, "missing": {}})
+    with pytest.raises(ValueError):
+        client.set_payloads({ids[0]: {"not_a_field": 1}})
+
+    reopened = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=4)
+    records, _ = reopened.client.scroll("mem", limit=10)
+    payloads = {r.id: r.payload for r in records}
+    assert payloads[ids[1]]["last_seen"] == 10.0
+    assert payloads[ids[5]]["camera_id"] == "rear"
+    assert payloads[ids[0]]["last_seen"] is None
+
+
+def test_qdrant_payload_updates_are_one_request():
+    """Qdrant refreshes should go out as a single batch_update_points call."""
+    with patch("src.memory.qdrant_client.QdrantClient") as MockClient:
+        MockClient.return_value.get_collections.return_value = MagicMock(collections=[])
+        client = QdrantMemoryClient(collection_name="mem")
+
+    client.set_payloads({"a": {"last_seen": 1.0}, "b": {"last_seen": 2.0}})
+    (call,) = client.client.batch_update_points.call_args_list
+    ops = call.kwargs["update_operations"]
+    assert [(op.set_payload.points, op.set_payload.payload) for op in ops] == [
+        (["a"], {"last_seen": 1.0}),
+        (["b"], {"last_seen": 2.0}),
+    ]
@@ -0,0 +1,117 @@
+"""Tests for the in-process NumPy memory backend."""
+
+import time
+
+import numpy as np
+import pytest
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from src.memory.compressor import MemoryCompressor
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def filled():
+    """A numpy client with 300 points across three rooms, initially undersized."""
+    client = NumpyMemoryClient(collection_name="test", initial_capacity=16)
+    memory = VisualMemory(client=client, batch_size=7)
+    embeddings = _embeddings(300)
+    for i, emb in enumerate(embeddings[:100]):
+        memory.store(emb, MemoryPayload(timestamp=float(i), room_id=f"room_{i % 3}"))
+    memory.flush()
+    memory.store_many(
+        embeddings[100:],
+        MemoryPayload.bulk(
+            np.arange(100.0, 300.0), room_id=[f"room_{i % 3}" for i in range(100, 300)]
+        ),
+    )
+    return client, embeddings
+
+
+def test_query_matches_brute_force_with_filters(filled):
+    """Filtered top-k should equal a direct cosine search over matching rows."""
+    client, embeddings = filled
+    retriever = SceneRetriever(client=client, top_k=5, score_threshold=-1.0)
+    query = embeddings[42] + 0.05 * _embeddings(1, seed=1)[0]
+
+    results = retriever.query(query, room_id="room_1", time_start=50.0, time_end=250.0)
+
+    rows = [i for i in range(300) if i % 3 == 1 and 50 <= i <= 250]
+    scores = embeddings[rows] @ (query / np.linalg.norm(query))
+    expected = [rows[i] for i in np.argsort(-scores)[:5]]
+    assert [r.payload.timestamp for r in results] == [float(i) for i in expected]
+    assert all(r.payload.room_id == "room_1" for r in results)
+    assert results[0].score == pytest.approx(float(scores.max()), abs=1e-5)
+    assert client.count() == 300
+
+
+def test_upsert_overwrites_and_delete_compacts(filled):
+    """Re-used ids should overwrite in place; deletes keep the rest searchable."""
+    client, embeddings = filled
+    memory = VisualMemory(client=client)
+    retriever = SceneRetriever(client=client, top_k=1, score_threshold=0.0)
+
+    (first,), _ = client.client.scroll(collection_name="test", limit=1)
+    memory.store_many(
+        embeddings[299:], [MemoryPayload(timestamp=-1.0, room_id="hall")], ids=[first.id]
+    )
+    assert client.count() == 300
+    assert retriever.query(embeddings[299], room_id="hall")[0].point_id == str(first.id)
+
+    compressor = MemoryCompressor(client=client, keep_every_nth=3, age_threshold_hours=0.0)
+    deleted = compressor.compress()
+    assert deleted == 200  # every 3rd point in timestamp order is kept
+    assert client.count() == 100
+    remaining, _ = client.client.scroll(collection_name="test", limit=1000, with_vectors=True)
+    kept = sorted(r.payload["timestamp"] for r in remaining)
+    assert kept == [-1.0] + [float(t) for t in range(3, 300, 3)]
+    for record in remaining[:10]:
+        top = retriever.query(np.asarray(record.vector))[0]
+        assert top.point_id == str(record.id)
+
+    client.delete_collection()
+    assert client.count() == 0
+
+
+def test_scroll_pages_through_filtered_points(filled):
+    """Scroll offsets should page through every matching point once."""
+    client, _ = filled
+    seen, offset = [], None
+    while True:
+        page, offset = client.client.scroll(
+            collection_name="test",
+            scroll_filter=Filter(
+                must=[FieldCondition(key="room_id", match=MatchValue(value="room_2"))]
+            ),
+            limit=32,
+            offset=offset,
+        )
+        seen.extend(r.payload["timestamp"] for r in page)
+        if offset is None:
+            break
+    assert sorted(seen) == [float(i) for i in range(300) if i % 3 == 2]
+
+
+def test_float16_storage_keeps_rankings():
+    """float16 vectors should rank like float32 on random data."""
+    embeddings = _embeddings(2000)
+    payloads = MemoryPayload.bulk([time.time()] * 2000, room_id="lab")
+    tops = []
+    for dtype in ("float32", "float16"):
+        client = NumpyMemoryClient(collection_name="test", dtype=dtype)
+        ids = [str(i) for i in range(2000)]
+        VisualMemory(client=client).store_many(embeddings, payloads, ids=ids)
+        retriever = SceneRetriever(client=client, top_k=1, score_threshold=0.0)
+        tops.append([retriever.query(e)[0].point_id for e in embeddings[:50]])
+    assert tops[0] == tops[1]
+
+    with pytest.raises(ValueError):
+        NumpyMemoryClient(dtype="int8")
@@ -0,0 +1,119 @@
+"""Tests for room- and time-partitioned collection routing."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+from src.memory.compressor import MemoryCompressor
+from src.memory.partitioning import PartitionedMemoryClient, room_token
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+
+HOUR = 3600.0
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def local_qdrant():
+    """An in-process Qdrant shared by every client created in the test."""
+    server = QdrantClient(":memory:")
+    with patch("src.memory.qdrant_client.QdrantClient", return_value=server):
+        yield server
+
+
+def _partitioned(**kwargs) -> PartitionedMemoryClient:
+    return PartitionedMemoryClient(collection_name="mem", **kwargs)
+
+
+def _fill(client, embeddings: np.ndarray) -> list[str]:
+    n = len(embeddings)
+    return VisualMemory(client=client).store_many(
+        embeddings,
+        MemoryPayload.bulk(
+            [(i % 4) * HOUR for i in range(n)],
+            room_id=["lab" if i % 2 else "hall" for i in range(n)],
+        ),
+    )
+
+
+def test_routing_queries_and_fan_out(local_qdrant):
+    """Writes land in per-room, per-bucket collections; queries prune or fan out."""
+    client = _partitioned(time_bucket_hours=2)
+    embeddings = _embeddings(40)
+    ids = _fill(client, embeddings)
+
+    names = sorted(c.name for c in local_qdrant.get_collections().collections)
+    hall, lab = room_token("hall"), room_token("lab")
+    assert names == [
+        f"mem__r-{hall}__t-0", f"mem__r-{hall}__t-1", f"mem__r-{lab}__t-0", f"mem__r-{lab}__t-1"
+    ]
+    assert client.count() == 40
+
+    retriever = SceneRetriever(client=client, top_k=3, score_threshold=-1.0)
+    assert retriever.query(embeddings[5])[0].point_id == ids[5]
+    assert retriever.query(embeddings[5], room_id="lab")[0].point_id == ids[5]
+    assert retriever.query(embeddings[5], room_id="hall")[0].point_id != ids[5]
+    late = retriever.query(embeddings[3], time_start=2 * HOUR, top_k=40)
+    assert len(late) == 20 and all(r.payload.timestamp >= 2 * HOUR for r in late)
+    assert [p.name for p in client.client.select(None)] == names
+
+    # A reopened client finds the partitions, and the shared APIs still work.
+    reopened = _partitioned(time_bucket_hours=2)
+    assert len(reopened.partitions) == 4
+    reopened.set_payloads({ids[5]: {"last_seen": 9.0}})
+    assert retriever.query(embeddings[5], room_id="lab")[0].payload.last_seen == 9.0
+    deleted = MemoryCompressor(reopened, keep_every_nth=2, age_threshold_hours=0, page_size=7).compress()
+    assert deleted == 20
+    assert reopened.count() == 20
+    reopened.close()
+    with pytest.raises(RuntimeError):
+        reopened.client._pool.submit(print)
+
+
+def test_drop_partitions(local_qdrant):
+    """Old time buckets and whole rooms are dropped as collections."""
+    client = _partitioned(time_bucket_hours=2)
+    _fill(client, _embeddings(16))
+    hall, lab = room_token("hall"), room_token("lab")
+
+    assert client.drop_partitions(before=2 * HOUR) == [f"mem__r-{hall}__t-0", f"mem__r-{lab}__t-0"]
+    assert client.count() == 8
+    assert client.drop_partitions(room_id="lab") == [f"mem__r-{lab}__t-1"]
+    assert client.count() == 4
+
+    # Retention drops the expired buckets instead of deleting their points.
+    expiring = PartitionedMemoryClient(collection_name="old", time_bucket_hours=2)
+    _fill(expiring, _embeddings(16))
+    assert MemoryCompressor(expiring, age_threshold_hours=0, mode="retention").compress() == 16
+    assert expiring.partitions == []
+    assert f"old__r-{lab}__t-0" not in {c.name for c in local_qdrant.get_collections().collections}
+
+    by_room = _partitioned(by_room=True)
+    with pytest.raises(ValueError):
+        by_room.drop_partitions(before=1.0)
+    with pytest.raises(ValueError):
+        _partitioned(by_room=False)
+
+
+def test_rooms_with_the_same_slug_stay_apart(local_qdrant):
+    """Room ids that slug alike should get their own partitions."""
+    assert room_token("Room A") != room_token("Room-A")
+    client = _partitioned()
+    memory = VisualMemory(client=client)
+    memory.store_many(_embeddings(3), MemoryPayload.bulk(np.zeros(3), room_id="Room A"))
+    kept = memory.store_many(
+        _embeddings(2, seed=1), MemoryPayload.bulk(np.zeros(2), room_id="Room-A")
+    )
+
+    assert len(client.partitions) == 2
+    retriever = SceneRetriever(client=client, top_k=5, score_threshold=-1.0)
+    assert len(retriever.query(_embeddings(1)[0], room_id="Room A")) == 3
+    assert client.drop_partitions(room_id="Room A") == [f"mem__r-{room_token('Room A')}"]
+    assert sorted(r.point_id for r in retriever.query(_embeddings(1)[0])) == sorted(kept)
@@ -0,0 +1,78 @@
+"""Tests for the threaded staged pipeline."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.stages import StagedPipeline
+
+
+def test_preserves_order():
+    """Items should come out in source order after every stage."""
+    with StagedPipeline(
+        source=range(50),
+        stages=[("double", lambda x: x * 2), ("inc", lambda x: x + 1)],
+        queue_size=2,
+    ) as pipeline:
+        out = list(pipeline)
+    assert out == [x * 2 + 1 for x in range(50)]
+
+
+def test_backpressure_bounds_queue_depth():
+    """A slow consumer should keep every queue within its bound."""
+    pipeline = StagedPipeline(
+        source=range(30),
+        stages=[("identity", lambda x: x)],
+        queue_size=3,
+    )
+    max_depth = 0
+    with pipeline:
+        for _ in pipeline:
+            time.sleep(0.005)
+            max_depth = max(max_depth, *pipeline.queue_depths().values())
+    assert max_depth <= 3
+
+
+def test_should_stop_ends_iteration():
+    """Setting the stop flag should end iteration and stop the workers."""
+    stop = threading.Event()
+
+    def endless():
+        i = 0
+        while True:
+            yield i
+            i += 1
+
+    pipeline = StagedPipeline(
+        source=endless(),
+        stages=[("identity", lambda x: x)],
+        should_stop=stop.is_set,
+        poll_interval=0.01,
+    )
+    seen = []
+    with pipeline:
+        for item in pipeline:
+            seen.append(item)
+            if len(seen) == 10:
+                stop.set()
+    assert seen[:10] == list(range(10))
+    assert all(not t.is_alive() for t in pipeline._threads)
+
+
+def test_stage_error_propagates():
+    """An exception in a worker stage should surface to the consumer."""
+
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("bad frame")
+        return x
+
+    pipeline = StagedPipeline(
+        source=range(10), stages=[("check", fail_on_three)]
+    )
+    seen = []
+    with pytest.raises(RuntimeError, match="check"):
+        for item in pipeline:
+            seen.append(item)
+    assert seen == [0, 1, 2]
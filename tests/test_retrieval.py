@@ -3,7 +3,13 @@
 import numpy as np
 import pytest
 
-from src.memory.schemas import ChangeResult, MemoryPayload, RetrievalResult
+from src.memory.schemas import (
+    ChangeResult,
+    MemoryPayload,
+    PayloadRecord,
+    RetrievalMatch,
+    RetrievalResult,
+)
 from src.retrieval.change_detector import ChangeDetector
 
 
@@ -69,3 +75,15 @@ class TestRetrievalResult:
         )
         assert r.payload.depth_mean == 3.5
         assert r.payload.pose_x == 1.0
+
+    def test_match_record_mirrors_models(self):
+        """Unvalidated records should carry the same fields and defaults as the models."""
+        assert PayloadRecord._fields == tuple(MemoryPayload.model_fields)
+        payload = MemoryPayload(timestamp=5.0, room_id="lab", camera_id="front")
+        assert payload.to_payload() == payload.model_dump()
+
+        stored = {**payload.model_dump(), "legacy_field": 1}
+        match = RetrievalMatch("abc", 0.9, PayloadRecord.from_payload(stored))
+        assert match.payload.room_id == "lab"
+        assert match.to_result() == RetrievalResult(point_id="abc", score=0.9, payload=payload)
+        assert PayloadRecord(timestamp=1.0).to_model() == MemoryPayload(timestamp=1.0)
@@ -0,0 +1,89 @@
+"""Tests for the room-scoped retrieval cache."""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.schemas import MemoryPayload
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+from src.retrieval.room_cache import RoomCache
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def _setup(max_bytes: int = 64 * 2**20):
+    client = NumpyMemoryClient(collection_name="mem")
+    memory = VisualMemory(client=client, batch_size=4)
+    embeddings = _embeddings(300)
+    rooms = [f"room_{i % 3}" for i in range(300)]
+    memory.store_many(embeddings, MemoryPayload.bulk(np.arange(300.0), room_id=rooms))
+    cached = SceneRetriever(client, top_k=5, score_threshold=0.0, cache=RoomCache(client, max_bytes))
+    memory.add_write_listener(cached.observe_writes)
+    return client, memory, embeddings, cached
+
+
+def test_cached_room_queries_match_backend():
+    """Room-only queries should hit the cache and return the backend's results."""
+    client, _, embeddings, cached = _setup()
+    plain = SceneRetriever(client, top_k=5, score_threshold=0.0)
+
+    with patch.object(client.client, "query_points", wraps=client.client.query_points) as backend:
+        for i in range(0, 60, 3):
+            for room in ("room_0", "room_1"):
+                hits = cached.query(embeddings[i], room_id=room)
+                expected = plain.query(embeddings[i], room_id=room)
+                assert [r.point_id for r in hits] == [r.point_id for r in expected]
+                assert np.allclose([r.score for r in hits], [r.score for r in expected], atol=1e-5)
+        cached_calls = backend.call_count - 40
+        cached.query(embeddings[0], room_id="room_0", time_start=10.0)
+
+    assert cached_calls == 0
+    assert backend.call_count == 41
+    assert cached.cache.misses == 2
+    assert cached.cache.hits == 38
+    summary = cached.summary()
+    assert summary["cache"]["count"] == 40
+    assert summary["backend"]["count"] == 1
+
+
+def test_writes_update_cached_rooms():
+    """Points flushed by VisualMemory should be searchable from the cache."""
+    _, memory, _, cached = _setup()
+    cached.query(_embeddings(1, seed=5)[0], room_id="room_1")
+
+    new = _embeddings(4, seed=9)
+    for emb in new:
+        memory.store(emb, MemoryPayload(timestamp=1e6, room_id="room_1"))
+    memory.store(new[0], MemoryPayload(timestamp=1e6, room_id="room_2"))
+    memory.flush()
+
+    top = cached.query(new[2], room_id="room_1")[0]
+    assert top.payload.timestamp == 1e6
+    assert top.score > 0.999
+    assert cached.cache.misses == 1
+    assert "room_2" not in cached.cache._rooms
+
+
+def test_lru_eviction_and_oversized_rooms():
+    """The cache should stay within budget and skip rooms that cannot fit."""
+    _, _, embeddings, probe = _setup()
+    probe.query(embeddings[0], room_id="room_0")
+    room_bytes = probe.cache.nbytes
+
+    _, _, embeddings, cached = _setup(max_bytes=int(room_bytes * 2.5))
+    for room in ("room_0", "room_1", "room_2", "room_0"):
+        cached.query(embeddings[0], room_id=room)
+    assert cached.cache.evictions == 2
+    assert list(cached.cache._rooms) == ["room_2", "room_0"]
+    assert cached.cache.nbytes <= cached.cache.max_bytes
+
+    _, _, embeddings, tiny = _setup(max_bytes=room_bytes // 2)
+    assert tiny.query(embeddings[0], room_id="room_0")[0].payload.timestamp == 0.0
+    tiny.query(embeddings[0], room_id="room_0")
+    assert tiny.cache.misses == 1
+    assert tiny.summary()["backend"]["count"] == 2
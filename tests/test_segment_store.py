@@ -0,0 +1,166 @@
+"""Tests for the memory-mapped segment store."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.memory.compressor import MemoryCompressor
+from src.memory.numpy_store import NumpyMemoryClient
+from src.memory.schemas import MemoryPayload
+from src.memory.segment_store import Segment, SegmentMemoryClient, copy_points
+from src.memory.visual_memory import VisualMemory
+from src.retrieval.retriever import SceneRetriever
+
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    emb = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def _fill(client, embeddings: np.ndarray) -> list[str]:
+    n = len(embeddings)
+    return VisualMemory(client=client).store_many(
+        embeddings,
+        MemoryPayload.bulk(np.arange(float(n)), room_id=[f"room_{i % 3}" for i in range(n)]),
+        chunk_size=64,
+    )
+
+
+def test_reopen_and_query_across_segments(tmp_path):
+    """Points should survive a reopen and be searchable across segments."""
+    embeddings = _embeddings(250)
+    client = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=100)
+    ids = _fill(client, embeddings)
+    assert [s.count for s in client.client.segments] == [100, 100, 50]
+
+    reopened = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=100)
+    assert reopened.count() == 250
+    retriever = SceneRetriever(client=reopened, top_k=3, score_threshold=0.0)
+
+    top = retriever.query(embeddings[170])
+    assert top[0].point_id == ids[170]
+    assert top[0].payload.to_model() == MemoryPayload(timestamp=170.0, room_id="room_2")
+
+    filtered = retriever.query(embeddings[170], room_id="room_0", time_start=100.0)
+    assert all(r.payload.room_id == "room_0" and r.payload.timestamp >= 100 for r in filtered)
+
+
+def test_write_after_reopen_does_not_scan_full_segments(tmp_path, monkeypatch):
+    """Overwrites after a reopen should use the persisted id order of full segments."""
+    embeddings = _embeddings(250)
+    client = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=100)
+    ids = _fill(client, embeddings)
+    VisualMemory(client=client).store_many(
+        embeddings[:1], [MemoryPayload(timestamp=1.0, room_id="lab")], ids=[ids[0]]
+    )
+
+    reopened = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=100)
+    monkeypatch.setattr(Segment, "seal", lambda self: pytest.fail("segment re-sorted"))
+    memory = VisualMemory(client=reopened)
+    memory.store_many(
+        embeddings[[0, 10, 220]] * -1,
+        MemoryPayload.bulk(np.full(3, 1e6), room_id="lab"),
+        ids=[ids[0], ids[10], ids[220]],
+    )
+    memory.store_many(_embeddings(5, seed=1), MemoryPayload.bulk(np.zeros(5), room_id="lab"))
+    memory.update_payloads({ids[100]: {"last_seen": 2e6}})
+
+    assert reopened.count() == 255
+    sealed = reopened.client.segments[:2]
+    assert all(segment._rows is None for segment in sealed)
+    retriever = SceneRetriever(client=reopened, top_k=1, score_threshold=0.0)
+    for i in (0, 10, 220):
+        (top,) = retriever.query(-embeddings[i])
+        assert top.point_id == ids[i] and top.payload.timestamp == 1e6
+    assert retriever.query(embeddings[100])[0].payload.last_seen == 2e6
+
+
+def test_uncommitted_rows_are_truncated(tmp_path):
+    """Bytes appended without a manifest update should be dropped on reopen."""
+    client = SegmentMemoryClient(str(tmp_path), collection_name="mem")
+    _fill(client, _embeddings(10))
+    active = client.client.segments[-1].path
+    with open(active / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 512 * 4 * 3)
+
+    reopened = SegmentMemoryClient(str(tmp_path), collection_name="mem")
+    assert reopened.count() == 10
+    assert (active / "vectors.f32").stat().st_size == 10 * 512 * 4
+    _fill(reopened, _embeddings(5, seed=1))
+    assert SegmentMemoryClient(str(tmp_path), collection_name="mem").count() == 15
+
+
+def test_delete_overwrite_and_compact(tmp_path):
+    """Deletes and overwrites tombstone rows until compaction reclaims them."""
+    embeddings = _embeddings(120)
+    client = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=50)
+    ids = _fill(client, embeddings)
+
+    client.client.delete(collection_name="mem", points_selector=ids[:40])
+    VisualMemory(client=client).store_many(
+        embeddings[41:42], [MemoryPayload(timestamp=-1.0, room_id="hall")], ids=[ids[41]]
+    )
+    assert client.count() == 80
+    retriever = SceneRetriever(client=client, top_k=1, score_threshold=0.0)
+    assert all(r.point_id not in ids[:40] for r in retriever.query(embeddings[10]))
+    assert retriever.query(embeddings[41])[0].payload.room_id == "hall"
+
+    assert client.compact() == 41
+    reopened = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=50)
+    assert [s.count for s in reopened.client.segments] == [50, 30]
+    assert reopened.count() == 80
+    retriever = SceneRetriever(client=reopened, top_k=1, score_threshold=0.0)
+    assert retriever.query(embeddings[100])[0].point_id == ids[100]
+    assert retriever.query(embeddings[41])[0].payload.room_id == "hall"
+
+
+def test_export_and_import_round_trip(tmp_path):
+    """copy_points should move every point between backends unchanged."""
+    embeddings = _embeddings(90)
+    segments = SegmentMemoryClient(str(tmp_path), collection_name="mem")
+    ids = _fill(segments, embeddings)
+
+    other = NumpyMemoryClient(collection_name="mem")
+    assert copy_points(segments, other, chunk_size=32) == 90
+    back = SegmentMemoryClient(str(tmp_path / "back"), collection_name="mem")
+    assert copy_points(other, back) == 90
+
+    top = SceneRetriever(client=back, top_k=1, score_threshold=0.0).query(embeddings[33])[0]
+    assert top.point_id == ids[33]
+    assert top.payload.timestamp == 33.0
+
+    with pytest.raises(ValueError):
+        copy_points(segments, NumpyMemoryClient(vector_size=256))
+
+
+@pytest.mark.parametrize("backend", ["numpy", "segments"])
+def test_streaming_compression_and_retention(tmp_path, backend):
+    """Thinning keeps every Nth point in timestamp order however pages and ties fall."""
+    if backend == "numpy":
+        client = NumpyMemoryClient(collection_name="mem")
+    else:
+        client = SegmentMemoryClient(str(tmp_path), collection_name="mem", segment_capacity=16)
+    # Pairs of points share a timestamp, and insertion order is shuffled.
+    timestamps = np.random.default_rng(1).permutation(np.repeat(np.arange(25.0), 2))
+    VisualMemory(client=client).store_many(_embeddings(50), MemoryPayload.bulk(timestamps, room_id="lab"))
+
+    page, offset = client.client.scroll("mem", limit=5, with_payload=["timestamp"], order_by="timestamp")
+    assert [r.payload for r in page] == [{"timestamp": t} for t in (0.0, 0.0, 1.0, 1.0, 2.0)]
+    assert offset is None
+
+    progress = []
+    compressor = MemoryCompressor(
+        client, keep_every_nth=3, age_threshold_hours=0, page_size=4, delete_batch_size=3
+    )
+    assert compressor.compress(progress=lambda *p: progress.append(p)) == 33
+    kept, _ = client.client.scroll("mem", limit=100)
+    assert sorted(r.payload["timestamp"] for r in kept) == [r // 2 for r in range(0, 50, 3)]
+    # Local backends sort the aged points once instead of paging by timestamp.
+    assert progress == [(50, 33)]
+
+    future = MemoryPayload.bulk([time.time() + 3600] * 3, room_id="lab")
+    VisualMemory(client=client).store_many(_embeddings(3), future)
+    expired = MemoryCompressor(client, age_threshold_hours=0, mode="retention").compress()
+    assert expired == 17
+    assert client.count() == 3